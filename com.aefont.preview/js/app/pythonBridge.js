@@ -10,9 +10,14 @@
         return;
     }
 
+    // Renew the lease well inside the server's AE_FONT_LEASE_TTL (180 s).
+    const HEARTBEAT_INTERVAL = 60000;
+    const clientId = `panel-${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 8)}`;
+
     let processManager = null;
     let client = null;
     let ready = false;
+    let heartbeat = null;
     let catalog = new Map();
     const previewCache = new Map();
 
@@ -116,12 +121,12 @@
             }
         }
 
-        const started = processManager.start(extensionPath);
-        if (!started) {
+        const baseUrl = await processManager.connect(extensionPath);
+        if (!baseUrl) {
             return false;
         }
 
-        client = new PreviewClient();
+        client = new PreviewClient(baseUrl);
         const alive = await client.waitUntilReady();
         if (!alive) {
             processManager.stop();
@@ -129,6 +134,12 @@
             client = null;
             return false;
         }
+        await client.attach(clientId);
+        heartbeat = setInterval(() => {
+            if (client) {
+                client.attach(clientId);
+            }
+        }, HEARTBEAT_INTERVAL);
 
         catalog = await client.fetchFontCatalog();
         rebuildCatalogAliases();
@@ -174,7 +185,7 @@
         return fonts;
     }
 
-    async function fetchBatchPreviews(fontRequests, text, size) {
+    async function fetchBatchPreviews(fontRequests, text, size, options = {}) {
         if (!ready || !client) {
             return [];
         }
@@ -223,7 +234,7 @@
 
         let fetched = [];
         try {
-            fetched = await client.fetchBatchPreviews(payload, text, size);
+            fetched = await client.fetchBatchPreviews(payload, text, size, options);
         } catch (error) {
             console.warn('[AEFontPythonBridge] Batch preview request failed:', error);
             return cached;
@@ -234,7 +245,8 @@
         }
 
         fetched.forEach(result => {
-            if (!result || !result.image) {
+            if (!result || !result.image || result.approximate) {
+                // Approximate previews are replaced by a crisp request once the size settles.
                 return;
             }
             const matching = pending.find(entry => entry.requestId === result.requestId);
@@ -252,11 +264,19 @@
     }
 
     function stop() {
+        if (heartbeat) {
+            clearInterval(heartbeat);
+            heartbeat = null;
+        }
+        if (client) {
+            client.detach(clientId);
+        }
         if (processManager) {
             try {
-                processManager.stop();
+                // The helper is shared with other panels; it exits once its last lease is gone.
+                processManager.release();
             } catch (error) {
-                console.warn('[AEFontPythonBridge] Failed to stop helper:', error);
+                console.warn('[AEFontPythonBridge] Failed to release helper:', error);
             }
         }
         processManager = null;
@@ -273,6 +293,9 @@
         isReady() {
             return ready;
         },
+        supportsPyramid() {
+            return Boolean(ready && client && client.supportsPyramid);
+        },
         stop,
         mergeFonts,
         findMetaForFont,
@@ -281,6 +304,9 @@
         fetchBatchPreviews,
         getCatalog() {
             return catalog;
+        },
+        getBaseUrl() {
+            return client ? client.baseUrl : null;
         }
     };
 })(window);
@@ -60,7 +60,8 @@
                     nativeFull: font.nativeFull
                 }))
             };
-            fetch('http://127.0.0.1:8765/debug/cep-fonts', {
+            const baseUrl = AEFontPythonBridge.getBaseUrl() || 'http://127.0.0.1:8765';
+            fetch(`${baseUrl}/debug/cep-fonts`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify(payload)
@@ -85,6 +86,13 @@
     let toastContainer;
     let pythonUpdateTimer = null;
     let pythonPreviewBusy = false;
+    // Options of an update requested while another one was in flight.
+    let pythonPreviewPending = null;
+    // Crisp re-render once the size slider has been still this long (ms).
+    const SIZE_SETTLE_DELAY = 250;
+    // Rows past each edge of the visible window sent for idle prefetching (server AE_FONT_PREFETCH_RADIUS).
+    const PYTHON_PREFETCH_ROWS = 20;
+    let sizeSettleTimer = null;
     const fontByUid = new Map();
     const fontsByPythonKey = new Map();
     let fontListElement;
@@ -453,7 +461,10 @@
         // Font size slider
         document.getElementById('font-size').addEventListener('input', function(e) {
             document.getElementById('size-value').textContent = e.target.value + 'px';
-            updateFontPreviews();
+            scrubFontSize();
+        });
+        document.getElementById('font-size').addEventListener('change', function() {
+            settleFontSize();
         });
 
         // Preview text
@@ -871,6 +882,41 @@
         schedulePythonPreviewUpdate();
     }
 
+    // While the size slider moves, ask for approximate previews derived from one
+    // large master per font; a normal (crisp) update follows once it settles.
+    // Servers without the pyramid (width buckets off) get the debounced update.
+    function scrubFontSize() {
+        const fontSize = fontSizeInput ? fontSizeInput.value : '24';
+        document.querySelectorAll('.font-preview-text').forEach(node => {
+            node.style.fontSize = fontSize + 'px';
+        });
+        if (!window.AEFontPythonBridge || !AEFontPythonBridge.isReady()) {
+            return;
+        }
+        if (!AEFontPythonBridge.supportsPyramid()) {
+            schedulePythonPreviewUpdate();
+            return;
+        }
+        if (pythonUpdateTimer) {
+            clearTimeout(pythonUpdateTimer);
+            pythonUpdateTimer = null;
+        }
+        const pyramidSize = fontSizeInput ? parseInt(fontSizeInput.max, 10) || 0 : 0;
+        updatePythonPreviews({ interactive: true, pyramidSize });
+        if (sizeSettleTimer) {
+            clearTimeout(sizeSettleTimer);
+        }
+        sizeSettleTimer = setTimeout(settleFontSize, SIZE_SETTLE_DELAY);
+    }
+
+    function settleFontSize() {
+        if (sizeSettleTimer) {
+            clearTimeout(sizeSettleTimer);
+            sizeSettleTimer = null;
+        }
+        schedulePythonPreviewUpdate(true);
+    }
+
     function schedulePythonPreviewUpdate(immediate = false) {
         if (!window.AEFontPythonBridge || !AEFontPythonBridge.isReady()) {
             return;
@@ -889,8 +935,13 @@
         pythonUpdateTimer = setTimeout(updatePythonPreviews, 300);
     }
 
-    async function updatePythonPreviews() {
-        if (!window.AEFontPythonBridge || !AEFontPythonBridge.isReady() || pythonPreviewBusy) {
+    async function updatePythonPreviews(options = {}) {
+        if (!window.AEFontPythonBridge || !AEFontPythonBridge.isReady()) {
+            return;
+        }
+        if (pythonPreviewBusy) {
+            // Run again when the current batch is done; the latest request wins.
+            pythonPreviewPending = options;
             return;
         }
         if (!fontListElement) {
@@ -904,10 +955,19 @@
 
             const requestPayload = [];
             const requestBindings = new Map();
+            const rowsAbove = [];
+            const rowsBelow = [];
 
             document.querySelectorAll('.font-item.python-render').forEach(item => {
                 const rect = item.getBoundingClientRect();
-                if (rect.bottom < listRect.top - 80 || rect.top > listRect.bottom + 80) {
+                if (rect.bottom < listRect.top - 80) {
+                    rowsAbove.push(item);
+                    return;
+                }
+                if (rect.top > listRect.bottom + 80) {
+                    if (rowsBelow.length < PYTHON_PREFETCH_ROWS) {
+                        rowsBelow.push(item);
+                    }
                     return;
                 }
                 const font = fontByUid.get(item.dataset.fontUid);
@@ -926,6 +986,12 @@
                     ? AEFontPythonBridge.buildCacheKey(key, text, size, viewportWidth, styleMarker)
                     : `${key}::${styleMarker}::${(text || '').slice(0, 200)}::${size}::${viewportWidth}`;
                 font.currentPythonCacheKey = cacheKey;
+                // Same text/size/style and a width that wraps identically: the current image is still right.
+                const layoutKey = `${key}::${styleMarker}::${(text || '').slice(0, 200)}::${size}`;
+                if (font.pythonImage && font.pythonLayoutKey === layoutKey && inWidthRange(viewportWidth, font.pythonWidthRange)) {
+                    return;
+                }
+                font.pendingPythonLayoutKey = layoutKey;
                 const requestId = cacheKey;
                 if (!requestBindings.has(requestId)) {
                     requestBindings.set(requestId, []);
@@ -975,9 +1041,22 @@
                 return;
             }
 
+            // The panel's own order (scrolling down first), so the server prefetches what comes next.
+            const prefetch = rowsBelow.concat(rowsAbove.slice(-PYTHON_PREFETCH_ROWS).reverse())
+                .map(item => fontByUid.get(item.dataset.fontUid))
+                .filter(Boolean)
+                .map(font => ({
+                    name: font.displayName || font.nativeFull || font.pythonLookup || font.postScriptName || font.family,
+                    family: font.family || null,
+                    postScriptName: font.postScriptName || null,
+                    style: font.style || null
+                }));
+
             pythonPreviewBusy = true;
             try {
-                const previews = await AEFontPythonBridge.fetchBatchPreviews(requestPayload, text, size);
+                const previews = await AEFontPythonBridge.fetchBatchPreviews(
+                    requestPayload, text, size, Object.assign({}, options, { prefetch })
+                );
                 (previews || []).forEach(preview => {
                     if (!preview || !preview.image) {
                         return;
@@ -1000,20 +1079,33 @@
                         return;
                     }
                     boundFonts.forEach(font => {
-                        updatePythonPreviewDom(font, preview.image);
+                        updatePythonPreviewDom(font, preview.image, preview.approximate ? null : preview.widthRange);
                     });
                 });
             } catch (error) {
                 reportError('updatePythonPreviews/fetch', error);
             } finally {
                 pythonPreviewBusy = false;
+                if (pythonPreviewPending) {
+                    const pending = pythonPreviewPending;
+                    pythonPreviewPending = null;
+                    updatePythonPreviews(pending);
+                }
             }
         } catch (error) {
             reportError('updatePythonPreviews', error);
         }
     }
 
-    function updatePythonPreviewDom(font, image) {
+    function inWidthRange(width, range) {
+        if (!Array.isArray(range) || range.length !== 2) {
+            return false;
+        }
+        const [low, high] = range;
+        return width >= low && (high === null || high === undefined || width < high);
+    }
+
+    function updatePythonPreviewDom(font, image, widthRange) {
         if (!font) {
             return;
         }
@@ -1025,6 +1117,8 @@
         if (img && image) {
             img.src = image;
             font.pythonImage = image;
+            font.pythonLayoutKey = font.pendingPythonLayoutKey || null;
+            font.pythonWidthRange = Array.isArray(widthRange) ? widthRange : null;
             item.classList.add('python-loaded');
         }
     }
@@ -4,6 +4,8 @@
     class PythonPreviewClient {
         constructor(baseUrl) {
             this.baseUrl = baseUrl || 'http://127.0.0.1:8765';
+            // Set from /ping: the server downsamples interactive batches (width buckets are on).
+            this.supportsPyramid = false;
         }
 
         async waitUntilReady(timeout = 5000, interval = 300) {
@@ -12,6 +14,8 @@
                 try {
                     const response = await fetch(`${this.baseUrl}/ping`, { cache: 'no-store' });
                     if (response && response.ok) {
+                        const data = await response.json().catch(() => null);
+                        this.supportsPyramid = Boolean(data && data.pyramid);
                         return true;
                     }
                 } catch (error) {
@@ -22,6 +26,27 @@
             return false;
         }
 
+        // Lease on the shared server: attach on connect and as a heartbeat, detach on unload.
+        async attach(clientId) {
+            try {
+                const response = await fetch(`${this.baseUrl}/clients/attach?client=${encodeURIComponent(clientId)}`, {
+                    method: 'POST',
+                    cache: 'no-store'
+                });
+                return response.ok;
+            } catch (error) {
+                return false;
+            }
+        }
+
+        detach(clientId) {
+            // keepalive lets the request outlive the page during beforeunload.
+            return fetch(`${this.baseUrl}/clients/detach?client=${encodeURIComponent(clientId)}`, {
+                method: 'POST',
+                keepalive: true
+            }).catch(() => false);
+        }
+
         async fetchFontCatalog() {
             try {
                 const response = await fetch(`${this.baseUrl}/fonts`, { cache: 'no-store' });
@@ -77,7 +102,7 @@
             }
         }
 
-        async fetchBatchPreviews(fontRequests, text, size) {
+        async fetchBatchPreviews(fontRequests, text, size, options = {}) {
             if (!Array.isArray(fontRequests) || fontRequests.length === 0) {
                 return [];
             }
@@ -118,7 +143,13 @@
                     headers: {
                         'Content-Type': 'application/json'
                     },
-                    body: JSON.stringify({ fonts: payloadFonts, text, size })
+                    body: JSON.stringify(Object.assign(
+                        { fonts: payloadFonts, text, size },
+                        // Scrubbing: sizes may be downsampled from one master ("approximate": true).
+                        options.interactive ? { interactive: true, pyramidSize: options.pyramidSize || null } : {},
+                        // Rows listed next to this batch, nearest first, for the idle prefetcher.
+                        Array.isArray(options.prefetch) && options.prefetch.length ? { prefetch: options.prefetch } : {}
+                    ))
                 });
                 if (!response.ok) {
                     throw new Error(`Status ${response.status}`);
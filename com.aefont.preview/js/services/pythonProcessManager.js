@@ -15,13 +15,119 @@
     const os = safeRequire('os');
     const childProcess = safeRequire('child_process');
 
+    // Must match shared_server.PROTOCOL_VERSION; a server speaking another version is not reused.
+    const PROTOCOL_VERSION = 1;
+    const DEFAULT_PORT = 8765;
+    const LOCK_POLL_INTERVAL = 200;
+
+    function sleep(ms) {
+        return new Promise(resolve => setTimeout(resolve, ms));
+    }
+
     class PythonProcessManager {
         constructor() {
             this.process = null;
             this.started = false;
+            this.baseUrl = null;
             this.platform = os ? os.platform() : 'unknown';
         }
 
+        // Same location as shared_server.default_lock_dir() on Windows.
+        lockFilePath() {
+            const env = (typeof process !== 'undefined' && process.env) || {};
+            if (env.AE_FONT_LOCK_DIR) {
+                return path.join(env.AE_FONT_LOCK_DIR, 'font_server.json');
+            }
+            const base = env.LOCALAPPDATA || path.join(os.homedir(), 'AppData', 'Local');
+            return path.join(base, 'AEFontPreview', 'font_server.json');
+        }
+
+        readLock() {
+            try {
+                const lock = JSON.parse(fs.readFileSync(this.lockFilePath(), 'utf8'));
+                return lock && lock.protocol === PROTOCOL_VERSION && Number.isInteger(lock.port) ? lock : null;
+            } catch (error) {
+                return null;
+            }
+        }
+
+        async probe(lock) {
+            const controller = typeof AbortController === 'function' ? new AbortController() : null;
+            const timer = controller ? setTimeout(() => controller.abort(), 1500) : null;
+            try {
+                const response = await fetch(`http://127.0.0.1:${lock.port}/ping`, {
+                    cache: 'no-store',
+                    signal: controller ? controller.signal : undefined
+                });
+                const data = response.ok ? await response.json() : null;
+                return Boolean(data && data.pid === lock.pid && data.protocol === PROTOCOL_VERSION);
+            } catch (error) {
+                return false;
+            } finally {
+                if (timer) {
+                    clearTimeout(timer);
+                }
+            }
+        }
+
+        async findRunningServer() {
+            const lock = this.readLock();
+            if (lock && await this.probe(lock)) {
+                return `http://127.0.0.1:${lock.port}`;
+            }
+            return null;
+        }
+
+        /**
+         * Resolve the base URL of the session's shared font server, starting one if none is running.
+         * Returns null when no helper could be started.
+         */
+        async connect(extensionPathOverride, timeout = 20000) {
+            if (this.baseUrl) {
+                return this.baseUrl;
+            }
+            if (!childProcess || !path || !fs || !os) {
+                console.warn('[PythonProcessManager] Node modules unavailable. Skipping Python helper.');
+                return null;
+            }
+            if (this.platform !== 'win32') {
+                console.info('[PythonProcessManager] Python helper is only available on Windows.');
+                return null;
+            }
+
+            const running = await this.findRunningServer();
+            if (running) {
+                console.log(`[PythonProcessManager] Reusing shared helper at ${running}`);
+                this.baseUrl = running;
+                this.started = true;
+                return running;
+            }
+            if (!this.start(extensionPathOverride)) {
+                return null;
+            }
+
+            // The new server writes the lockfile once it listens, before building its catalog
+            // (a racing launch may win instead).
+            const deadline = Date.now() + timeout;
+            while (Date.now() < deadline) {
+                const exited = this.exited;
+                const found = await this.findRunningServer();
+                if (found) {
+                    this.baseUrl = found;
+                    return found;
+                }
+                if (exited) {
+                    console.warn('[PythonProcessManager] Helper exited without a running server to reuse.');
+                    this.stop();
+                    return null;
+                }
+                await sleep(LOCK_POLL_INTERVAL);
+            }
+            console.warn('[PythonProcessManager] Helper did not register a lockfile; assuming the default port.');
+            this.baseUrl = `http://127.0.0.1:${DEFAULT_PORT}`;
+            return this.baseUrl;
+        }
+
         start(extensionPathOverride) {
             if (this.started) {
                 return true;
@@ -52,13 +158,18 @@
                 return false;
             }
             console.log(`[PythonProcessManager] Using extension path: ${extensionPath}`);
-            const exePath = path.join(extensionPath, 'bin', 'win', 'font_server.exe');
+            // build_exe.py --onedir installs an unpacked layout that starts faster than the onefile exe.
+            const exeCandidates = [
+                path.join(extensionPath, 'bin', 'win', 'font_server', 'font_server.exe'),
+                path.join(extensionPath, 'bin', 'win', 'font_server.exe')
+            ];
+            const exePath = exeCandidates.find(candidate => fs.existsSync(candidate));
             const scriptPath = path.join(extensionPath, 'python', 'font_server.py');
 
             let command;
             let args = [];
 
-                if (fs.existsSync(exePath)) {
+                if (exePath) {
                     command = exePath;
                 } else if (fs.existsSync(scriptPath)) {
                 command = 'python';
@@ -72,27 +183,26 @@
 
             const workingDir = extensionPath;
 
+            // The server is shared and outlives this panel, so it gets no pipes back to it
+            // (nor a console window: the python.exe fallback would otherwise open one).
             this.process = childProcess.spawn(command, args, {
                 cwd: workingDir,
-                windowsHide: false,
-                stdio: ['ignore', 'pipe', 'pipe']
+                windowsHide: true,
+                detached: true,
+                stdio: 'ignore',
+                env: Object.assign({}, process.env, { AE_FONT_SHARED: '1' })
             });
 
+            this.exited = false;
             this.process.on('error', error => {
                 console.error('[PythonProcessManager] Failed to start Python helper:', error);
+                this.exited = true;
+            });
+            this.process.on('exit', code => {
+                // Code 0 right after launch: another server already held the lock.
+                console.log(`[PythonProcessManager] Helper process exited (${code}).`);
+                this.exited = true;
             });
-
-            if (this.process.stdout) {
-                this.process.stdout.on('data', data => {
-                    console.log(`[font_server stdout] ${data}`);
-                });
-            }
-
-            if (this.process.stderr) {
-                this.process.stderr.on('data', data => {
-                    console.warn(`[font_server stderr] ${data}`);
-                });
-            }
 
             this.process.unref();
             this.started = true;
@@ -104,6 +214,13 @@
             }
         }
 
+        /** Forget the shared helper without stopping it; it exits by itself once no panel holds a lease. */
+        release() {
+            this.process = null;
+            this.started = false;
+            this.baseUrl = null;
+        }
+
         stop() {
             if (this.process) {
                 try {
@@ -114,6 +231,7 @@
             }
             this.process = null;
             this.started = false;
+            this.baseUrl = null;
         }
     }
 
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+asyncio front end for the font helper (stdlib only).
+
+Selected with AE_FONT_SERVER_IMPL=async. It serves the same routes as
+FontServerHandler by calling the same transport-independent
+``encode_response(method, target, body)``; only the HTTP plumbing differs:
+
+* a minimal HTTP/1.1 parser on ``asyncio.start_server`` with keep-alive,
+  bounded header size and a maximum body size (413 beyond it);
+* handlers run in executors so the event loop never blocks -- renders on a
+  single thread (renderers keep per-instance state), everything else on a
+  small pool;
+* at most AE_FONT_MAX_INFLIGHT render requests are running or queued; more
+  are answered immediately with 503 and ``Retry-After`` instead of piling
+  up behind a long batch.
+
+Environment:
+    AE_FONT_MAX_INFLIGHT     render requests running or queued (default: 4)
+    AE_FONT_MAX_BODY_KB      largest accepted request body (default: 4096)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Callable, Dict, Optional, Tuple
+
+from metrics import METRICS
+
+LOG = logging.getLogger("font_server")
+
+MAX_INFLIGHT_RENDERS = int(os.environ.get("AE_FONT_MAX_INFLIGHT", "4"))
+MAX_BODY_BYTES = int(os.environ.get("AE_FONT_MAX_BODY_KB", "4096")) * 1024
+MAX_HEADER_BYTES = 16 * 1024
+# A rejected body is read and thrown away (up to this much) before closing, so
+# the client gets its 413 instead of a reset while it is still sending.
+MAX_DISCARD_BYTES = 64 * 1024 * 1024
+DISCARD_TIMEOUT = 5.0
+RETRY_AFTER_SECONDS = 1
+IDLE_TIMEOUT = 30.0
+API_WORKERS = 4
+
+# (method, target, body) -> (status, body bytes or None for 404, headers)
+Handler = Callable[[str, str, bytes], Tuple[HTTPStatus, Optional[bytes], Dict[str, str]]]
+RenderPredicate = Callable[[str, str], bool]
+
+CORS_HEADERS = (
+    ("Access-Control-Allow-Origin", "*"),
+    ("Access-Control-Allow-Methods", "GET, POST, OPTIONS"),
+    ("Access-Control-Allow-Headers", "Content-Type"),
+)
+
+
+class _BadRequest(Exception):
+    def __init__(self, status: HTTPStatus, message: str, unread: int = 0) -> None:
+        super().__init__(message)
+        self.status = status
+        # Body bytes the client is still sending.
+        self.unread = unread
+
+
+class AsyncFontServer:
+    """Drop-in for ``HTTPServer``: construct (binds), ``serve_forever()``, ``shutdown()``, ``server_close()``."""
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        handler: Handler,
+        is_render: RenderPredicate,
+        max_inflight: int = MAX_INFLIGHT_RENDERS,
+        max_body: int = MAX_BODY_BYTES,
+    ) -> None:
+        self.handler = handler
+        self.is_render = is_render
+        self.max_inflight = max(1, max_inflight)
+        self.max_body = max_body
+        self.inflight = 0
+        self.rejected = 0
+        self._socket = socket.create_server(address)
+        self._render_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="render")
+        self._api_pool = ThreadPoolExecutor(max_workers=API_WORKERS, thread_name_prefix="api")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._shutdown_requested = threading.Event()
+
+    @property
+    def server_port(self) -> int:
+        return self._socket.getsockname()[1]
+
+    def serve_forever(self) -> None:
+        asyncio.run(self._serve())
+
+    def shutdown(self) -> None:
+        """Stop serve_forever() from another thread (returns without waiting for it)."""
+        self._shutdown_requested.set()
+        loop, stop = self._loop, self._stop
+        if loop is not None and stop is not None:
+            loop.call_soon_threadsafe(stop.set)
+
+    def server_close(self) -> None:
+        self._socket.close()
+        self._render_pool.shutdown(wait=False, cancel_futures=True)
+        self._api_pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _serve(self) -> None:
+        self._stop = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        if self._shutdown_requested.is_set():
+            return
+        server = await asyncio.start_server(self._connection, sock=self._socket, limit=MAX_HEADER_BYTES)
+        async with server:
+            await self._stop.wait()
+
+    # ------------------------------------------------------------------
+    # Connection handling
+    # ------------------------------------------------------------------
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), IDLE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await self._send_error(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                           "headers too large", keep_alive=False)
+                    return
+                try:
+                    method, target, headers, keep_alive = self._parse_head(head)
+                    body = await self._read_body(reader, headers)
+                except _BadRequest as exc:
+                    await self._send_error(writer, exc.status, str(exc), keep_alive=False)
+                    if exc.unread:
+                        await self._discard(reader, writer, exc.unread)
+                    return
+                await self._respond(writer, method, target, body, keep_alive)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _parse_head(head: bytes) -> Tuple[str, str, Dict[str, str], bool]:
+        try:
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, version = lines[0].split(" ")
+        except ValueError:
+            raise _BadRequest(HTTPStatus.BAD_REQUEST, "malformed request line")
+        if version not in ("HTTP/1.1", "HTTP/1.0"):
+            raise _BadRequest(HTTPStatus.HTTP_VERSION_NOT_SUPPORTED, "HTTP/1.x only")
+        headers: Dict[str, str] = {}
+        for line in lines[1:]:
+            if not line:
+                continue
+            name, sep, value = line.partition(":")
+            if not sep:
+                raise _BadRequest(HTTPStatus.BAD_REQUEST, "malformed header")
+            headers[name.strip().lower()] = value.strip()
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        return method, target, headers, keep_alive
+
+    async def _read_body(self, reader: asyncio.StreamReader, headers: Dict[str, str]) -> bytes:
+        if "transfer-encoding" in headers:
+            raise _BadRequest(HTTPStatus.NOT_IMPLEMENTED, "chunked bodies are not supported")
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise _BadRequest(HTTPStatus.BAD_REQUEST, "bad Content-Length")
+        if length < 0:
+            raise _BadRequest(HTTPStatus.BAD_REQUEST, "bad Content-Length")
+        if length > self.max_body:
+            raise _BadRequest(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"body exceeds {self.max_body} bytes", length)
+        if not length:
+            return b""
+        try:
+            return await asyncio.wait_for(reader.readexactly(length), IDLE_TIMEOUT)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+            raise _BadRequest(HTTPStatus.BAD_REQUEST, "truncated body")
+
+    @staticmethod
+    async def _discard(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, length: int) -> None:
+        """Half-close after an error and swallow the rest of the body.
+
+        Closing with unread data makes the kernel send a reset, which the
+        client sees as a broken pipe before it reads the response.
+        """
+        if writer.can_write_eof():
+            writer.write_eof()
+        remaining = min(length, MAX_DISCARD_BYTES)
+        try:
+            while remaining > 0:
+                chunk = await asyncio.wait_for(reader.read(min(remaining, 65536)), DISCARD_TIMEOUT)
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+
+    async def _respond(
+        self,
+        writer: asyncio.StreamWriter,
+        method: str,
+        target: str,
+        body: bytes,
+        keep_alive: bool,
+    ) -> None:
+        if method == "OPTIONS":
+            await self._send(writer, HTTPStatus.NO_CONTENT, b"", {}, keep_alive)
+            return
+        if method not in ("GET", "POST"):
+            await self._send_error(writer, HTTPStatus.NOT_IMPLEMENTED, f"unsupported method {method}", keep_alive)
+            return
+
+        loop = asyncio.get_running_loop()
+        if not self.is_render(method, target):
+            await self._send(writer, *await self._call(loop, self._api_pool, method, target, body), keep_alive)
+            return
+
+        if self.inflight >= self.max_inflight:
+            self.rejected += 1
+            METRICS.increment("rejected_busy")
+            await self._send_error(
+                writer,
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                "busy",
+                keep_alive,
+                {"Retry-After": str(RETRY_AFTER_SECONDS)},
+            )
+            return
+        self.inflight += 1
+        try:
+            response = await self._call(loop, self._render_pool, method, target, body)
+        finally:
+            self.inflight -= 1
+        await self._send(writer, *response, keep_alive)
+
+    async def _call(self, loop, pool, method: str, target: str, body: bytes):
+        """Run the handler (routing and JSON encoding) off the event loop."""
+        try:
+            status, data, headers = await loop.run_in_executor(pool, self.handler, method, target, body)
+        except Exception as exc:
+            LOG.warning("Request %s %s failed: %s", method, target, exc)
+            return self._error_body(HTTPStatus.INTERNAL_SERVER_ERROR, "internal")
+        if data is None:
+            return self._error_body(status, status.phrase)
+        return status, data, headers
+
+    @staticmethod
+    def _error_body(status: HTTPStatus, message: str, headers: Optional[Dict[str, str]] = None):
+        data = json.dumps({"error": message}).encode("utf-8")
+        return status, data, dict(headers or {}, **{"Content-Type": "application/json; charset=utf-8"})
+
+    async def _send_error(
+        self,
+        writer: asyncio.StreamWriter,
+        status: HTTPStatus,
+        message: str,
+        keep_alive: bool,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        await self._send(writer, *self._error_body(status, message, headers), keep_alive)
+
+    @staticmethod
+    async def _send(
+        writer: asyncio.StreamWriter,
+        status: HTTPStatus,
+        data: bytes,
+        headers: Dict[str, str],
+        keep_alive: bool,
+    ) -> None:
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        lines.append(f"Content-Length: {len(data)}")
+        lines.append("Connection: " + ("keep-alive" if keep_alive else "close"))
+        lines.extend(f"{name}: {value}" for name, value in CORS_HEADERS)
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + data)
+        await writer.drain()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Background writer for the GDI attempt log (font_debug/gdi_attempts.log).
+
+Render threads only enqueue a small dict; a daemon thread batches records,
+serializes them to JSON lines and rotates the file by size. When the queue
+is full records are dropped (and counted) instead of blocking rendering.
+
+Environment:
+    AE_FONT_ATTEMPT_LOG         all | failures | off   (default: all)
+    AE_FONT_ATTEMPT_LOG_SAMPLE  fraction of records kept, 0.0-1.0 (default: 1.0)
+    AE_FONT_ATTEMPT_LOG_MAX_KB  rotate when the file exceeds this size (default: 2048)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import queue
+import random
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+LEVEL_ALL = "all"
+LEVEL_FAILURES = "failures"
+LEVEL_OFF = "off"
+LEVELS = (LEVEL_ALL, LEVEL_FAILURES, LEVEL_OFF)
+
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024
+DEFAULT_BACKUPS = 2
+DEFAULT_QUEUE_SIZE = 4096
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_FLUSH_INTERVAL = 0.5
+
+_STOP = object()
+
+
+class AttemptLogWriter:
+    """Bounded, batched, rotating JSON-lines writer running on its own thread."""
+
+    def __init__(
+        self,
+        path: Path,
+        level: str = LEVEL_ALL,
+        sample_rate: float = 1.0,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backups: int = DEFAULT_BACKUPS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        debug_callback=None,
+    ) -> None:
+        self.path = Path(path)
+        self.level = level if level in LEVELS else LEVEL_ALL
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.debug = debug_callback or (lambda msg: None)
+        self.written = 0
+        self.dropped = 0
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        if self.enabled:
+            self._thread = threading.Thread(target=self._run, name="attempt-log", daemon=True)
+            self._thread.start()
+
+    @classmethod
+    def from_env(cls, path: Path, debug_callback=None) -> "AttemptLogWriter":
+        level = os.environ.get("AE_FONT_ATTEMPT_LOG", LEVEL_ALL).strip().lower()
+        try:
+            sample_rate = float(os.environ.get("AE_FONT_ATTEMPT_LOG_SAMPLE", "1.0"))
+        except ValueError:
+            sample_rate = 1.0
+        try:
+            max_bytes = int(os.environ.get("AE_FONT_ATTEMPT_LOG_MAX_KB", "0")) * 1024
+        except ValueError:
+            max_bytes = 0
+        return cls(
+            path,
+            level=level,
+            sample_rate=sample_rate,
+            max_bytes=max_bytes or DEFAULT_MAX_BYTES,
+            debug_callback=debug_callback,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.level != LEVEL_OFF and self.sample_rate > 0.0
+
+    def submit(self, record: Dict[str, object]) -> bool:
+        """Queue ``record`` without blocking. Returns False if it was filtered or dropped."""
+        if not self.enabled:
+            return False
+        if self.level == LEVEL_FAILURES and record.get("status") == "success":
+            return False
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return False
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Flush pending records and stop the writer thread."""
+        if not self._thread:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch: List[Dict[str, object]] = []
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)  # type: ignore[arg-type]
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._write_batch(batch)
+
+    def _write_batch(self, batch: List[Dict[str, object]]) -> None:
+        try:
+            data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in batch)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._rotate_if_needed(len(data.encode("utf-8")))
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(data)
+            self.written += len(batch)
+        except Exception as exc:
+            self.debug(f"Failed to write GDI attempt log: {exc}")
+
+    def _rotate_if_needed(self, incoming: int) -> None:
+        try:
+            size = self.path.stat().st_size
+        except OSError:
+            return
+        if size + incoming <= self.max_bytes:
+            return
+        for index in range(self.backups, 0, -1):
+            source = self.path if index == 1 else self.path.with_name(f"{self.path.name}.{index - 1}")
+            target = self.path.with_name(f"{self.path.name}.{index}")
+            if source.exists():
+                os.replace(source, target)
+        if self.backups <= 0:
+            self.path.unlink()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: one sprite sheet vs. individual PNGs for a page of previews.
+
+Renders a page of --rows previews with the Pillow backend over the font
+files found by font_scanner (families are cycled to fill the page), then
+compares the "previews" payload as N PNGs against a single atlas PNG:
+
+* server: extra time to build the atlas (decode, pack, encode)
+* payload: base64 bytes of the images either way
+* client: time to decode N PNGs vs. one atlas (Pillow stands in for the
+  panel's image decoder)
+* packing: sprite area / sheet area
+
+Usage:
+    python benchmarks/bench_atlas.py [--rows 50,200] [--width 360]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from itertools import cycle, islice
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("AE_FONT_RENDERER", "pil")
+
+from attempt_log import LEVEL_OFF, AttemptLogWriter  # noqa: E402
+from font_registry import FontRegistry  # noqa: E402
+from pil_renderer import Image  # noqa: E402
+from preview_service import PreviewService  # noqa: E402
+from png_data import decode_data_url  # noqa: E402
+from sprite_atlas import build_atlas  # noqa: E402
+
+TEXTS = ("다람쥐 헌 쳇바퀴에 타고파", "The quick brown fox jumps over the lazy dog", "0123456789 !@#$%")
+
+
+def best_of(rounds: int, func) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="50,200")
+    parser.add_argument("--width", type=int, default=360, help="row width; 0 = natural width per preview")
+    parser.add_argument("--size", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    if Image is None:
+        print("Pillow is required: pip install Pillow")
+        sys.exit(1)
+
+    registry = FontRegistry()
+    families = [meta for meta in registry.fonts if meta.faces]
+    if not families:
+        print("No file-backed font families found.")
+        return
+    service = PreviewService(
+        registry,
+        cache_size=0,
+        attempt_log=AttemptLogWriter(Path("font_debug") / "gdi_attempts.log", level=LEVEL_OFF),
+        workers=0,
+    )
+    print(f"{len(families)} file-backed families, width={args.width}, size={args.size}")
+
+    for rows in (int(value) for value in args.rows.split(",")):
+        previews = []
+        for index, (meta, text) in enumerate(islice(zip(cycle(families), cycle(TEXTS)), rows)):
+            entry = {"name": meta.primary_name, "width": args.width, "requestId": f"row{index}"}
+            preview = service.render_entry(entry, text, args.size)
+            if preview:
+                previews.append(preview)
+
+        atlas = build_atlas(previews)
+        build = best_of(args.rounds, lambda: build_atlas(previews))
+        decode_each = best_of(args.rounds, lambda: [decode_data_url(preview["image"]) for preview in previews])
+        decode_atlas = best_of(args.rounds, lambda: decode_data_url(atlas["image"]))
+
+        individual_bytes = sum(len(preview["image"]) for preview in previews)
+        sprite_area = sum(rect[2] * rect[3] for rect in atlas["rects"].values())
+        sheet_area = atlas["width"] * atlas["height"]
+        print(f"\n{len(previews)} rows -> atlas {atlas['width']}x{atlas['height']}, "
+              f"packing {sprite_area / sheet_area:.0%}")
+        print(f"  payload   individual {individual_bytes / 1024:8.1f} KiB   atlas {len(atlas['image']) / 1024:8.1f} KiB")
+        print(f"  decode    individual {decode_each * 1000:8.2f} ms    atlas {decode_atlas * 1000:8.2f} ms"
+              f"   ({len(previews)} decodes -> 1)")
+        print(f"  server    atlas build {build * 1000:8.2f} ms")
+    service.close()
+
+
+if __name__ == "__main__":
+    main()
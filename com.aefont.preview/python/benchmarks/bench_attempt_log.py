@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cost of GDI attempt logging on the batch hot path.
+
+Simulates the logging done while rendering a batch (one record per render
+attempt) and compares:
+  off    - logging disabled
+  sync   - the previous behaviour: mkdir + open(append) + write per attempt
+  async  - AttemptLogWriter (enqueue only; the writer thread does the I/O)
+
+Usage:
+    python benchmarks/bench_attempt_log.py [--batch 200] [--attempts 2] [--rounds 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from attempt_log import LEVEL_OFF, AttemptLogWriter  # noqa: E402
+
+
+def _record(index: int) -> dict:
+    return {
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "requestName": f"Sample Font {index}",
+        "faceTried": f"Sample Font {index}",
+        "actualFace": f"Sample Font {index}",
+        "status": "success",
+        "source": "request",
+        "width": 320,
+        "style": "Regular",
+        "pythonKey": f"samplefont{index}",
+    }
+
+
+def _sync_write(log_dir: Path, record: dict) -> None:
+    log_dir.mkdir(exist_ok=True)
+    with (log_dir / 'gdi_attempts.log').open('a', encoding='utf-8') as handle:
+        handle.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def _time_batches(log_one, batch: int, attempts: int, rounds: int) -> list:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for index in range(batch * attempts):
+            log_one(_record(index))
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch", type=int, default=200, help="entries per batch")
+    parser.add_argument("--attempts", type=int, default=2, help="render attempts per entry")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_dir = Path(tmp) / "font_debug"
+        off = AttemptLogWriter(log_dir / "off.log", level=LEVEL_OFF)
+        writer = AttemptLogWriter(log_dir / "gdi_attempts_async.log")
+
+        modes = {
+            "off": lambda record: off.submit(record),
+            "sync": lambda record: _sync_write(log_dir, record),
+            "async": lambda record: writer.submit(record),
+        }
+        print(f"batch={args.batch} attempts/entry={args.attempts} rounds={args.rounds}")
+        for name, log_one in modes.items():
+            timings = _time_batches(log_one, args.batch, args.attempts, args.rounds)
+            print(
+                f"  {name:<6} median {statistics.median(timings):8.3f} ms/batch"
+                f"   max {max(timings):8.3f} ms"
+            )
+        writer.close()
+        print(f"  async writer: written={writer.written} dropped={writer.dropped}")
+
+
+if __name__ == "__main__":
+    main()
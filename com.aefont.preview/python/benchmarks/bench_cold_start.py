@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold start of font_server, from process spawn to useful answers.
+
+Each run launches a fresh server process (``python font_server.py`` or the
+built exe via --exe) on a free port and measures, from the spawn:
+
+* ping     first 200 from GET /ping (the panel starts talking after this)
+* ready    first /ping reporting "ready": true (catalog built)
+* fonts    GET /fonts answered
+* batch    first POST /batch-preview of --batch-size catalog entries answered
+
+Runs with the Pillow renderer (AE_FONT_RENDERER=pil) unless the environment
+says otherwise, so it works on Linux; the server's cwd is a temp dir, so
+nothing is written to font_debug/. --fast-start sets AE_FONT_FAST_START=1,
+--compare runs both modes.
+
+The medians are checked against --budget-ping-ms / --budget-batch-ms and the
+script exits with status 1 when a budget is exceeded, so it can gate CI.
+
+Usage:
+    python benchmarks/bench_cold_start.py [--runs 5] [--fast-start | --compare]
+    python benchmarks/bench_cold_start.py --exe ../bin/win/font_server/font_server.exe
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SERVER_SCRIPT = Path(__file__).resolve().parent.parent / "font_server.py"
+TEXT = "다람쥐 헌 쳇바퀴에 타고파 The quick brown fox"
+POLL_INTERVAL = 0.005
+STEPS = ("ping", "ready", "fonts", "batch")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def request(port: int, method: str, path: str, body: Optional[Dict[str, object]] = None,
+            timeout: float = 120.0) -> Tuple[int, Dict[str, object]]:
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    try:
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        connection.request(method, path, body=data, headers={"Content-Type": "application/json"} if data else {})
+        response = connection.getresponse()
+        payload = response.read()
+        return response.status, json.loads(payload) if payload else {}
+    finally:
+        connection.close()
+
+
+def cold_start(command: List[str], env: Dict[str, str], args: argparse.Namespace) -> Dict[str, float]:
+    """One spawn; returns milliseconds from spawn to each step."""
+    port = free_port()
+    times: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory(prefix="aefont-cold-") as workdir:
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            command + [str(port)], cwd=workdir, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        elapsed = lambda: (time.perf_counter() - started) * 1000  # noqa: E731
+        try:
+            deadline = time.perf_counter() + args.timeout
+            while "ready" not in times:
+                if process.poll() is not None:
+                    raise RuntimeError(f"server exited with status {process.returncode}")
+                if time.perf_counter() > deadline:
+                    raise RuntimeError("server did not become ready in time")
+                try:
+                    status, payload = request(port, "GET", "/ping", timeout=args.timeout)
+                except OSError:
+                    time.sleep(POLL_INTERVAL)
+                    continue
+                if status == 200:
+                    times.setdefault("ping", elapsed())
+                    # Servers without fast start only listen once the catalog exists.
+                    if payload.get("ready", True):
+                        times["ready"] = elapsed()
+                        break
+                time.sleep(POLL_INTERVAL)
+
+            status, payload = request(port, "GET", f"/fonts?fields=name&limit={args.batch_size}")
+            if status != 200:
+                raise RuntimeError(f"/fonts answered {status}")
+            times["fonts"] = elapsed()
+
+            fonts = [
+                {"name": font["name"], "requestId": str(index), "width": args.width}
+                for index, font in enumerate(payload.get("fonts") or [])
+            ]
+            status, payload = request(port, "POST", "/batch-preview", {"fonts": fonts, "text": TEXT, "size": args.size})
+            if status != 200:
+                raise RuntimeError(f"/batch-preview answered {status}")
+            times["batch"] = elapsed()
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+    return times
+
+
+def run_mode(label: str, command: List[str], env: Dict[str, str], args: argparse.Namespace) -> Dict[str, float]:
+    runs = [cold_start(command, env, args) for _ in range(args.runs)]
+    medians = {step: statistics.median(run[step] for run in runs) for step in STEPS}
+    print(f"\n{label}: {args.runs} cold starts")
+    print(f"  {'step':<8} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+    for step in STEPS:
+        values = [run[step] for run in runs]
+        print(f"  {step:<8} {medians[step]:10.1f} {min(values):10.1f} {max(values):10.1f}")
+    return medians
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--exe", help="server executable to launch (default: this Python + font_server.py)")
+    parser.add_argument("--runs", type=int, default=5)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--fast-start", action="store_true", help="launch with AE_FONT_FAST_START=1")
+    mode.add_argument("--compare", action="store_true", help="run with and without fast start")
+    parser.add_argument("--batch-size", type=int, default=40)
+    parser.add_argument("--width", type=int, default=360)
+    parser.add_argument("--size", type=int, default=24)
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for each server")
+    parser.add_argument("--budget-ping-ms", type=float, default=1000.0, help="median spawn -> /ping budget")
+    parser.add_argument("--budget-batch-ms", type=float, default=5000.0, help="median spawn -> first batch budget")
+    args = parser.parse_args()
+
+    command = [args.exe] if args.exe else [sys.executable, str(SERVER_SCRIPT)]
+    env = dict(os.environ)
+    env.setdefault("AE_FONT_RENDERER", "pil")
+    env.setdefault("AE_FONT_ATTEMPT_LOG", "off")
+    env.setdefault("AE_FONT_WATCH_INTERVAL", "0")
+    print(f"server: {' '.join(command)} (renderer {env['AE_FONT_RENDERER']})")
+
+    modes = [("fast start", "1")] if args.fast_start else [("default", "0")]
+    if args.compare:
+        modes = [("default", "0"), ("fast start", "1")]
+    failed = False
+    for label, fast in modes:
+        medians = run_mode(label, command, dict(env, AE_FONT_FAST_START=fast), args)
+        for step, budget in (("ping", args.budget_ping_ms), ("batch", args.budget_batch_ms)):
+            if medians[step] > budget:
+                print(f"  BUDGET EXCEEDED: {step} {medians[step]:.1f} ms > {budget:.0f} ms")
+                failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
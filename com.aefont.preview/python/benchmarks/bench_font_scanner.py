@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark: font_scanner over thousands of font files.
+
+Compares the mmap scanner (reads only the table directory, `name`, `OS/2`
+and `head`) with reading every file completely before parsing. Use
+--copies to replicate the discovered fonts into a temporary tree so the
+scan covers thousands of files even on a box with few fonts installed.
+
+Usage:
+    python benchmarks/bench_font_scanner.py [DIR ...] [--copies 50]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from font_scanner import (  # noqa: E402
+    _parse_faces,
+    default_font_directories,
+    iter_font_files,
+    scan_directories,
+)
+
+
+def _read_whole_files(directories) -> int:
+    faces = 0
+    for path in iter_font_files(directories):
+        try:
+            data = Path(path).read_bytes()
+        except OSError:
+            continue
+        faces += len(_parse_faces(path, data))
+    return faces
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dirs", nargs="*", default=default_font_directories())
+    parser.add_argument("--copies", type=int, default=1, help="replicate the font set N times")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    sources = list(iter_font_files(args.dirs))
+    if not sources:
+        print("No font files found in: " + ", ".join(args.dirs))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directories = args.dirs
+        if args.copies > 1:
+            for copy in range(args.copies):
+                target = Path(tmp, f"copy{copy:04d}")
+                target.mkdir()
+                for index, source in enumerate(sources):
+                    shutil.copyfile(source, target / f"{index:05d}{Path(source).suffix}")
+            directories = [tmp]
+
+        files = sum(1 for _ in iter_font_files(directories))
+        size_mb = sum(os.path.getsize(path) for path in iter_font_files(directories)) / (1024 * 1024)
+        print(f"{files} files, {size_mb:.1f} MB")
+
+        for label, scan in (
+            ("mmap scan", lambda: len(scan_directories(directories))),
+            ("full read", lambda: _read_whole_files(directories)),
+        ):
+            best = float("inf")
+            faces = 0
+            for _ in range(args.rounds):
+                start = time.perf_counter()
+                faces = scan()
+                best = min(best, time.perf_counter() - start)
+            print(f"  {label:<10} {best * 1000:9.1f} ms   {files / best:8.0f} files/s   faces={faces}")
+
+
+if __name__ == "__main__":
+    main()
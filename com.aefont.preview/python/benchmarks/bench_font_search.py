@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark: FontSearchIndex against a linear substring scan.
+
+Builds a synthetic catalog of --families entries whose names mix Latin
+words, Hangul syllables and numeric prefixes (plus the families of the
+newest font_catalog_*.json dump, if any), then times index construction,
+incremental add/remove and per-query latency for a mix of prefix,
+substring, Hangul, initial-consonant and misspelled queries. The linear
+scan is the `query in name.lower()` loop the panel and font_preview.py
+use today.
+
+Usage:
+    python benchmarks/bench_font_search.py [--families 12000] [--queries 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from font_registry import FontMeta  # noqa: E402
+from font_search import FontSearchIndex  # noqa: E402
+
+LATIN = ["sans", "serif", "gothic", "mono", "round", "display", "text", "neo", "nanum", "noto", "source",
+         "pro", "std", "code", "hand", "brush", "myeongjo", "batang", "dotum", "square", "barun", "spoqa"]
+HANGUL = ["고딕", "명조", "바탕", "돋움", "나눔", "손글씨", "둥근", "산돌", "아람", "붓", "펜", "맑은", "본", "윤"]
+SYLLABLES = ["ka", "ro", "mi", "su", "te", "la", "vo", "ne", "qui", "zen", "bri", "sto", "lux", "fa", "gor"]
+HANGUL_SYLLABLES = "가나다라마바사아자차카타파하고노도로모보소오조초코토포호윤솔별빛꽃달"
+
+
+def _pseudo_word(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3)))
+
+
+def synthetic_fonts(count: int, seed: int) -> List[FontMeta]:
+    """Families named like a large font-manager library: one distinctive word plus stock words."""
+    rng = random.Random(seed)
+    fonts: List[FontMeta] = []
+    seen = set()
+    while len(fonts) < count:
+        words = [_pseudo_word(rng)] + rng.sample(LATIN, rng.randint(0, 2))
+        latin = " ".join(words).title()
+        if rng.random() < 0.3:
+            latin = f"{rng.randint(1, 999):03d}{latin.replace(' ', '')}"
+        own = "".join(rng.choice(HANGUL_SYLLABLES) for _ in range(rng.randint(2, 3)))
+        hangul = " ".join([own] + rng.sample(HANGUL, rng.randint(0, 2)))
+        gdi_name = f"{latin} {rng.randint(1, 99)}"
+        if gdi_name in seen:
+            continue
+        seen.add(gdi_name)
+        fonts.append(FontMeta(gdi_name, gdi_name, {hangul}, {"ko": hangul}))
+    return fonts
+
+
+def dump_fonts() -> List[FontMeta]:
+    dumps = sorted((ROOT / "font_debug").glob("font_catalog_*.json"))
+    if not dumps:
+        return []
+    catalog = json.loads(dumps[-1].read_text(encoding="utf-8"))
+    return [
+        FontMeta(entry["name"], entry.get("gdiName") or entry["name"], set(entry.get("aliases") or ()),
+                 entry.get("languageNames") or {})
+        for entry in catalog
+    ]
+
+
+def make_queries(fonts: List[FontMeta], count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    queries: List[str] = []
+    for _ in range(count):
+        name = rng.choice(sorted(rng.choice(fonts).aliases))
+        kind = rng.random()
+        if kind < 0.3:
+            queries.append(name[:rng.randint(1, 4)])
+        elif kind < 0.6 and len(name) > 6:
+            start = rng.randint(0, len(name) - 5)
+            queries.append(name[start:start + rng.randint(3, 5)])
+        elif kind < 0.8:
+            queries.append(rng.choice(HANGUL + ["ㄱㄷ", "ㅁㅈ", "ㄴㄴ"]))
+        else:
+            chars = list(name.lower())
+            del chars[rng.randrange(len(chars))]
+            queries.append("".join(chars))
+    return queries
+
+
+def _percentiles(samples: List[float]) -> str:
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return f"p50 {statistics.median(ordered) * 1000:7.3f} ms   p99 {p99 * 1000:7.3f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--families", type=int, default=12000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    fonts = dump_fonts() + synthetic_fonts(args.families, args.seed)
+    names = sum(len(meta.aliases) for meta in fonts)
+    queries = make_queries(fonts, args.queries, args.seed)
+    print(f"{len(fonts)} families, {names} names, {len(queries)} queries")
+
+    start = time.perf_counter()
+    index = FontSearchIndex(fonts)
+    print(f"  build            {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    churn = fonts[:200]
+    start = time.perf_counter()
+    index.apply_changes([], churn)
+    index.apply_changes(churn, [])
+    print(f"  remove+add 200   {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    lowered = [(meta, [alias.lower() for alias in meta.aliases]) for meta in fonts]
+
+    def linear(query: str) -> List[FontMeta]:
+        needle = query.lower()
+        return [meta for meta, aliases in lowered if any(needle in alias for alias in aliases)]
+
+    for label, run in (("linear scan", linear), ("n-gram index", index.search)):
+        samples = []
+        for query in queries:
+            start = time.perf_counter()
+            run(query)
+            samples.append(time.perf_counter() - start)
+        print(f"  {label:<16} {_percentiles(samples)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark: `name` table parsing, legacy per-field struct.unpack vs font_tables.
+
+Collects the real `name` tables of every font file found in the given
+directories (system font folders by default), checks that both parsers
+produce identical localized family names, then times them.
+
+Usage:
+    python benchmarks/bench_name_table.py [DIR ...] [--rounds 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from font_scanner import default_font_directories, iter_font_files  # noqa: E402
+from font_tables import (  # noqa: E402
+    LANG_MAP,
+    face_offsets,
+    localized_names,
+    table_directory,
+)
+
+
+# ----------------------------------------------------------------------
+# Reference: the parser font_inspector used before font_tables existed.
+# ----------------------------------------------------------------------
+def _legacy_iter_name_records(name_table: bytes) -> Iterable[Dict]:
+    if len(name_table) < 6:
+        return
+    count = struct.unpack(">H", name_table[2:4])[0]
+    string_offset = struct.unpack(">H", name_table[4:6])[0]
+
+    offset = 6
+    for _ in range(count):
+        if offset + 12 > len(name_table):
+            break
+        platform_id = struct.unpack(">H", name_table[offset : offset + 2])[0]
+        encoding_id = struct.unpack(">H", name_table[offset + 2 : offset + 4])[0]
+        language_id = struct.unpack(">H", name_table[offset + 4 : offset + 6])[0]
+        name_id = struct.unpack(">H", name_table[offset + 6 : offset + 8])[0]
+        length = struct.unpack(">H", name_table[offset + 8 : offset + 10])[0]
+        str_offset = struct.unpack(">H", name_table[offset + 10 : offset + 12])[0]
+        offset += 12
+
+        start = string_offset + str_offset
+        end = start + length
+        if start < 0 or end > len(name_table):
+            continue
+        payload = name_table[start:end]
+        yield {
+            "platform": platform_id,
+            "encoding": encoding_id,
+            "language": language_id,
+            "name_id": name_id,
+            "data": payload,
+        }
+
+
+def _legacy_localized_names(name_table: bytes) -> Dict[str, str]:
+    names: Dict[str, str] = {}
+    for record in _legacy_iter_name_records(name_table):
+        if record["name_id"] != 1:
+            continue
+        text = None
+        if record["platform"] == 3:
+            try:
+                text = record["data"].decode("utf-16-be")
+            except Exception:
+                text = None
+            lang = LANG_MAP.get(record["language"], f"win-{record['language']:04x}")
+        elif record["platform"] == 1:
+            for encoding in ("mac_roman", "latin-1", "utf-8"):
+                try:
+                    text = record["data"].decode(encoding)
+                    break
+                except Exception:
+                    continue
+            lang = f"mac-{record['language']:04x}"
+        else:
+            lang = f"p{record['platform']}-{record['language']:04x}"
+        if text:
+            names[lang] = text
+    return names
+
+
+def collect_name_tables(directories: Iterable[str]) -> List[bytes]:
+    tables: List[bytes] = []
+    for path in iter_font_files(directories):
+        try:
+            data = Path(path).read_bytes()
+        except OSError:
+            continue
+        for face_offset in face_offsets(data):
+            location = table_directory(data, face_offset).get(b"name")
+            if location:
+                offset, length = location
+                tables.append(data[offset:offset + length])
+    return tables
+
+
+def _time(parse, tables: List[bytes], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for table in tables:
+            parse(table)
+    return (time.perf_counter() - start) / rounds * 1000.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dirs", nargs="*", default=default_font_directories())
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    tables = collect_name_tables(args.dirs)
+    if not tables:
+        print("No fonts with a name table found in: " + ", ".join(args.dirs))
+        return
+
+    mismatches = sum(1 for table in tables if _legacy_localized_names(table) != localized_names(table))
+    records = sum(struct.unpack(">H", table[2:4])[0] for table in tables if len(table) >= 6)
+    print(f"{len(tables)} name tables, {records} records, mismatches={mismatches}")
+
+    legacy_ms = _time(_legacy_localized_names, tables, args.rounds)
+    fast_ms = _time(localized_names, tables, args.rounds)
+    print(f"  legacy  {legacy_ms:8.3f} ms/pass")
+    print(f"  fast    {fast_ms:8.3f} ms/pass   ({legacy_ms / fast_ms:.1f}x)")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
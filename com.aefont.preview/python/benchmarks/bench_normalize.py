@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Benchmark: name normalization work per /batch-preview request.
+
+Replays the lookups render_entry performs for every batch entry (candidate
+de-duplication, registry.find, attempt de-duplication, the renderer's
+alias-set check and the result key) twice: once the way the registry used
+to do it -- uncached normalize() and FontMeta.key/normalized_aliases
+recomputed on each access -- and once against font_registry as it is now
+(memoized normalize, keys fixed at construction, one alias index). GDI
+calls are left out; only the CPU spent on names is measured.
+
+The catalog comes from the newest font_catalog_*.json dump, the batch
+entries from the newest cep_fonts_*.json dump (or the given files).
+
+Usage:
+    python benchmarks/bench_normalize.py [--catalog F] [--cep F] [--batch 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("AE_FONT_SCAN_FILES", "0")
+
+import font_registry  # noqa: E402
+from font_registry import FontRegistry  # noqa: E402
+
+
+# ----------------------------------------------------------------------
+# Reference: normalization as the registry did it before precomputation.
+# ----------------------------------------------------------------------
+def legacy_normalize(value) -> str:
+    if not value and value != 0:
+        return ""
+    lowered = str(value).lower().strip()
+    lowered = lowered.replace("\u3000", " ")
+    lowered = lowered.lstrip("@")
+    return "".join(ch for ch in lowered if ch.isalnum())
+
+
+def legacy_normalize_face_name(name) -> str:
+    if not name:
+        return ''
+    return ''.join(ch.lower() for ch in str(name).strip() if ch.isalnum())
+
+
+class LegacyMeta:
+    def __init__(self, primary_name: str, gdi_name: str, aliases: Set[str]) -> None:
+        self.primary_name = primary_name
+        self.gdi_name = gdi_name
+        self.aliases = set(aliases) | {primary_name, gdi_name}
+
+    @property
+    def key(self) -> str:
+        return legacy_normalize(self.gdi_name)
+
+    @property
+    def normalized_aliases(self) -> Set[str]:
+        return {legacy_normalize(alias) for alias in self.aliases if legacy_normalize(alias)}
+
+
+class LegacyRegistry:
+    def __init__(self, records: List[LegacyMeta]) -> None:
+        self._by_key: Dict[str, LegacyMeta] = {}
+        for meta in records:
+            keys = {meta.key} | meta.normalized_aliases
+            if any(key in self._by_key for key in keys):
+                continue
+            for key in keys:
+                if key:
+                    self._by_key[key] = meta
+
+    def find(self, name) -> Optional[LegacyMeta]:
+        if not name and name != 0:
+            return None
+        return self._by_key.get(legacy_normalize(name))
+
+
+# ----------------------------------------------------------------------
+class CatalogEnumerator:
+    """Feeds FontRegistry the families of a catalog dump instead of GDI."""
+
+    def __init__(self, catalog: List[Dict]) -> None:
+        self._names = {entry.get("gdiName") or entry["name"]: entry.get("languageNames") or {} for entry in catalog}
+
+    def enumerate_all_fonts(self) -> List[str]:
+        return sorted(self._names)
+
+    def get_localized_family_names(self, face_name: str) -> Dict[str, str]:
+        return dict(self._names.get(face_name, {}))
+
+
+def batch_lookups(entries: List[Dict], find, norm, norm_face) -> int:
+    """The name handling of PreviewService.render_entry, minus rendering."""
+    resolved = 0
+    for entry in entries:
+        raw_aliases = entry.get("aliases") or []
+        candidates: List[str] = []
+        seen: Set[str] = set()
+        for value in (entry.get("name"), *raw_aliases, entry.get("postScriptName"), entry.get("family")):
+            candidate = str(value or "").strip()
+            if candidate and norm(candidate) not in seen:
+                seen.add(norm(candidate))
+                candidates.append(candidate)
+
+        attempted: Set[str] = set()
+        for candidate in candidates:
+            record = find(candidate)
+            for face_name in (candidate, record.gdi_name if record else None):
+                if not face_name or norm(face_name) in attempted:
+                    continue
+                attempted.add(norm(face_name))
+                alias_names = set(candidates) | ({*record.aliases} if record else set())
+                alias_norms = {norm_face(face_name)} | {norm_face(alias) for alias in alias_names}
+                if record:
+                    resolved += record.key in alias_norms
+                    resolved += bool(record.key)
+    return resolved
+
+
+def _newest(pattern: str) -> Optional[Path]:
+    found = sorted((ROOT / "font_debug").glob(pattern))
+    return found[-1] if found else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--catalog", type=Path, default=_newest("font_catalog_*.json"))
+    parser.add_argument("--cep", type=Path, default=_newest("cep_fonts_*.json"))
+    parser.add_argument("--batch", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    if not args.catalog or not args.cep:
+        print("Need a font_catalog_*.json and a cep_fonts_*.json dump in font_debug/.")
+        return
+
+    catalog = json.loads(args.catalog.read_text(encoding="utf-8"))
+    cep = json.loads(args.cep.read_text(encoding="utf-8"))["fonts"]
+    entries = [
+        {
+            "name": font.get("displayName"),
+            "family": font.get("family"),
+            "postScriptName": font.get("postScriptName"),
+            "aliases": [value for value in (font.get("nativeFamily"), font.get("nativeFull")) if value],
+        }
+        for font in cep
+    ]
+    batches = [entries[start:start + args.batch] for start in range(0, len(entries), args.batch)]
+    print(f"{len(catalog)} families from {args.catalog.name}, "
+          f"{len(entries)} entries from {args.cep.name} in {len(batches)} batches of <= {args.batch}")
+
+    start = time.perf_counter()
+    legacy = LegacyRegistry([
+        LegacyMeta(entry["name"], entry.get("gdiName") or entry["name"], set(entry.get("aliases") or ()))
+        for entry in catalog
+    ])
+    legacy_build = (time.perf_counter() - start) * 1000.0
+    start = time.perf_counter()
+    registry = FontRegistry(CatalogEnumerator(catalog))
+    current_build = (time.perf_counter() - start) * 1000.0
+
+    def run(find, norm, norm_face) -> float:
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            for batch in batches:
+                batch_lookups(batch, find, norm, norm_face)
+        return (time.perf_counter() - start) / (args.rounds * len(batches)) * 1000.0
+
+    expected = sum(batch_lookups(batch, legacy.find, legacy_normalize, legacy_normalize_face_name) for batch in batches)
+    actual = sum(batch_lookups(batch, registry.find, font_registry.normalize, font_registry.normalize) for batch in batches)
+    legacy_ms = run(legacy.find, legacy_normalize, legacy_normalize_face_name)
+    current_ms = run(registry.find, font_registry.normalize, font_registry.normalize)
+    print(f"  registry build   legacy {legacy_build:7.2f} ms   current {current_build:7.2f} ms")
+    print(f"  per batch        legacy {legacy_ms:7.3f} ms   current {current_ms:7.3f} ms   "
+          f"({legacy_ms / current_ms:.1f}x)")
+    print(f"  resolved names   legacy {expected}   current {actual}")
+    if expected != actual:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
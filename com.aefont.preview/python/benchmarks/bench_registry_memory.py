@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark: FontRegistry memory and lookup cost for large catalogs.
+
+Builds a registry over a synthetic enumerator of --families families (a
+Latin GDI name, an English name and, for about a third of them, Korean and
+Japanese names; one to four style variants each) with the font-file scan
+off, in a fresh process per size, and reports
+
+* retained  bytes allocated by FontRegistry construction and still held
+            (tracemalloc), per family
+* rss       growth of the resident set while building (untraced build)
+* find      registry.find() on random aliases, per lookup
+* count     len(registry) vs len(registry.fonts) (what /fonts used to do)
+* page      registry.catalog() for one 200-entry page
+
+Usage:
+    python benchmarks/bench_registry_memory.py [--families 2000,10000,30000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["AE_FONT_SCAN_FILES"] = "0"
+
+SYLLABLES = ["ka", "ro", "mi", "su", "te", "la", "vo", "ne", "qui", "zen", "bri", "sto", "lux", "fa", "gor"]
+WORDS = ["Sans", "Serif", "Gothic", "Mono", "Round", "Display", "Text", "Neo", "Pro", "Std", "Code", "Hand"]
+HANGUL = "가나다라마바사아자차카타파하고노도로모보소오조초코토포호윤솔별빛꽃달"
+KANA = "あいうえおかきくけこさしすせそたちつてとなにぬねのまみむめも"
+
+
+class SyntheticEnumerator:
+    """Stands in for FontEnumerator / ScannedFontEnumerator with generated families."""
+
+    def __init__(self, count: int, seed: int = 7) -> None:
+        rng = random.Random(seed)
+        self._families: List[str] = []
+        self._localized: Dict[str, Dict[str, str]] = {}
+        self._styles: Dict[str, List[tuple]] = {}
+        self.faces: list = []
+        while len(self._families) < count:
+            word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).title()
+            name = f"{word} {' '.join(rng.sample(WORDS, rng.randint(0, 2)))} {rng.randint(1, 999)}".replace("  ", " ")
+            if name in self._localized:
+                continue
+            names = {"en": name}
+            if rng.random() < 0.35:
+                names["ko"] = "".join(rng.choice(HANGUL) for _ in range(rng.randint(2, 5))) + " 고딕"
+                names["ja"] = "".join(rng.choice(KANA) for _ in range(rng.randint(2, 5)))
+            self._families.append(name)
+            self._localized[name] = names
+            self._styles[name] = [(weight, italic, 1) for weight, italic in
+                                  rng.sample([(400, 0), (700, 0), (400, 1), (700, 1), (300, 0)], rng.randint(1, 4))]
+
+    # Fresh string objects on every call, like names decoded from GDI or a name table.
+    def enumerate_all_fonts(self) -> List[str]:
+        return [(name + " ")[:-1] for name in self._families]
+
+    def get_localized_family_names(self, face_name: str) -> Dict[str, str]:
+        return {(lang + " ")[:-1]: (name + " ")[:-1] for lang, name in self._localized.get(face_name, {}).items()}
+
+    def get_style_variants(self, face_name: str):
+        from font_name_resolver import StyleVariants
+
+        return StyleVariants(self._styles.get(face_name, ()))
+
+
+def resident_bytes() -> int:
+    """Current resident set size (Linux /proc, else psutil if installed, else 0)."""
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return 0
+    return psutil.Process().memory_info().rss
+
+
+def per_call(func, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - started) / calls
+
+
+def measure(count: int) -> Dict[str, float]:
+    from font_registry import FontRegistry
+
+    enumerator = SyntheticEnumerator(count)
+    rss_before = resident_bytes()
+    registry = FontRegistry(enumerator)
+    rss_after = resident_bytes()
+    # A second build under tracemalloc (which would inflate the resident set above).
+    tracemalloc.start()
+    traced = FontRegistry(enumerator)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del traced
+
+    rng = random.Random(11)
+    names = [rng.choice([meta.primary_name, *meta.aliases]) for meta in rng.choices(registry.fonts, k=5000)]
+    iterator = iter(names * 20)
+    return {
+        "retained": retained,
+        "rss": max(0, rss_after - rss_before),
+        "find": per_call(lambda: registry.find(next(iterator)), 100000),
+        "count": per_call(lambda: len(registry), 2000) if hasattr(type(registry), "__len__") else float("nan"),
+        "count_copy": per_call(lambda: len(registry.fonts), 2000),
+        "page": per_call(lambda: registry.catalog(None, 0, 200), 50),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--families", default="2000,10000,30000")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child)))
+        return
+
+    print(f"  {'families':>8} {'retained MiB':>12} {'B/family':>9} {'rss MiB':>8} {'find us':>8} "
+          f"{'len() us':>9} {'len(fonts) us':>14} {'page ms':>8}")
+    for count in (int(value) for value in args.families.split(",")):
+        output = subprocess.run([sys.executable, __file__, "--child", str(count)],
+                                check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"  {count:8d} {result['retained'] / 2**20:12.1f} {result['retained'] / count:9.0f} "
+              f"{result['rss'] / 2**20:8.1f} {result['find'] * 1e6:8.2f} {result['count'] * 1e6:9.3f} "
+              f"{result['count_copy'] * 1e6:14.2f} {result['page'] * 1000:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /batch-preview throughput with 0/1/2/4/8 render worker processes.
+
+Uses the Pillow backend (AE_FONT_RENDERER=pil, the renderer used off
+Windows) over the font files found by font_scanner, so it runs on Linux.
+Every file-backed family is cycled until the batch holds --batch entries;
+the preview cache is disabled so every entry is really rendered. "0"
+workers is the in-process path. Warm-up (spawning the workers and building
+their registries) is reported separately from batch time.
+
+Usage:
+    python benchmarks/bench_render_farm.py [--batch 500] [--workers 0,1,2,4,8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from itertools import cycle, islice
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("AE_FONT_RENDERER", "pil")
+
+from attempt_log import LEVEL_OFF, AttemptLogWriter  # noqa: E402
+from font_registry import FontRegistry  # noqa: E402
+from pil_renderer import Image  # noqa: E402
+from preview_service import FARM_MIN_BATCH, PreviewService  # noqa: E402
+
+TEXT = "다람쥐 헌 쳇바퀴에 타고파 The quick brown fox"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--workers", default="0,1,2,4,8")
+    parser.add_argument("--size", type=int, default=32)
+    parser.add_argument("--width", type=int, default=360)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    if Image is None:
+        print("Pillow is required: pip install Pillow")
+        sys.exit(1)
+    if args.batch < FARM_MIN_BATCH:
+        print(f"--batch must be >= AE_FONT_RENDER_FARM_MIN_BATCH ({FARM_MIN_BATCH}) to use the workers")
+        sys.exit(1)
+
+    registry = FontRegistry()
+    families = [meta for meta in registry.fonts if meta.faces]
+    if not families:
+        print("No file-backed font families found.")
+        return
+    entries = [
+        {"name": meta.primary_name, "width": args.width, "requestId": f"{index}"}
+        for index, meta in enumerate(islice(cycle(families), args.batch))
+    ]
+    print(f"{len(families)} file-backed families, batch of {len(entries)}, {os.cpu_count()} CPUs")
+
+    baseline = None
+    for workers in (int(value) for value in args.workers.split(",")):
+        service = PreviewService(
+            registry,
+            cache_size=0,
+            attempt_log=AttemptLogWriter(Path("font_debug") / "gdi_attempts.log", level=LEVEL_OFF),
+            workers=workers,
+        )
+        warm = 0.0
+        if service.farm is not None:
+            start = time.perf_counter()
+            service.farm.start()
+            warm = time.perf_counter() - start
+
+        best = float("inf")
+        rendered = 0
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            rendered = len(service.render_batch(entries, TEXT, args.size))
+            best = min(best, time.perf_counter() - start)
+        service.close()
+
+        rate = len(entries) / best
+        baseline = baseline or rate
+        print(f"  workers={workers:<2} warm-up {warm * 1000:7.0f} ms   batch {best * 1000:8.1f} ms   "
+              f"{rate:7.1f} previews/s   x{rate / baseline:4.2f}   rendered={rendered}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Benchmark: shared-memory ring vs. HTTP body for /batch-preview pixels.
+
+Starts a font_server (Pillow renderer, temp cwd and lock dir) on a free
+port, renders one --batch-size batch to warm the preview cache (entries
+cycle through the catalog with distinct widths so every preview is its own
+PNG), then repeats the same batch with each transport:
+
+* http  images inline as base64 data URLs; the client parses the JSON and
+        decodes every image to PNG bytes
+* shm   "transport": "shm"; the client parses the descriptors and copies
+        every PNG out of the ring (preview_ring.RingReader), checking the
+        slot generations
+
+Both end with the same PNG bytes in the client, so the numbers compare
+complete transports: client wall time per batch, response body size, the
+server's json / ring stages (Server-Timing), and torn reads (should be 0
+with a ring larger than the batch).
+
+Usage:
+    python benchmarks/bench_ring.py [--batch-size 200] [--rounds 30]
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from preview_ring import RingReader  # noqa: E402
+
+SERVER_SCRIPT = Path(__file__).resolve().parent.parent / "font_server.py"
+TEXT = "다람쥐 헌 쳇바퀴에 타고파 The quick brown fox"
+DATA_URL_PREFIX = "data:image/png;base64,"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def post(connection: http.client.HTTPConnection, body: bytes) -> Tuple[int, bytes, Optional[str]]:
+    connection.request("POST", "/batch-preview", body=body, headers={"Content-Type": "application/json"})
+    response = connection.getresponse()
+    return response.status, response.read(), response.getheader("Server-Timing")
+
+
+def stage_ms(server_timing: Optional[str], stage: str) -> float:
+    for part in (server_timing or "").split(","):
+        name, _, duration = part.strip().partition(";dur=")
+        if name == stage and duration:
+            return float(duration)
+    return 0.0
+
+
+def wait_for_server(port: int, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"server exited with status {process.returncode}")
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+            connection.request("GET", "/ping")
+            if connection.getresponse().status == 200:
+                connection.close()
+                return
+        except OSError:
+            time.sleep(0.05)
+    sys.exit("server did not start")
+
+
+def run_transport(port: int, body: bytes, transport: str, rounds: int) -> Dict[str, object]:
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    readers: Dict[str, RingReader] = {}
+    wall: List[float] = []
+    sizes: List[int] = []
+    server_ms: List[float] = []
+    torn = inline = pngs = 0
+    for _ in range(rounds):
+        started = time.perf_counter()
+        status, payload, server_timing = post(connection, body)
+        if status != 200:
+            sys.exit(f"{transport}: /batch-preview answered {status}")
+        data = json.loads(payload)
+        ring = data.get("ring")
+        reader = None
+        if ring is not None:
+            reader = readers.get(ring["path"])
+            if reader is None:
+                reader = readers[ring["path"]] = RingReader(ring["path"])
+        images: List[bytes] = []
+        for preview in data["previews"]:
+            descriptor = preview.get("shm")
+            if descriptor is not None:
+                png = reader.read(descriptor)
+                if png is None:
+                    torn += 1
+                    continue
+                images.append(png)
+            elif isinstance(preview.get("image"), str):
+                inline += transport == "shm"
+                images.append(base64.b64decode(preview["image"][len(DATA_URL_PREFIX):]))
+        wall.append((time.perf_counter() - started) * 1000)
+        sizes.append(len(payload))
+        server_ms.append(stage_ms(server_timing, "json") + stage_ms(server_timing, "ring"))
+        pngs = len(images)
+    connection.close()
+    for reader in readers.values():
+        reader.close()
+    return {
+        "median": statistics.median(wall),
+        "p90": sorted(wall)[int(0.9 * (len(wall) - 1))],
+        "bytes": statistics.median(sizes),
+        "server": statistics.median(server_ms),
+        "pngs": pngs,
+        "torn": torn,
+        "inline": inline,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=30)
+    parser.add_argument("--width", type=int, default=240, help="width of the first entry; each next is 1 px wider")
+    parser.add_argument("--size", type=int, default=24)
+    args = parser.parse_args()
+
+    port = free_port()
+    with tempfile.TemporaryDirectory(prefix="aefont-ring-") as workdir:
+        env = dict(os.environ)
+        env.setdefault("AE_FONT_RENDERER", "pil")
+        env.update(AE_FONT_ATTEMPT_LOG="off", AE_FONT_WATCH_INTERVAL="0", AE_FONT_PREFETCH_RADIUS="0",
+                   AE_FONT_LOCK_DIR=workdir, AE_FONT_PREVIEW_CACHE=str(max(512, args.batch_size * 2)))
+        process = subprocess.Popen([sys.executable, str(SERVER_SCRIPT), str(port)], cwd=workdir, env=env,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_server(port, process)
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+            connection.request("GET", "/fonts?fields=name")
+            names = [font["name"] for font in json.loads(connection.getresponse().read())["fonts"]]
+            if not names:
+                sys.exit("No fonts found.")
+            fonts = [
+                {"name": names[index % len(names)], "requestId": str(index), "width": args.width + index}
+                for index in range(args.batch_size)
+            ]
+            batch = {"fonts": fonts, "text": TEXT, "size": args.size}
+            http_body = json.dumps(batch).encode("utf-8")
+            shm_body = json.dumps(dict(batch, transport="shm")).encode("utf-8")
+            status, _, _ = post(connection, http_body)  # warm the preview cache
+            connection.close()
+            if status != 200:
+                sys.exit(f"warm-up answered {status}")
+
+            print(f"{args.batch_size} previews per batch ({len(names)} families), {args.rounds} rounds, cached renders")
+            print(f"  {'transport':<10} {'median ms':>10} {'p90 ms':>8} {'body KiB':>9} {'server ms':>10} "
+                  f"{'pngs':>5} {'torn':>5} {'inline':>7}")
+            for transport, body in (("http", http_body), ("shm", shm_body)):
+                result = run_transport(port, body, transport, args.rounds)
+                print(f"  {transport:<10} {result['median']:10.2f} {result['p90']:8.2f} "
+                      f"{result['bytes'] / 1024:9.1f} {result['server']:10.2f} "
+                      f"{result['pngs']:5d} {result['torn']:5d} {result['inline']:7d}")
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
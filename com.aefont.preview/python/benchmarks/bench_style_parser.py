@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Benchmark: parse_style_flags / strip_style_suffix over a real font catalog.
+
+Inputs are the newest font_catalog_*.json and cep_fonts_*.json dumps in
+font_debug/ (or files given on the command line). Every (name, style,
+PostScript name) triple is first run through the pre-regex implementations
+kept below; any output that differs is reported and the script exits 1, so
+this doubles as the golden check for the compiled parser.
+
+Usage:
+    python benchmarks/bench_style_parser.py [DUMP.json ...] [--rounds 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from font_name_resolver import parse_style_flags, strip_style_suffix  # noqa: E402
+
+
+# ----------------------------------------------------------------------
+# Reference implementations (before the compiled tokenizer).
+# ----------------------------------------------------------------------
+def legacy_strip_style_suffix(name: str) -> str:
+    if not name:
+        return ''
+    style_keywords = [
+        'thin', 'hairline', 'extralight', 'extra light', 'ultralight', 'ultra light',
+        'light', 'semilight', 'semi light', 'demilight', 'demi light',
+        'book', 'regular', 'normal', 'medium', 'roman',
+        'semibold', 'semi bold', 'demibold', 'demi bold',
+        'bold', 'heavy', 'black', 'extrabold', 'extra bold', 'ultrabold', 'ultra bold',
+        'italic', 'oblique', 'slanted', 'inclined',
+        'condensed', 'compressed', 'narrow', 'extended', 'expanded', 'wide'
+    ]
+    result = name.strip()
+    changed = True
+    while changed:
+        changed = False
+        for keyword in style_keywords:
+            for sep in [' ', '-', '_']:
+                pattern = f'{sep}{keyword}'
+                if result.lower().endswith(pattern):
+                    result = result[:-len(pattern)].strip()
+                    changed = True
+                    break
+            if changed:
+                break
+    return result.strip() or name
+
+
+def legacy_parse_style_flags(font_name: str = None, style_hint: str = None, ps_name: str = None):
+    text_parts = []
+    if font_name:
+        text_parts.append(font_name)
+    if style_hint:
+        text_parts.append(style_hint)
+    if ps_name:
+        text_parts.append(ps_name)
+    combined = ' '.join(text_parts).lower()
+
+    weight = 400
+    if any(kw in combined for kw in ['black', 'heavy', 'ultrablack', 'ultra-black']):
+        weight = 900
+    elif any(kw in combined for kw in ['extrabold', 'extra-bold', 'ultrabold', 'ultra-bold']):
+        weight = 800
+    elif any(kw in combined for kw in ['bold']):
+        weight = 700
+    elif any(kw in combined for kw in ['semibold', 'semi-bold', 'demibold', 'demi-bold']):
+        weight = 600
+    elif any(kw in combined for kw in ['medium']):
+        weight = 500
+    elif any(kw in combined for kw in ['light']) and 'bold' not in combined:
+        weight = 300
+    elif any(kw in combined for kw in ['thin', 'hairline', 'ultralight', 'ultra-light']):
+        weight = 200
+
+    italic = 0
+    if any(kw in combined for kw in ['italic', 'oblique', 'slant', 'kursiv', 'cursive']):
+        italic = 1
+    return weight, italic
+
+
+# ----------------------------------------------------------------------
+def _newest(pattern: str) -> List[Path]:
+    found = sorted((ROOT / "font_debug").glob(pattern))
+    return found[-1:]
+
+
+def load_triples(paths: List[Path]) -> List[Tuple[str, str, str]]:
+    triples: List[Tuple[str, str, str]] = []
+    for path in paths:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        fonts = data.get("fonts", []) if isinstance(data, dict) else data
+        for font in fonts:
+            name = font.get("name") or font.get("displayName") or ""
+            style = font.get("style") or ""
+            ps_name = font.get("postScriptName") or ""
+            triples.append((name, style, ps_name))
+            for alias in font.get("aliases", []):
+                triples.append((alias, "", ""))
+            for extra in ("family", "nativeFamily", "nativeFull"):
+                if font.get(extra):
+                    triples.append((font[extra], style, ""))
+    return triples
+
+
+def _time(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1000.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dumps", nargs="*", type=Path)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    dumps = args.dumps or (_newest("font_catalog_*.json") + _newest("cep_fonts_*.json"))
+    triples = load_triples(dumps)
+    if not triples:
+        print("No catalog entries found; pass a font_catalog_*.json or cep_fonts_*.json dump.")
+        return
+    print(f"{len(triples)} name triples from {', '.join(path.name for path in dumps)}")
+
+    mismatches = 0
+    for name, style, ps_name in triples:
+        expected = legacy_parse_style_flags(name, style, ps_name)
+        actual = parse_style_flags(name, style, ps_name)
+        if expected != actual:
+            mismatches += 1
+            print(f"  parse_style_flags{(name, style, ps_name)!r}: {expected} != {actual}")
+        for value in (name, ps_name):
+            if legacy_strip_style_suffix(value) != strip_style_suffix(value):
+                mismatches += 1
+                print(f"  strip_style_suffix({value!r}): "
+                      f"{legacy_strip_style_suffix(value)!r} != {strip_style_suffix(value)!r}")
+    print(f"golden check: {mismatches} mismatches")
+
+    def run_legacy() -> None:
+        for name, style, ps_name in triples:
+            legacy_parse_style_flags(name, style, ps_name)
+            legacy_strip_style_suffix(name)
+
+    def run_compiled_cold() -> None:
+        parse_style_flags.cache_clear()
+        strip_style_suffix.cache_clear()
+        for name, style, ps_name in triples:
+            parse_style_flags(name, style, ps_name)
+            strip_style_suffix(name)
+
+    def run_compiled_warm() -> None:
+        for name, style, ps_name in triples:
+            parse_style_flags(name, style, ps_name)
+            strip_style_suffix(name)
+
+    legacy_ms = _time(run_legacy, args.rounds)
+    cold_ms = _time(run_compiled_cold, args.rounds)
+    run_compiled_warm()
+    warm_ms = _time(run_compiled_warm, args.rounds)
+    print(f"  legacy           {legacy_ms:8.2f} ms/catalog")
+    print(f"  compiled (cold)  {cold_ms:8.2f} ms/catalog")
+    print(f"  compiled (memo)  {warm_ms:8.2f} ms/catalog")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark: dragging the panel edge with and without width buckets.
+
+Simulates a resize drag over a page of --rows previews (Pillow backend,
+families cycled to fill the page): the panel asks for every row at each
+intermediate width from --start to --stop in --step px steps, the way the
+window "resize" handler does. Each AE_FONT_WIDTH_BUCKET value runs in its
+own process (the setting is read at import) and reports
+
+* requests  rows the panel still asks for; with buckets it skips rows whose
+            current image's "widthRange" contains the new width
+* renders   previews actually rasterised by the service
+* reused    misses served from another width's preview ("width_reuse")
+* ms        wall time of the whole drag
+
+Usage:
+    python benchmarks/bench_width_buckets.py [--rows 40] [--buckets 0,16]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from itertools import cycle, islice
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("AE_FONT_RENDERER", "pil")
+
+TEXT = "다람쥐 헌 쳇바퀴에 타고파 The quick brown fox jumps over the lazy dog"
+
+
+def drag(args: argparse.Namespace) -> dict:
+    from attempt_log import LEVEL_OFF, AttemptLogWriter
+    from font_registry import FontRegistry
+    from metrics import METRICS
+    from preview_service import PreviewService
+    from width_buckets import in_width_range
+
+    registry = FontRegistry()
+    families = [meta for meta in registry.fonts if meta.faces]
+    if not families:
+        sys.exit("No file-backed font families found.")
+    service = PreviewService(
+        registry,
+        attempt_log=AttemptLogWriter(Path("font_debug") / "gdi_attempts.log", level=LEVEL_OFF),
+        workers=0,
+        prefetch_radius=0,
+    )
+    rows = list(islice(cycle(families), args.rows))
+    shown: list = [None] * len(rows)  # widthRange of each row's current image
+    step = args.step if args.stop >= args.start else -args.step
+    requests = 0
+    started = time.perf_counter()
+    for width in range(args.start, args.stop + (1 if step > 0 else -1), step):
+        for index, meta in enumerate(rows):
+            if in_width_range(width, shown[index]):
+                continue
+            requests += 1
+            entry = {"name": meta.primary_name, "width": width, "requestId": f"row{index}"}
+            preview = service.render_entry(entry, TEXT, args.size)
+            shown[index] = preview.get("widthRange") if preview else None
+    elapsed = time.perf_counter() - started
+    service.close()
+    counters = METRICS.snapshot()["counters"]
+    return {
+        "requests": requests,
+        "renders": counters.get("render_attempts", 0),
+        "reused": counters.get("width_reuse", 0),
+        "ms": elapsed * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=40)
+    parser.add_argument("--start", type=int, default=520, help="width at the start of the drag")
+    parser.add_argument("--stop", type=int, default=240, help="width at the end of the drag")
+    parser.add_argument("--step", type=int, default=3, help="px between resize events")
+    parser.add_argument("--size", type=int, default=24)
+    parser.add_argument("--buckets", default="0,16", help="AE_FONT_WIDTH_BUCKET values to compare")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(drag(args)))
+        return
+
+    events = abs(args.stop - args.start) // args.step + 1
+    print(f"{args.rows} rows, {events} resize events ({args.start} -> {args.stop} px, step {args.step})")
+    print(f"  {'bucket':>6} {'requests':>9} {'renders':>8} {'reused':>7} {'ms':>9}")
+    for bucket in args.buckets.split(","):
+        env = dict(os.environ, AE_FONT_WIDTH_BUCKET=bucket.strip(), AE_FONT_ATTEMPT_LOG="off")
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", *sys.argv[1:]],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"  {bucket:>6} {result['requests']:9d} {result['renders']:8d} {result['reused']:7d} "
+              f"{result['ms']:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
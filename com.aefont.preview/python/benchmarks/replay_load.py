@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Load generator: replay real panel traffic against a running font_server.
+
+Workload sources (--source):
+  cep     the newest font_debug/cep_fonts_*.json snapshot (or --cep FILE):
+          the panel's real font list, sent the way main.js builds entries
+  log     font_debug/gdi_attempts.log: requested names in the order they
+          were actually rendered (one entry per request, retries dropped)
+  server  GET /fonts from the target server, so every entry can render
+          (useful on Linux with the Pillow backend, where the captured
+          Windows fonts are missing)
+
+Each of --concurrency simulated panels sends --batches POST /batch-preview
+requests of --batch-size entries, walking the list with --pattern:
+  scroll      mostly next page, some half-page overlaps and jumps back
+  sequential  page after page
+  random      random pages
+  repeat      the first few pages over and over (cache-hit path)
+
+Reported: throughput, p50/p95/p99 batch latency, time to first preview per
+panel, status counts, and mean per-stage time from the Server-Timing
+headers.
+
+Usage:
+    python font_server.py &            # AE_FONT_RENDERER=pil on Linux
+    python benchmarks/replay_load.py --source server --concurrency 4 --batches 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import http.client
+import json
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+DEBUG_DIR = Path(__file__).resolve().parent.parent / "font_debug"
+TEXT = "다람쥐 헌 쳇바퀴에 타고파 The quick brown fox"
+
+
+def entry_from_cep(font: Dict[str, object], width: int) -> Dict[str, object]:
+    """Same fields main.js sends for a CEP font."""
+    aliases = []
+    for key in ("displayName", "postScriptName", "family", "nativeFamily", "nativeFull"):
+        value = font.get(key)
+        if value and value not in aliases:
+            aliases.append(value)
+    name = font.get("displayName") or font.get("nativeFull") or font.get("postScriptName") or font.get("family")
+    return {
+        "name": name,
+        "aliases": aliases,
+        "postScriptName": font.get("postScriptName"),
+        "style": font.get("style"),
+        "width": width,
+    }
+
+
+def load_cep(path: Optional[str], width: int) -> List[Dict[str, object]]:
+    if path is None:
+        snapshots = sorted(glob.glob(str(DEBUG_DIR / "cep_fonts_*.json")))
+        if not snapshots:
+            sys.exit(f"No cep_fonts_*.json in {DEBUG_DIR}")
+        path = snapshots[-1]
+    with open(path, encoding="utf-8") as handle:
+        fonts = json.load(handle).get("fonts") or []
+    print(f"source: {path} ({len(fonts)} fonts)")
+    return [entry_from_cep(font, width) for font in fonts if isinstance(font, dict)]
+
+
+def load_attempt_log(path: Optional[str], width: int) -> List[Dict[str, object]]:
+    path = path or str(DEBUG_DIR / "gdi_attempts.log")
+    entries: List[Dict[str, object]] = []
+    previous = None
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            name = record.get("requestName")
+            # Consecutive lines for one name are the retries of a single request.
+            if not name or name == previous:
+                continue
+            previous = name
+            entries.append({"name": name, "style": record.get("style"), "width": record.get("width") or width})
+    print(f"source: {path} ({len(entries)} requests)")
+    return entries
+
+
+def load_server(url: str, width: int) -> List[Dict[str, object]]:
+    target = urlparse(url)
+    connection = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=60)
+    connection.request("GET", "/fonts?fields=name,aliases")
+    fonts = json.loads(connection.getresponse().read()).get("fonts") or []
+    print(f"source: {url}/fonts ({len(fonts)} families)")
+    return [{"name": font.get("name"), "aliases": font.get("aliases") or [], "width": width} for font in fonts]
+
+
+def page_starts(pattern: str, total: int, size: int, count: int, rng: random.Random) -> List[int]:
+    """Start offsets of ``count`` batches over a list of ``total`` entries."""
+    last = max(0, total - size)
+    if pattern == "sequential":
+        return [(index * size) % (last + 1) if last else 0 for index in range(count)]
+    if pattern == "random":
+        return [rng.randint(0, last) for _ in range(count)]
+    if pattern == "repeat":
+        return [min(last, (index % 3) * size) for index in range(count)]
+    starts, position = [], 0
+    for _ in range(count):
+        starts.append(position)
+        roll = rng.random()
+        if roll < 0.7:
+            position += size
+        elif roll < 0.9:
+            position += size // 2
+        else:
+            position -= size * rng.randint(1, 3)
+        position = min(max(position, 0), last)
+    return starts
+
+
+class Results:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.latencies: List[float] = []
+        self.first_preview: List[float] = []
+        self.statuses: Counter = Counter()
+        self.previews = 0
+        self.bytes = 0
+        self.errors = 0
+        self.stages: Dict[str, List[float]] = defaultdict(list)
+
+    def record(self, latency: float, status: int, body: bytes, server_timing: Optional[str]) -> int:
+        previews = 0
+        if status == 200:
+            try:
+                previews = len(json.loads(body).get("previews") or [])
+            except ValueError:
+                pass
+        with self.lock:
+            self.latencies.append(latency)
+            self.statuses[status] += 1
+            self.previews += previews
+            self.bytes += len(body)
+            for part in (server_timing or "").split(","):
+                stage, _, duration = part.strip().partition(";dur=")
+                if stage and duration:
+                    self.stages[stage].append(float(duration))
+        return previews
+
+
+def panel(
+    url: str,
+    entries: List[Dict[str, object]],
+    starts: List[int],
+    args: argparse.Namespace,
+    session: int,
+    results: Results,
+) -> None:
+    target = urlparse(url)
+    connection = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=args.timeout)
+    began = time.perf_counter()
+    seen_preview = False
+    for batch, start in enumerate(starts):
+        page = [
+            dict(entry, requestId=f"s{session}b{batch}i{index}")
+            for index, entry in enumerate(entries[start:start + args.batch_size])
+        ]
+        body = json.dumps({"fonts": page, "text": args.text, "size": args.size}).encode("utf-8")
+        sent = time.perf_counter()
+        try:
+            connection.request("POST", "/batch-preview", body=body, headers={"Content-Type": "application/json"})
+            response = connection.getresponse()
+            payload = response.read()
+        except (OSError, http.client.HTTPException):
+            with results.lock:
+                results.errors += 1
+            connection.close()
+            connection = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=args.timeout)
+            continue
+        done = time.perf_counter()
+        previews = results.record(done - sent, response.status, payload, response.getheader("Server-Timing"))
+        if previews and not seen_preview:
+            seen_preview = True
+            with results.lock:
+                results.first_preview.append(done - began)
+        if args.think > 0:
+            time.sleep(args.think)
+    connection.close()
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--source", choices=("cep", "log", "server"), default="cep")
+    parser.add_argument("--cep", help="cep_fonts_*.json to replay (default: newest in font_debug/)")
+    parser.add_argument("--log", help="attempt log to replay (default: font_debug/gdi_attempts.log)")
+    parser.add_argument("--pattern", choices=("scroll", "sequential", "random", "repeat"), default="scroll")
+    parser.add_argument("--concurrency", type=int, default=2, help="simulated panels")
+    parser.add_argument("--batches", type=int, default=30, help="requests per panel")
+    parser.add_argument("--batch-size", type=int, default=40)
+    parser.add_argument("--width", type=int, default=360)
+    parser.add_argument("--size", type=int, default=24)
+    parser.add_argument("--text", default=TEXT)
+    parser.add_argument("--think", type=float, default=0.0, help="seconds between a panel's requests")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.source == "cep":
+        entries = load_cep(args.cep, args.width)
+    elif args.source == "log":
+        entries = load_attempt_log(args.log, args.width)
+    else:
+        entries = load_server(args.url, args.width)
+    if not entries:
+        sys.exit("Nothing to replay.")
+
+    results = Results()
+    threads = []
+    for session in range(args.concurrency):
+        rng = random.Random(args.seed + session)
+        starts = page_starts(args.pattern, len(entries), args.batch_size, args.batches, rng)
+        threads.append(threading.Thread(target=panel, args=(args.url, entries, starts, args, session, results)))
+    began = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    latencies = [value * 1000 for value in results.latencies]
+    print(f"\n{args.concurrency} panel(s) x {args.batches} batches of {args.batch_size} "
+          f"({args.pattern}) against {args.url} in {elapsed:.2f} s")
+    print(f"  throughput   {len(latencies) / elapsed:8.2f} batches/s   {results.previews / elapsed:8.1f} previews/s   "
+          f"{results.bytes / elapsed / 1024:8.1f} KiB/s")
+    if latencies:
+        print(f"  latency ms   p50 {percentile(latencies, 0.50):8.1f}   p95 {percentile(latencies, 0.95):8.1f}   "
+              f"p99 {percentile(latencies, 0.99):8.1f}   max {max(latencies):8.1f}")
+    if results.first_preview:
+        first = [value * 1000 for value in results.first_preview]
+        print(f"  first preview ms   p50 {statistics.median(first):8.1f}   max {max(first):8.1f}   "
+              f"({len(first)}/{args.concurrency} panels got one)")
+    print(f"  statuses     {dict(results.statuses)}   errors {results.errors}")
+    if results.stages:
+        # Averaged over every 200 response: cache hits simply contribute 0 to render stages.
+        answered = max(1, results.statuses[200])
+        print("  server stages (mean ms per batch):")
+        for stage, durations in sorted(results.stages.items(), key=lambda item: -sum(item[1])):
+            print(f"    {stage:<12} {sum(durations) / answered:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
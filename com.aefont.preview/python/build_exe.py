@@ -1,6 +1,14 @@
 #!/usr/bin/env python3
-"""Build script for font_server.exe using PyInstaller."""
+"""Build script for font_server.exe using PyInstaller.
 
+By default the server is a single --onefile exe, which unpacks itself into a
+temp folder on every launch. ``--onedir`` builds the unpacked layout instead
+(bin/win/font_server/font_server.exe next to its DLLs and _internal/), which
+skips that extraction and starts noticeably faster; pythonProcessManager.js
+prefers it when present.
+"""
+
+import argparse
 import os
 import sys
 import subprocess
@@ -12,6 +20,7 @@ SERVER_SCRIPT = SCRIPT_DIR / "font_server.py"
 SPEC_FILE = SCRIPT_DIR / "font_server.spec"
 DIST_DIR = SCRIPT_DIR / "dist"
 BUILD_DIR = SCRIPT_DIR / "build"
+BIN_DIR = SCRIPT_DIR.parent / "bin" / "win"
 
 
 def check_dependencies():
@@ -46,14 +55,14 @@ def clean_build():
         print(f"  Removed {SPEC_FILE}")
 
 
-def build_exe():
+def build_exe(onedir=False):
     """Build the executable using PyInstaller."""
-    print("\nBuilding font_server.exe...")
+    print(f"\nBuilding font_server.exe ({'onedir' if onedir else 'onefile'})...")
     
     # PyInstaller command
     cmd = [
         "pyinstaller",
-        "--onefile",              # Single executable
+        "--onedir" if onedir else "--onefile",  # Unpacked folder / single executable
         "--noconsole",            # No console window (background server)
         "--name=font_server",     # Output name
         "--clean",                # Clean cache
@@ -73,29 +82,52 @@ def build_exe():
     print("✓ Build completed!")
 
 
-def copy_to_bin():
-    """Copy the built executable to the bin/win directory."""
-    exe_src = DIST_DIR / "font_server.exe"
-    bin_dir = SCRIPT_DIR.parent / "bin" / "win"
+def installed_exe(onedir=False):
+    """Path of the executable in bin/win for the given layout."""
+    return BIN_DIR / "font_server" / "font_server.exe" if onedir else BIN_DIR / "font_server.exe"
+
+
+def copy_to_bin(onedir=False):
+    """Copy the built executable (or onedir folder) to the bin/win directory."""
+    src = DIST_DIR / "font_server" if onedir else DIST_DIR / "font_server.exe"
     
-    if not exe_src.exists():
-        print(f"\n✗ Error: {exe_src} not found!")
+    if not src.exists():
+        print(f"\n✗ Error: {src} not found!")
         return False
     
-    bin_dir.mkdir(parents=True, exist_ok=True)
-    exe_dest = bin_dir / "font_server.exe"
+    BIN_DIR.mkdir(parents=True, exist_ok=True)
+    # Remove the other layout so the process manager cannot pick up a stale build.
+    stale_dir = BIN_DIR / "font_server"
+    stale_exe = BIN_DIR / "font_server.exe"
+    if stale_dir.exists():
+        shutil.rmtree(stale_dir)
+    if stale_exe.exists():
+        stale_exe.unlink()
     
     print(f"\nCopying executable...")
-    shutil.copy2(exe_src, exe_dest)
-    print(f"  {exe_src} → {exe_dest}")
-    
-    file_size = exe_dest.stat().st_size / (1024 * 1024)
-    print(f"  File size: {file_size:.2f} MB")
+    if onedir:
+        dest = stale_dir
+        shutil.copytree(src, dest)
+        file_size = sum(path.stat().st_size for path in dest.rglob("*") if path.is_file()) / (1024 * 1024)
+    else:
+        dest = stale_exe
+        shutil.copy2(src, dest)
+        file_size = dest.stat().st_size / (1024 * 1024)
+    print(f"  {src} → {dest}")
+    print(f"  {'Folder' if onedir else 'File'} size: {file_size:.2f} MB")
     
     return True
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Build font_server.exe with PyInstaller.")
+    parser.add_argument(
+        "--onedir",
+        action="store_true",
+        help="unpacked layout (bin/win/font_server/) instead of one self-extracting exe; starts faster",
+    )
+    args = parser.parse_args()
+
     print("=" * 60)
     print("Font Server - Windows Executable Builder")
     print("=" * 60)
@@ -107,16 +139,16 @@ def main():
     try:
         check_dependencies()
         clean_build()
-        build_exe()
+        build_exe(args.onedir)
         
-        if copy_to_bin():
+        if copy_to_bin(args.onedir):
             print("\n" + "=" * 60)
             print("✓ Build successful!")
             print("=" * 60)
             print(f"\nExecutable location:")
-            print(f"  {SCRIPT_DIR.parent / 'bin' / 'win' / 'font_server.exe'}")
+            print(f"  {installed_exe(args.onedir)}")
             print("\nTo test:")
-            print("  cd ../bin/win")
+            print(f"  cd {installed_exe(args.onedir).parent}")
             print("  ./font_server.exe")
             print("  # Open browser: http://localhost:8765/ping")
         else:
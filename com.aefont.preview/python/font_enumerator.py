@@ -11,6 +11,9 @@ import ctypes
 from ctypes import wintypes
 from typing import Dict, List, Set
 
+from font_inspector import get_localized_family_names
+from font_name_resolver import StyleVariants
+
 
 # Constants
 DEFAULT_CHARSET = 1
@@ -57,6 +60,7 @@ class FontEnumerator:
     
     def __init__(self):
         self.font_families: Dict[str, Dict] = {}
+        self.font_styles: Dict[str, StyleVariants] = {}
         self.gdi32 = ctypes.windll.gdi32
         self.user32 = ctypes.windll.user32
         
@@ -77,6 +81,10 @@ class FontEnumerator:
         Returns:
             List[str]: 폰트 패밀리 이름 리스트 (정렬됨)
         """
+        # Start from scratch so fonts removed since the last call disappear
+        self.font_families = {}
+        self.font_styles = {}
+        
         # Get device context
         hdc = self.user32.GetDC(None)
         if not hdc:
@@ -123,7 +131,10 @@ class FontEnumerator:
             logfont = lpelfe.contents
             face_name = logfont.lfFaceName
             
-            if face_name and face_name not in self.font_families:
+            if not face_name:
+                return 1
+            
+            if face_name not in self.font_families:
                 # Store font metadata
                 self.font_families[face_name] = {
                     'charset': logfont.lfCharSet,
@@ -131,6 +142,12 @@ class FontEnumerator:
                     'italic': logfont.lfItalic,
                     'fonttype': fonttype
                 }
+            
+            # Every callback (one per charset/style GDI reports) adds a variant
+            styles = self.font_styles.get(face_name)
+            if styles is None:
+                styles = self.font_styles[face_name] = StyleVariants()
+            styles.add(logfont.lfWeight, logfont.lfItalic, logfont.lfCharSet & 0xFF)
         except Exception:
             # Ignore errors in callback to prevent enumeration failure
             pass
@@ -149,6 +166,30 @@ class FontEnumerator:
         """
         return self.font_families.get(face_name, {})
     
+    def get_style_variants(self, face_name: str) -> StyleVariants:
+        """
+        열거 중 수집한 (weight, italic, charset) 변형 테이블을 반환합니다.
+        
+        Args:
+            face_name: 폰트 패밀리 이름
+            
+        Returns:
+            StyleVariants: 해당 패밀리의 스타일 변형 (없으면 빈 테이블)
+        """
+        return self.font_styles.get(face_name) or StyleVariants()
+    
+    def get_localized_family_names(self, face_name: str) -> Dict[str, str]:
+        """
+        폰트의 name 테이블에서 언어별 패밀리 이름을 읽습니다.
+        
+        Args:
+            face_name: 폰트 패밀리 이름
+            
+        Returns:
+            Dict[str, str]: 언어 코드를 키로 하는 패밀리 이름
+        """
+        return get_localized_family_names(face_name)
+    
     def get_all_metadata(self) -> Dict[str, Dict]:
         """
         모든 폰트의 메타데이터를 반환합니다.
@@ -5,6 +5,23 @@ Font Name Matcher - 폰트 이름 비교 유틸리티
 영문/한글 폰트 이름 차이를 고려한 스마트 매칭 로직
 """
 
+# Windows 기본 폰트들: 이 폰트들로 대체되었다면 진짜 substitution입니다.
+SYSTEM_DEFAULT_FONTS = frozenset({
+    'arial',
+    'times new roman',
+    'courier new',
+    'calibri',
+    'segoe ui',
+    'tahoma',
+    'verdana',
+    'ms gothic',
+    'ms mincho',
+    '굴림',
+    '돋움',
+    '바탕',
+    '궁서',
+})
+
 
 def is_same_font_family(requested_name: str, actual_name: str) -> bool:
     """
@@ -117,26 +134,7 @@ def is_system_default_font(font_name: str) -> bool:
     
     이 폰트들로 대체되었다면 진짜 substitution입니다.
     """
-    font_name_lower = font_name.lower().strip()
-    
-    # Windows 기본 폰트들
-    system_fonts = [
-        'arial',
-        'times new roman',
-        'courier new',
-        'calibri',
-        'segoe ui',
-        'tahoma',
-        'verdana',
-        'ms gothic',
-        'ms mincho',
-        '굴림',
-        '돋움',
-        '바탕',
-        '궁서'
-    ]
-    
-    return font_name_lower in system_fonts
+    return font_name.lower().strip() in SYSTEM_DEFAULT_FONTS
 
 
 def should_treat_as_substitution(requested: str, actual: str) -> bool:
@@ -6,6 +6,13 @@ This module handles the conversion of user-facing font names to actual font face
 that Windows GDI can recognize, and extracts style flags (bold, italic) from font metadata.
 """
 
+import re
+from array import array
+from functools import lru_cache
+from typing import Iterator, Optional, Tuple
+
+DEFAULT_CHARSET = 1
+
 
 def normalize_name(name: str) -> str:
     """Normalize a font name for comparison."""
@@ -14,6 +21,52 @@ def normalize_name(name: str) -> str:
     return ''.join(ch for ch in name.lower() if ch.isalnum())
 
 
+# Common style keywords to remove, in priority order (first match wins).
+_STYLE_SUFFIX_KEYWORDS = [
+    'thin', 'hairline', 'extralight', 'extra light', 'ultralight', 'ultra light',
+    'light', 'semilight', 'demilight',
+    'book', 'regular', 'normal', 'medium', 'roman',
+    'semibold', 'semi bold', 'demibold', 'demi bold',
+    'bold', 'heavy', 'black', 'extrabold', 'ultrabold',
+    'italic', 'oblique', 'slanted', 'inclined',
+    'condensed', 'compressed', 'narrow', 'extended', 'expanded', 'wide'
+]
+# 'semi light', 'demi light', 'extra bold' and 'ultra bold' are deliberately
+# absent: the old scan tried ' light' / ' bold' before them, so "X Extra Bold"
+# has always become "X Extra" and they could never match.
+#
+# Every keyword that can overlap another at the end of a name ('extra light'
+# vs 'light', ...) precedes it in the list above, so the leftmost (= longest)
+# regex match is the same keyword the old ordered scan would have picked.
+_STYLE_SUFFIX = re.compile(
+    '[ _-](?:' + '|'.join(re.escape(keyword) for keyword in _STYLE_SUFFIX_KEYWORDS) + r')\Z'
+)
+
+# Lookahead alternation reports a keyword at every position it starts, so
+# overlapping hits ('bold' inside 'semibold') are all seen in one pass.
+_STYLE_TOKENS = re.compile(
+    '(?=(' + '|'.join([
+        'ultra-black', 'ultrablack', 'black', 'heavy',
+        'extra-bold', 'extrabold', 'ultra-bold', 'ultrabold',
+        'semi-bold', 'semibold', 'demi-bold', 'demibold', 'bold',
+        'medium',
+        'ultra-light', 'ultralight', 'light', 'thin', 'hairline',
+        'italic', 'oblique', 'slant', 'kursiv', 'cursive',
+    ]) + '))'
+)
+_WEIGHT_TIERS = (
+    (900, frozenset({'black', 'heavy', 'ultrablack', 'ultra-black'})),
+    (800, frozenset({'extrabold', 'extra-bold', 'ultrabold', 'ultra-bold'})),
+    (700, frozenset({'bold'})),
+    (600, frozenset({'semibold', 'semi-bold', 'demibold', 'demi-bold'})),
+    (500, frozenset({'medium'})),
+)
+_THIN_KEYWORDS = frozenset({'thin', 'hairline', 'ultralight', 'ultra-light'})
+_ITALIC_KEYWORDS = frozenset({'italic', 'oblique', 'slant', 'kursiv', 'cursive'})
+_MEMO_SIZE = 8192
+
+
+@lru_cache(maxsize=_MEMO_SIZE)
 def strip_style_suffix(name: str) -> str:
     """
     Remove style suffixes from a font name to get the family name.
@@ -23,36 +76,19 @@ def strip_style_suffix(name: str) -> str:
     if not name:
         return ''
     
-    # Common style keywords to remove
-    style_keywords = [
-        'thin', 'hairline', 'extralight', 'extra light', 'ultralight', 'ultra light',
-        'light', 'semilight', 'semi light', 'demilight', 'demi light',
-        'book', 'regular', 'normal', 'medium', 'roman',
-        'semibold', 'semi bold', 'demibold', 'demi bold',
-        'bold', 'heavy', 'black', 'extrabold', 'extra bold', 'ultrabold', 'ultra bold',
-        'italic', 'oblique', 'slanted', 'inclined',
-        'condensed', 'compressed', 'narrow', 'extended', 'expanded', 'wide'
-    ]
-    
-    # Remove trailing style keywords (case insensitive)
+    # Remove trailing style keywords (case insensitive), one per pass
     result = name.strip()
-    changed = True
-    while changed:
-        changed = False
-        for keyword in style_keywords:
-            # Try with space, hyphen, and underscore separators
-            for sep in [' ', '-', '_']:
-                pattern = f'{sep}{keyword}'
-                if result.lower().endswith(pattern):
-                    result = result[:-len(pattern)].strip()
-                    changed = True
-                    break
-            if changed:
-                break
+    while True:
+        lowered = result.lower()
+        match = _STYLE_SUFFIX.search(lowered)
+        if not match:
+            break
+        result = result[:-(len(lowered) - match.start())].strip()
     
     return result.strip() or name
 
 
+@lru_cache(maxsize=_MEMO_SIZE)
 def parse_style_flags(font_name: str = None, style_hint: str = None, ps_name: str = None):
     """
     Parse style flags (weight, italic) from font name and style hint.
@@ -68,41 +104,81 @@ def parse_style_flags(font_name: str = None, style_hint: str = None, ps_name: st
             italic: 0 or 1
     """
     # Combine all available name sources
-    text_parts = []
-    if font_name:
-        text_parts.append(font_name)
-    if style_hint:
-        text_parts.append(style_hint)
-    if ps_name:
-        text_parts.append(ps_name)
-    
-    combined = ' '.join(text_parts).lower()
+    combined = ' '.join(part for part in (font_name, style_hint, ps_name) if part).lower()
+    found = {match.group(1) for match in _STYLE_TOKENS.finditer(combined)}
     
     # Detect weight
     weight = 400  # Normal
-    if any(kw in combined for kw in ['black', 'heavy', 'ultrablack', 'ultra-black']):
-        weight = 900
-    elif any(kw in combined for kw in ['extrabold', 'extra-bold', 'ultrabold', 'ultra-bold']):
-        weight = 800
-    elif any(kw in combined for kw in ['bold']):
-        weight = 700
-    elif any(kw in combined for kw in ['semibold', 'semi-bold', 'demibold', 'demi-bold']):
-        weight = 600
-    elif any(kw in combined for kw in ['medium']):
-        weight = 500
-    elif any(kw in combined for kw in ['light']) and 'bold' not in combined:
-        weight = 300
-    elif any(kw in combined for kw in ['thin', 'hairline', 'ultralight', 'ultra-light']):
-        weight = 200
+    for tier_weight, keywords in _WEIGHT_TIERS:
+        if not found.isdisjoint(keywords):
+            weight = tier_weight
+            break
+    else:
+        if 'light' in found and 'bold' not in found:
+            weight = 300
+        elif not found.isdisjoint(_THIN_KEYWORDS):
+            weight = 200
     
     # Detect italic
-    italic = 0
-    if any(kw in combined for kw in ['italic', 'oblique', 'slant', 'kursiv', 'cursive']):
-        italic = 1
+    italic = 1 if not found.isdisjoint(_ITALIC_KEYWORDS) else 0
     
     return weight, italic
 
 
+class StyleVariants:
+    """
+    Compact table of the (weight, italic, charset) variants a family provides.
+    
+    Stored flat in an ``array('H')`` - three unsigned shorts per variant - so
+    thousands of families cost a few bytes each.
+    """
+    
+    __slots__ = ('_table',)
+    
+    def __init__(self, variants=()):
+        self._table = array('H')
+        for variant in variants:
+            self.add(*variant)
+    
+    def add(self, weight: int, italic, charset: int = DEFAULT_CHARSET) -> bool:
+        """Add a variant; returns False if it was already present."""
+        packed = (int(weight) & 0xFFFF, 1 if italic else 0, int(charset) & 0xFF)
+        table = self._table
+        for offset in range(0, len(table), 3):
+            if (table[offset], table[offset + 1], table[offset + 2]) == packed:
+                return False
+        table.extend(packed)
+        return True
+    
+    def __iter__(self) -> Iterator[Tuple[int, bool, int]]:
+        table = self._table
+        for offset in range(0, len(table), 3):
+            yield table[offset], bool(table[offset + 1]), table[offset + 2]
+    
+    def __len__(self) -> int:
+        return len(self._table) // 3
+    
+    def __repr__(self) -> str:
+        return f"StyleVariants({list(self)!r})"
+    
+    def has(self, weight: int, italic) -> bool:
+        return any(w == weight and i == bool(italic) for w, i, _ in self)
+    
+    def pick(self, weight: int, italic) -> Optional[Tuple[int, int]]:
+        """
+        Return the available (weight, italic) closest to the requested one.
+        
+        Matching slope wins over matching weight; None if the table is empty.
+        """
+        best = None
+        best_score = None
+        for w, i, _ in self:
+            score = (i != bool(italic), abs(w - weight), w)
+            if best_score is None or score < best_score:
+                best, best_score = (w, int(i)), score
+        return best
+
+
 class FontNameResolver:
     """
     Resolves display font names to GDI-compatible face names.
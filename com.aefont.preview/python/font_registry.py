@@ -0,0 +1,586 @@
+#!/usr/bin/env python3
+"""
+Font catalog shared by the HTTP handlers.
+
+FontRegistry enumerates the installed families, indexes every alias under
+its normalized key, links scanned font files to families and journals
+catalog changes for /fonts/changes. Nothing here touches GDI, so the
+registry also loads (via font_scanner) on machines without Windows.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sys
+import threading
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from font_scanner import FontFace, scan_directories
+from font_name_resolver import StyleVariants
+
+if sys.platform == "win32":
+    from font_enumerator import FontEnumerator
+else:
+    from font_scanner import ScannedFontEnumerator as FontEnumerator
+
+LOG = logging.getLogger("font_server")
+
+# Number of catalog changes remembered for /fonts/changes; older clients refetch.
+CHANGE_JOURNAL_SIZE = 4096
+# Number of registry dumps (gdi_families_*.txt / font_catalog_*.json) kept in font_debug/.
+DEBUG_DUMP_KEEP = int(os.environ.get("AE_FONT_DEBUG_KEEP", "5"))
+# Map families to font files on disk (paths, weights, TTC indices); "0" skips the scan.
+SCAN_FONT_FILES = os.environ.get("AE_FONT_SCAN_FILES", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+# Distinct names seen in a session (aliases, request names, file names) fit easily.
+NORMALIZE_CACHE_SIZE = 32768
+
+
+def normalize(value: Optional[str]) -> str:
+    if not value and value != 0:
+        return ""
+    return _normalize_text(value if isinstance(value, str) else str(value))
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _normalize_text(value: str) -> str:
+    lowered = value.lower().strip()
+    lowered = lowered.replace("\u3000", " ")  # ideographic space
+    lowered = lowered.lstrip("@")  # vertical font flag
+    return sys.intern("".join(ch for ch in lowered if ch.isalnum()))
+
+
+class FontMeta:
+    """One catalog family; ``key`` and ``normalized_aliases`` are fixed at construction.
+
+    Names never change after a record is built (a refresh replaces the whole
+    record), so the normalized forms are computed once instead of on every
+    lookup. They are kept as interned strings in sorted tuples -- a catalog of
+    tens of thousands of families repeats the same names and language tags
+    everywhere, and a tuple is a fraction of a set's size. Records are not
+    modified after they are published either: attaching font files builds a
+    new record (with_faces), so a catalog snapshot never changes under a reader.
+    """
+
+    __slots__ = (
+        "primary_name",
+        "gdi_name",
+        "aliases",
+        "_language_names",
+        "faces",
+        "styles",
+        "key",
+        "normalized_aliases",
+    )
+
+    def __init__(
+        self,
+        primary_name: str,
+        gdi_name: str,
+        aliases: Optional[Iterable[str]] = None,
+        language_names: Optional[Dict[str, str]] = None,
+        faces: Optional[Iterable[FontFace]] = None,
+        styles: Optional[StyleVariants] = None,
+    ) -> None:
+        primary_name = sys.intern(primary_name)
+        gdi_name = sys.intern(gdi_name)
+        names = {sys.intern(name) for name in aliases or ()}
+        names.add(primary_name)
+        names.add(gdi_name)
+        self.primary_name = primary_name
+        self.gdi_name = gdi_name
+        self.aliases: Tuple[str, ...] = tuple(sorted(names))
+        # Flat (language, name, language, name, ...); see language_names.
+        self._language_names: Tuple[str, ...] = tuple(
+            sys.intern(value) for pair in (language_names or {}).items() for value in pair
+        )
+        self.faces: Tuple[FontFace, ...] = tuple(faces) if faces else ()
+        self.styles: StyleVariants = styles if styles is not None else StyleVariants()
+        self.key = normalize(gdi_name)
+        self.normalized_aliases: Tuple[str, ...] = tuple(sorted({key for key in map(normalize, names) if key}))
+
+    def __repr__(self) -> str:
+        return f"FontMeta({self.primary_name!r}, gdi_name={self.gdi_name!r}, faces={len(self.faces)})"
+
+    @property
+    def language_names(self) -> Dict[str, str]:
+        """Localized family names by language tag (a new dict per call)."""
+        flat = self._language_names
+        return dict(zip(flat[::2], flat[1::2]))
+
+    @property
+    def paths(self) -> List[str]:
+        return sorted({face.path for face in self.faces})
+
+    def with_faces(self, faces: Iterable[FontFace]) -> "FontMeta":
+        """A copy of this record with ``faces`` (and their styles) added."""
+        faces = tuple(faces)
+        styles = StyleVariants(self.styles)
+        for face in faces:
+            styles.add(face.weight, face.italic)
+        return FontMeta(
+            self.primary_name,
+            self.gdi_name,
+            self.aliases,
+            self.language_names,
+            (*self.faces, *faces),
+            styles,
+        )
+
+    def pick_style(self, weight: int, italic: int) -> Tuple[int, int]:
+        """Snap a requested style to one the family really has.
+
+        Only file-backed families have a complete variant table; for the rest
+        GDI keeps the request as-is (and may synthesize bold/italic).
+        """
+        if not self.faces:
+            return weight, italic
+        return self.styles.pick(weight, italic) or (weight, italic)
+
+    def regular_face(self) -> Optional[FontFace]:
+        """The upright face closest to weight 400, if any file backs this family."""
+        if not self.faces:
+            return None
+        return min(self.faces, key=lambda face: (face.italic, abs(face.weight - 400), face.index))
+
+    def to_payload(self, fields: Optional[Sequence[str]] = None) -> Dict[str, object]:
+        """Serialize for /fonts; ``fields`` limits the output (``key`` is always kept).
+
+        The default is PAYLOAD_FIELDS; the file-backed ``paths`` and ``faces``
+        are only sent when asked for by name.
+        """
+        if fields is None:
+            fields = PAYLOAD_FIELDS
+        payload: Dict[str, object] = {}
+        for name in fields:
+            if name == "name" or name == "family":
+                payload[name] = self.primary_name
+            elif name == "style":
+                payload[name] = "Regular"
+            elif name == "postScriptName" or name == "gdiName":
+                payload[name] = self.gdi_name
+            elif name == "aliases":
+                payload[name] = sorted(alias for alias in self.aliases if alias)
+            elif name == "normalizedAliases":
+                payload[name] = sorted(self.normalized_aliases)
+            elif name == "languageNames":
+                payload[name] = self.language_names
+            elif name == "forceBitmap":
+                payload[name] = False
+            elif name == "paths":
+                payload[name] = self.paths
+            elif name == "faces":
+                payload[name] = [face.to_payload() for face in self.faces]
+        payload["key"] = self.key
+        return payload
+
+
+PAYLOAD_FIELDS: Tuple[str, ...] = (
+    "name",
+    "family",
+    "style",
+    "postScriptName",
+    "gdiName",
+    "aliases",
+    "normalizedAliases",
+    "languageNames",
+    "forceBitmap",
+    "key",
+)
+# "paths" and "faces" are served only when requested via ``fields``: every
+# face of every family is most of the catalog's bytes, and the panel falls
+# back to no paths.
+
+
+class FontRegistry:
+    def __init__(self, enumerator=None) -> None:
+        self._enumerator = enumerator if enumerator is not None else FontEnumerator()
+        self._records: List[FontMeta] = []
+        # What ``fonts`` hands out; replaced whole, once the records are final, so a
+        # reader never sees (or caches) a catalog that is half-way through a refresh.
+        self._snapshot: Tuple[FontMeta, ...] = ()
+        # Every normalized alias of every record -> record; built once per registration.
+        self._by_key: Dict[str, FontMeta] = {}
+        self._faces_by_name: Dict[str, FontFace] = {}
+        self._version = 1
+        # (version, op, key) entries, newest last; bounded so memory stays flat.
+        self._journal: Deque[Tuple[int, str, str]] = deque(maxlen=CHANGE_JOURNAL_SIZE)
+        self._journal_floor = self._version
+        self._listeners: List[Callable[[List[FontMeta], List[FontMeta]], None]] = []
+        self._refresh_lock = threading.Lock()
+        # Enumerated family -> its enumerated style variants (see _enumerated_styles).
+        self._enumerated: Dict[str, Optional[Tuple[Tuple[int, bool, int], ...]]] = {}
+        self._load()
+
+    @property
+    def fonts(self) -> Tuple[FontMeta, ...]:
+        """Read-only snapshot of the catalog in display order, shared until the next change."""
+        return self._snapshot
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def add_listener(self, callback: Callable[[List[FontMeta], List[FontMeta]], None]) -> None:
+        """Call ``callback(added, removed)`` after every refresh that changed the catalog."""
+        self._listeners.append(callback)
+
+    def _load(self) -> None:
+        LOG.info("Enumerating fonts via %s ...", type(self._enumerator).__name__)
+        families = self._enumerator.enumerate_all_fonts()
+        self._enumerated = {face_name: self._enumerated_styles(face_name) for face_name in families}
+        LOG.info("Found %d font families", len(families))
+
+        for face_name in families:
+            inserted = self._register(self._inspect(face_name))
+            if not inserted:
+                LOG.debug("Duplicate font skipped: %s", face_name)
+
+        self._records.sort(key=lambda meta: meta.primary_name.lower())
+        if SCAN_FONT_FILES:
+            self._attach_faces(self._scanned_faces())
+        self._snapshot = tuple(self._records)
+        LOG.info("Catalog ready with %d entries", len(self._records))
+
+    def _inspect(self, face_name: str) -> FontMeta:
+        localized = self._enumerator.get_localized_family_names(face_name)
+
+        english = localized.get("en")
+        if not english:
+            # Try any language that starts with en (e.g., en-us)
+            english = next(
+                (value for key, value in localized.items() if key.startswith("en")),
+                None,
+            )
+        primary_name = english or face_name
+        gdi_name = face_name
+
+        aliases = {name.strip() for name in (face_name, *localized.values()) if name and name.strip()}
+        aliases.add(face_name)
+        if english:
+            aliases.add(english)
+
+        get_styles = getattr(self._enumerator, "get_style_variants", None)
+        return FontMeta(
+            primary_name=primary_name,
+            gdi_name=gdi_name,
+            aliases=aliases,
+            language_names=localized,
+            styles=get_styles(face_name) if get_styles else StyleVariants(),
+        )
+
+    def _enumerated_styles(self, face_name: str) -> Optional[Tuple[Tuple[int, bool, int], ...]]:
+        """The enumerator's variants of ``face_name``, comparable across refreshes."""
+        get_styles = getattr(self._enumerator, "get_style_variants", None)
+        return tuple(sorted(get_styles(face_name))) if get_styles else None
+
+    def _scanned_faces(self) -> List[FontFace]:
+        # The portable enumerator has already scanned the font folders.
+        faces = getattr(self._enumerator, "faces", None)
+        return faces if faces is not None else scan_directories()
+
+    def refresh(self) -> Dict[str, object]:
+        """Re-enumerate and apply only the difference to the catalog.
+
+        New faces are inspected and registered, vanished ones dropped. A face
+        that is still installed is inspected again only when its enumerated
+        style variants changed (a weight installed or removed, which also
+        covers replaced font files); its record is then replaced and
+        journaled as "changed". Listeners see that as the old record removed
+        and the new one added.
+        """
+        with self._refresh_lock:
+            families = self._enumerator.enumerate_all_fonts()
+            installed = {face_name: self._enumerated_styles(face_name) for face_name in families}
+            known = self._enumerated
+            self._enumerated = installed
+
+            removed = [meta for meta in self._records if meta.gdi_name not in installed]
+            for meta in removed:
+                self._unregister(meta)
+
+            replaced: List[FontMeta] = []
+            changed: List[FontMeta] = []
+            for meta in list(self._records):
+                name = meta.gdi_name
+                if name not in known or known[name] == installed[name]:
+                    continue
+                fresh = self._inspect(name)
+                if any(self._by_key.get(key) not in (None, meta) for key in (fresh.key, *fresh.normalized_aliases)):
+                    # Its new names belong to another family now; keep what we had.
+                    continue
+                self._unregister(meta)
+                self._register(fresh)
+                replaced.append(meta)
+                changed.append(fresh)
+
+            added: List[FontMeta] = []
+            for face_name in families:
+                if face_name in known:
+                    continue
+                meta = self._inspect(face_name)
+                if self._register(meta):
+                    added.append(meta)
+
+            if not added and not removed and not changed:
+                return {"version": self._version, "added": [], "removed": [], "changed": []}
+
+            self._records = sorted(self._records, key=lambda meta: meta.primary_name.lower())
+            if (added or changed) and SCAN_FONT_FILES:
+                attached = self._attach_faces(self._scanned_faces(), only=added + changed)
+                added = [attached.get(id(meta), meta) for meta in added]
+                changed = [attached.get(id(meta), meta) for meta in changed]
+            self._snapshot = tuple(self._records)
+            self._record_changes(
+                [("removed", meta.key) for meta in removed]
+                + [("added", meta.key) for meta in added]
+                + [("changed", meta.key) for meta in changed]
+            )
+            LOG.info(
+                "Catalog refreshed: +%d -%d ~%d (version %d)",
+                len(added), len(removed), len(changed), self._version,
+            )
+
+        for callback in self._listeners:
+            try:
+                callback(added + changed, removed + replaced)
+            except Exception as exc:
+                LOG.warning("Registry listener failed: %s", exc)
+        return {
+            "version": self._version,
+            "added": [meta.key for meta in added],
+            "removed": [meta.key for meta in removed],
+            "changed": [meta.key for meta in changed],
+        }
+
+    def _attach_faces(
+        self, faces: Iterable[FontFace], only: Optional[List[FontMeta]] = None
+    ) -> Dict[int, FontMeta]:
+        """Link scanned font files to the enumerated families they belong to.
+
+        A file goes to its legacy family (name ID 1, what GDI enumerates:
+        "Foo Light" has its own record) before its typographic one (ID 16,
+        "Foo"), which only catches files whose ID 1 family is not listed.
+
+        Each family that gains files is replaced by a complete copy
+        (FontMeta.with_faces) in the records and the alias index. Returns the
+        copies by ``id()`` of the record they replace.
+        """
+        targets = {id(meta) for meta in only} if only is not None else None
+        matched: Dict[int, Tuple[FontMeta, List[FontFace]]] = {}
+        for face in faces:
+            meta = None
+            for family_name in (*face.legacy_family_names.values(), face.family, *face.family_names.values()):
+                meta = self._by_key.get(normalize(family_name))
+                if meta:
+                    break
+            if meta is None or (targets is not None and id(meta) not in targets):
+                continue
+            matched.setdefault(id(meta), (meta, []))[1].append(face)
+            for name in (face.full_name, face.ps_name):
+                key = normalize(name)
+                if key:
+                    self._faces_by_name.setdefault(key, face)
+
+        replaced = {meta_id: meta.with_faces(found) for meta_id, (meta, found) in matched.items()}
+        if replaced:
+            self._records = [replaced.get(id(meta), meta) for meta in self._records]
+            for meta_id, (meta, _) in matched.items():
+                for key in (meta.key, *meta.normalized_aliases):
+                    if self._by_key.get(key) is meta:
+                        self._by_key[key] = replaced[meta_id]
+        LOG.info("Matched %d font files to catalog entries", sum(len(found) for _, found in matched.values()))
+        return replaced
+
+    def _register(self, meta: FontMeta) -> bool:
+        # Avoid overriding existing entries for the same normalized key
+        keys = {meta.key, *meta.normalized_aliases}
+        existing = None
+        for key in keys:
+            if key in self._by_key:
+                existing = self._by_key[key]
+                break
+        if existing:
+            return False
+        self._records.append(meta)
+        for key in keys:
+            if key:
+                self._by_key[key] = meta
+        return True
+
+    def _unregister(self, meta: FontMeta) -> None:
+        self._records = [record for record in self._records if record is not meta]
+        for key in (meta.key, *meta.normalized_aliases):
+            if self._by_key.get(key) is meta:
+                del self._by_key[key]
+        for face in meta.faces:
+            for name in (face.full_name, face.ps_name):
+                key = normalize(name)
+                if self._faces_by_name.get(key) is face:
+                    del self._faces_by_name[key]
+
+    def find(self, name: Optional[str]) -> Optional[FontMeta]:
+        if not name and name != 0:
+            return None
+        key = normalize(name)
+        return self._by_key.get(key)
+
+    def face_by_name(self, name: Optional[str]) -> Optional[FontFace]:
+        """Exact lookup of a single face by its full or PostScript name."""
+        if not name and name != 0:
+            return None
+        return self._faces_by_name.get(normalize(name))
+
+    def resolve_face(self, name: Optional[str]) -> Optional[FontFace]:
+        """Return the on-disk face for a full/PostScript name, or a family's regular face."""
+        if not name and name != 0:
+            return None
+        key = normalize(name)
+        face = self._faces_by_name.get(key)
+        if face:
+            return face
+        meta = self._by_key.get(key)
+        return meta.regular_face() if meta else None
+
+    def face_for_style(self, name: Optional[str], weight: int = 400, italic: int = 0) -> Optional[FontFace]:
+        """The font file to draw ``name`` with: for a family name, the face closest to
+        ``weight``/``italic`` (same scoring as StyleVariants.pick); else the exact
+        full/PostScript face."""
+        if not name and name != 0:
+            return None
+        key = normalize(name)
+        meta = self._by_key.get(key)
+        # A regular face's full name is usually the family name; the style still decides.
+        if meta is None or not meta.faces:
+            return self._faces_by_name.get(key)
+        wanted_italic = bool(italic)
+        return min(
+            meta.faces,
+            key=lambda face: (face.italic != wanted_italic, abs(face.weight - weight), face.weight, face.index),
+        )
+
+    def resolve_path(self, name: Optional[str]) -> Optional[str]:
+        face = self.resolve_face(name)
+        return face.path if face else None
+
+    def catalog(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, object]]:
+        end = None if limit is None else offset + limit
+        return [meta.to_payload(fields) for meta in self._records[offset:end]]
+
+    def _record_changes(self, changes: Iterable[Tuple[str, str]]) -> None:
+        """Bump the catalog version and journal ``(op, key)`` pairs against it.
+
+        ``op`` is one of ``"added"``, ``"removed"`` or ``"changed"``.
+        """
+        self._version += 1
+        for op, key in changes:
+            if len(self._journal) == self._journal.maxlen:
+                self._journal_floor = self._journal[0][0]
+            self._journal.append((self._version, op, key))
+
+    def changes_since(
+        self,
+        since: int,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Optional[Dict[str, object]]:
+        """Return the catalog delta after ``since``, or None if a full refetch is needed."""
+        # A refresh mutates the journal, version and alias map together; read them as one.
+        with self._refresh_lock:
+            version = self._version
+            if since < self._journal_floor or since > version:
+                return None
+
+            # Collapse every op recorded after ``since`` into one net op per key.
+            first_op: Dict[str, str] = {}
+            last_op: Dict[str, str] = {}
+            for entry_version, op, key in self._journal:
+                if entry_version <= since:
+                    continue
+                first_op.setdefault(key, op)
+                last_op[key] = op
+
+            added_meta: List[FontMeta] = []
+            changed_meta: List[FontMeta] = []
+            removed: List[str] = []
+            for key, op in last_op.items():
+                if op == "removed":
+                    if first_op[key] != "added":
+                        removed.append(key)
+                    continue
+                meta = self._by_key.get(key)
+                if meta is None:
+                    continue
+                if first_op[key] == "added":
+                    added_meta.append(meta)
+                else:
+                    changed_meta.append(meta)
+
+        return {
+            "version": version,
+            "since": since,
+            "added": [meta.to_payload(fields) for meta in added_meta],
+            "removed": sorted(removed),
+            "changed": [meta.to_payload(fields) for meta in changed_meta],
+        }
+
+    def write_debug_files(self, keep: int = DEBUG_DUMP_KEEP) -> None:
+        """Dump the enumerated families and catalog into font_debug/, keeping the last ``keep``."""
+        try:
+            debug_dir = Path('font_debug')
+            debug_dir.mkdir(exist_ok=True)
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+            gdi_file = debug_dir / f'gdi_families_{timestamp}.txt'
+            with gdi_file.open('w', encoding='utf-8') as handle:
+                handle.write("EnumFontFamiliesExW Results\n")
+                handle.write(f"Count: {len(self._records)}\n")
+                handle.write("=" * 80 + "\n")
+                for idx, meta in enumerate(sorted(self._records, key=lambda m: m.primary_name.lower()), 1):
+                    handle.write(f"{idx:04d}. {meta.primary_name}\n")
+                    handle.write(f"      GDI Name: {meta.gdi_name}\n")
+                    if meta.aliases:
+                        sample = ', '.join(sorted(meta.aliases))[:500]
+                        handle.write(f"      Aliases: {sample}\n")
+                    if meta.language_names:
+                        sample_langs = ', '.join(f"{lang}:{name}" for lang, name in list(meta.language_names.items())[:4])
+                        handle.write(f"      Languages: {sample_langs}\n")
+                    handle.write("\n")
+
+            catalog_file = debug_dir / f'font_catalog_{timestamp}.json'
+            with catalog_file.open('w', encoding='utf-8') as handle:
+                json.dump(self.catalog(), handle, ensure_ascii=False, indent=2)
+
+            prune_debug_files(debug_dir, 'gdi_families_*.txt', keep)
+            prune_debug_files(debug_dir, 'font_catalog_*.json', keep)
+        except Exception as exc:
+            LOG.warning("Failed to write font registry debug files: %s", exc)
+
+
+def prune_debug_files(debug_dir: Path, pattern: str, keep: int) -> None:
+    """Delete all but the newest ``keep`` files matching ``pattern``.
+
+    Dump names embed a sortable timestamp, so name order is age order.
+    ``keep <= 0`` disables pruning.
+    """
+    stale = sorted(debug_dir.glob(pattern))[:-keep] if keep > 0 else []
+    for path in stale:
+        try:
+            path.unlink()
+        except OSError as exc:
+            LOG.debug("Failed to remove old debug file %s: %s", path, exc)
+
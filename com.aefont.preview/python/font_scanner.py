@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Font file scanner - on-disk font metadata without loading whole files.
+
+Walks the platform font directories, memory-maps every TTF/OTF/TTC and reads
+only the table directory plus the `name`, `OS/2` and `head` tables of each
+face. GDI enumeration tells us which families exist; this tells us where
+they live (path + collection index) and which weights/styles each provides.
+Pure Python, so it runs the same on Windows, macOS and Linux.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from font_name_resolver import StyleVariants
+from font_tables import (
+    NAME_ID_FAMILY,
+    NAME_ID_FULL_NAME,
+    NAME_ID_POSTSCRIPT,
+    NAME_ID_SUBFAMILY,
+    NAME_ID_TYPOGRAPHIC_FAMILY,
+    face_offsets,
+    names_by_id,
+    style_bits,
+    table_directory,
+    table_view,
+)
+
+FONT_SUFFIXES = frozenset({".ttf", ".otf", ".ttc", ".otc"})
+_NAME_IDS = (
+    NAME_ID_FAMILY,
+    NAME_ID_SUBFAMILY,
+    NAME_ID_FULL_NAME,
+    NAME_ID_POSTSCRIPT,
+    NAME_ID_TYPOGRAPHIC_FAMILY,
+)
+
+
+def default_font_directories() -> List[str]:
+    """Return the system and per-user font folders for the current platform."""
+    home = os.path.expanduser("~")
+    if sys.platform == "win32":
+        windir = os.environ.get("WINDIR", r"C:\Windows")
+        local = os.environ.get("LOCALAPPDATA", os.path.join(home, "AppData", "Local"))
+        return [
+            os.path.join(windir, "Fonts"),
+            os.path.join(local, "Microsoft", "Windows", "Fonts"),
+        ]
+    if sys.platform == "darwin":
+        return [
+            "/System/Library/Fonts",
+            "/Library/Fonts",
+            os.path.join(home, "Library", "Fonts"),
+        ]
+    return [
+        "/usr/share/fonts",
+        "/usr/local/share/fonts",
+        os.path.join(home, ".fonts"),
+        os.path.join(home, ".local", "share", "fonts"),
+    ]
+
+
+class FontFace:
+    """One face inside a font file.
+
+    ``family``/``family_names`` are the typographic family (name ID 16, which
+    groups every weight) when the font has one; ``legacy_family_names`` are
+    the ID 1 names GDI enumerates, e.g. "Foo Light" next to "Foo".
+    """
+
+    __slots__ = (
+        "path",
+        "index",
+        "family",
+        "style",
+        "full_name",
+        "ps_name",
+        "weight",
+        "italic",
+        "family_names",
+        "legacy_family_names",
+    )
+
+    def __init__(
+        self,
+        path: str,
+        index: int,
+        family: str,
+        style: str,
+        full_name: str,
+        ps_name: str,
+        weight: int,
+        italic: bool,
+        family_names: Dict[str, str],
+        legacy_family_names: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.path = path
+        self.index = index
+        self.family = family
+        self.style = style
+        self.full_name = full_name
+        self.ps_name = ps_name
+        self.weight = weight
+        self.italic = italic
+        self.family_names = family_names
+        self.legacy_family_names = legacy_family_names if legacy_family_names is not None else family_names
+
+    def names(self) -> Iterator[str]:
+        """Every name this face can be requested by (families, full and PostScript names)."""
+        yield self.family
+        yield from self.family_names.values()
+        yield from self.legacy_family_names.values()
+        if self.full_name:
+            yield self.full_name
+        if self.ps_name:
+            yield self.ps_name
+
+    def to_payload(self) -> Dict[str, object]:
+        return {
+            "path": self.path,
+            "index": self.index,
+            "style": self.style,
+            "postScriptName": self.ps_name,
+            "weight": self.weight,
+            "italic": self.italic,
+        }
+
+    def __repr__(self) -> str:
+        return f"FontFace({self.path!r}#{self.index}, {self.family!r} {self.style!r}, weight={self.weight})"
+
+
+def _pick(names: Dict[str, str]) -> str:
+    """Prefer the English string, then any."""
+    if not names:
+        return ""
+    english = names.get("en") or next((value for key, value in names.items() if key.startswith("en")), None)
+    return english or names.get("mac-0000") or next(iter(names.values()))
+
+
+def _parse_faces(path: str, data) -> List[FontFace]:
+    faces: List[FontFace] = []
+    for index, face_offset in enumerate(face_offsets(data)):
+        tables = table_directory(data, face_offset)
+        name_table = table_view(data, tables, b"name")
+        if name_table is None:
+            continue
+        names = names_by_id(name_table, _NAME_IDS)
+        name_table.release()
+
+        # Typographic family (ID 16) groups weights that ID 1 splits into separate families.
+        family_names = names.get(NAME_ID_TYPOGRAPHIC_FAMILY) or names.get(NAME_ID_FAMILY, {})
+        legacy_family_names = names.get(NAME_ID_FAMILY, {})
+        family = _pick(family_names)
+        if not family:
+            continue
+        weight, italic, _ = style_bits(data, tables)
+        faces.append(
+            FontFace(
+                path=path,
+                index=index,
+                family=family,
+                style=_pick(names.get(NAME_ID_SUBFAMILY, {})) or "Regular",
+                full_name=_pick(names.get(NAME_ID_FULL_NAME, {})),
+                ps_name=_pick(names.get(NAME_ID_POSTSCRIPT, {})),
+                weight=weight,
+                italic=italic,
+                family_names=family_names,
+                legacy_family_names=legacy_family_names,
+            )
+        )
+    return faces
+
+
+def scan_file(path: str) -> List[FontFace]:
+    """Memory-map ``path`` and return its faces; unreadable files yield []."""
+    try:
+        with open(path, "rb") as handle:
+            if os.fstat(handle.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return _parse_faces(path, data)
+    except (OSError, ValueError, struct.error):
+        # unreadable, truncated or malformed files
+        return []
+
+
+def iter_font_files(directories: Optional[Iterable[str]] = None) -> Iterator[str]:
+    for directory in directories if directories is not None else default_font_directories():
+        if not os.path.isdir(directory):
+            continue
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if os.path.splitext(filename)[1].lower() in FONT_SUFFIXES:
+                    yield os.path.join(root, filename)
+
+
+def scan_directories(directories: Optional[Iterable[str]] = None) -> List[FontFace]:
+    """Scan every font file under ``directories`` (platform defaults when None)."""
+    faces: List[FontFace] = []
+    for path in iter_font_files(directories):
+        faces.extend(scan_file(path))
+    return faces
+
+
+class ScannedFontEnumerator:
+    """Portable FontEnumerator backend: families come from scanned font files.
+
+    Used where GDI is unavailable (macOS/Linux builds, benchmarks). It offers
+    the same ``enumerate_all_fonts`` / ``get_localized_family_names`` pair.
+    """
+
+    def __init__(self, directories: Optional[Iterable[str]] = None) -> None:
+        self.directories = list(directories) if directories is not None else None
+        self.faces: List[FontFace] = []
+        self._families: Dict[str, Dict[str, str]] = {}
+        self._styles: Dict[str, StyleVariants] = {}
+
+    def enumerate_all_fonts(self) -> List[str]:
+        self.faces = scan_directories(self.directories)
+        families: Dict[str, Dict[str, str]] = {}
+        styles: Dict[str, StyleVariants] = {}
+        for face in self.faces:
+            families.setdefault(face.family, {}).update({**face.legacy_family_names, **face.family_names})
+            styles.setdefault(face.family, StyleVariants()).add(face.weight, face.italic)
+        self._families = families
+        self._styles = styles
+        return sorted(families)
+
+    def get_localized_family_names(self, face_name: str) -> Dict[str, str]:
+        return dict(self._families.get(face_name, {}))
+
+    def get_style_variants(self, face_name: str) -> StyleVariants:
+        return self._styles.get(face_name) or StyleVariants()
+
+
+if __name__ == '__main__':
+    found = scan_directories(sys.argv[1:] or None)
+    print(f"Found {len(found)} faces")
+    for face in found[:10]:
+        print(f"  - {face}")
+    if len(found) > 10:
+        print(f"  ... and {len(found) - 10} more")
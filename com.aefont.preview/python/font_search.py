@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+N-gram search index over catalog names.
+
+Every alias of a FontMeta (which includes its localized family names) is
+indexed in normalized form (see font_registry.normalize; Hangul syllables
+are kept as-is) under its bigrams and trigrams. Names containing Hangul
+are indexed a second time as their initial consonants, so "ㅁㅇㄱㄷ" finds
+맑은 고딕 the way Korean font menus allow. A query only visits the posting
+lists of its own n-grams, so its cost follows the number of names sharing
+them rather than the catalog size.
+
+Matches are ranked exact > prefix > substring > fuzzy (trigram overlap).
+Only the names sharing the most trigrams with the query are scored as fuzzy
+candidates (FUZZY_CANDIDATES_PER_RESULT per requested result).
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import math
+import threading
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from font_registry import FontMeta, FontRegistry, normalize
+
+# Share of the query's trigrams a fuzzy match must contain.
+MIN_SIMILARITY = 0.5
+DEFAULT_LIMIT = 20
+# Fuzzy candidates scored per result slot, best trigram overlap first; scoring
+# every name that shares half the query's trigrams is the slow tail of search().
+FUZZY_CANDIDATES_PER_RESULT = 4
+
+_HANGUL_FIRST = 0xAC00
+_HANGUL_LAST = 0xD7A3
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_EMPTY: FrozenSet[str] = frozenset()
+
+
+def _grams(term: str, size: int) -> Set[str]:
+    return {term[i:i + size] for i in range(len(term) - size + 1)}
+
+
+def initial_consonants(term: str) -> Optional[str]:
+    """Replace each Hangul syllable with its initial consonant; None without Hangul."""
+    if not any(_HANGUL_FIRST <= ord(ch) <= _HANGUL_LAST for ch in term):
+        return None
+    return "".join(
+        _CHOSEONG[(ord(ch) - _HANGUL_FIRST) // 588] if _HANGUL_FIRST <= ord(ch) <= _HANGUL_LAST else ch
+        for ch in term
+    )
+
+
+def _fuzzy_score(query_grams: Set[str], term: str) -> float:
+    term_grams = _grams(term, 3)
+    shared = len(query_grams & term_grams)
+    if shared < len(query_grams) * MIN_SIMILARITY:
+        return 0.0
+    # Dice coefficient, scaled below every substring match.
+    return 0.6 * 2 * shared / (len(query_grams) + len(term_grams))
+
+
+class FontSearchIndex:
+    """Bigram/trigram postings plus a sorted term list for one-letter prefixes."""
+
+    def __init__(self, fonts: Iterable[FontMeta] = ()) -> None:
+        self._lock = threading.Lock()
+        self._records: Dict[str, FontMeta] = {}
+        self._terms: Dict[str, Tuple[str, ...]] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._sorted_terms: List[Tuple[str, str]] = []
+        with self._lock:
+            for meta in fonts:
+                self._add(meta, keep_sorted=False)
+            self._sorted_terms.sort()
+
+    @classmethod
+    def for_registry(cls, registry: FontRegistry) -> "FontSearchIndex":
+        """Index the current catalog and follow every later refresh."""
+        index = cls(registry.fonts)
+        registry.add_listener(index.apply_changes)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def apply_changes(self, added: List[FontMeta], removed: List[FontMeta]) -> None:
+        with self._lock:
+            for meta in removed:
+                self._remove(meta)
+            for meta in added:
+                self._add(meta)
+
+    def _add(self, meta: FontMeta, keep_sorted: bool = True) -> None:
+        key = meta.key
+        if not key or key in self._records:
+            return
+        terms = set(meta.normalized_aliases)
+        for term in meta.normalized_aliases:
+            initials = initial_consonants(term)
+            if initials:
+                terms.add(initials)
+        self._records[key] = meta
+        self._terms[key] = tuple(terms)
+        for term in terms:
+            for gram in _grams(term, 2) | _grams(term, 3):
+                self._postings.setdefault(gram, set()).add(key)
+            if keep_sorted:
+                bisect.insort(self._sorted_terms, (term, key))
+            else:
+                self._sorted_terms.append((term, key))
+
+    def _remove(self, meta: FontMeta) -> None:
+        key = meta.key
+        if self._records.get(key) is not meta:
+            return
+        del self._records[key]
+        for term in self._terms.pop(key):
+            for gram in _grams(term, 2) | _grams(term, 3):
+                keys = self._postings.get(gram)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._postings[gram]
+            position = bisect.bisect_left(self._sorted_terms, (term, key))
+            if position < len(self._sorted_terms) and self._sorted_terms[position] == (term, key):
+                del self._sorted_terms[position]
+
+    def _prefix_matches(self, query: str, found: Dict[str, float]) -> None:
+        position = bisect.bisect_left(self._sorted_terms, (query, ""))
+        terms = self._sorted_terms
+        length = len(query)
+        while position < len(terms):
+            term, key = terms[position]
+            if not term.startswith(query):
+                break
+            score = 1.0 if len(term) == length else 0.8 + 0.1 * length / len(term)
+            if score > found.get(key, 0.0):
+                found[key] = score
+            position += 1
+
+    def _substring_matches(self, query: str, found: Dict[str, float]) -> None:
+        if len(query) == 1:
+            return  # single letters only match as prefixes
+        if len(query) == 2:
+            keys = self._postings.get(query, _EMPTY)
+        else:
+            postings = sorted((self._postings.get(gram, _EMPTY) for gram in _grams(query, 3)), key=len)
+            keys = postings[0].intersection(*postings[1:])
+        length = len(query)
+        for key in keys:
+            if key in found:
+                continue
+            best = 0.0
+            for term in self._terms[key]:
+                if query in term:
+                    best = max(best, 0.6 + 0.1 * length / len(term))
+            if best:
+                found[key] = best
+
+    def _fuzzy_matches(self, query: str, found: Dict[str, float], limit: int) -> None:
+        query_grams = _grams(query, 3)
+        if not query_grams:
+            return
+        postings = [self._postings.get(gram, _EMPTY) for gram in query_grams]
+        need = max(1, math.ceil(len(postings) * MIN_SIMILARITY))
+        shared: Counter = Counter()
+        for keys in postings:
+            shared.update(keys)
+        candidates = heapq.nlargest(
+            limit * FUZZY_CANDIDATES_PER_RESULT,
+            (item for item in shared.items() if item[1] >= need and item[0] not in found),
+            key=lambda item: item[1],
+        )
+        for key, _count in candidates:
+            best = max(_fuzzy_score(query_grams, term) for term in self._terms[key])
+            if best:
+                found[key] = best
+
+    def search(self, query: Optional[str], limit: int = DEFAULT_LIMIT) -> List[Tuple[FontMeta, float]]:
+        """Return up to ``limit`` ``(record, score)`` pairs, best first; scores are in (0, 1].
+
+        Tiers never overlap in score (prefix >= 0.8 > substring >= 0.6 >
+        fuzzy), so a lower tier is only searched while the better ones
+        have produced fewer than ``limit`` records.
+        """
+        needle = normalize(query)
+        if not needle or limit <= 0:
+            return []
+        found: Dict[str, float] = {}
+        with self._lock:
+            self._prefix_matches(needle, found)
+            if len(found) < limit:
+                self._substring_matches(needle, found)
+            if len(found) < limit:
+                self._fuzzy_matches(needle, found, limit)
+            records = self._records
+            best = heapq.nsmallest(
+                limit,
+                found.items(),
+                key=lambda item: (-item[1], records[item[0]].primary_name.lower()),
+            )
+            return [(records[key], score) for key, score in best]
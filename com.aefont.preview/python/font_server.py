@@ -2,15 +2,51 @@
 """Local font helper for AE Font Preview.
 
 This lightweight HTTP service exposes:
-  GET  /ping             → {"status": "ok"}
+  GET  /ping             → {"status": "ok", "ready": true, "pid": ..., "protocol": 1,
+                              "pyramid": false} ("pyramid": interactive batches are
+                              downsampled, i.e. width buckets are on)
+  POST /clients/attach   → take or renew a panel lease (?client=<id>; shared mode)
+  POST /clients/detach   → drop it
   GET  /fonts            → catalog of system fonts with alias metadata
+                           (?fields=name,key&offset=0&limit=200; paths and
+                           faces are only included when listed in fields)
+  GET  /fonts/changes    → added/removed/changed entries since ?since=<version>
+  GET  /fonts/search     → ranked name matches (?q=고딕&limit=20&fields=name,key)
+  POST /fonts/refresh    → re-enumerate and apply newly (de)activated fonts
   GET  /preview/<name>   → single preview image (legacy)
+  GET  /metrics          → stage latency histograms and counters
+                           (?format=prometheus for the text exposition format)
+  POST /debug/profile    → start sampling all threads for ?seconds=N (default 10);
+                           writes .pstats + collapsed stacks to font_debug/
+  GET  /debug/profile    → running flag and the last profile's top functions (?top=25)
   POST /batch-preview    → render multiple previews in one request
+                           (an entry's "variants" renders several styles/sizes;
+                           "atlas": true packs the images into one sprite sheet;
+                           "transport": "shm" returns ring descriptors instead of
+                           image data, see preview_ring.py; "interactive": true
+                           downsamples from a "pyramidSize" master and marks the
+                           previews "approximate", see size_pyramid.py; "prefetch"
+                           lists the entries the panel shows next, see prefetch.py)
 
 The service relies on Windows GDI to enumerate fonts (including FR_PRIVATE
 fonts that live only in memory) and render glyphs as PNG data returned via
-base64. It purposefully avoids Tkinter dependencies to keep the runtime
-surface minimal and friendly to PyInstaller.
+base64. Elsewhere (or with AE_FONT_RENDERER=pil) fonts come from the font
+folders and previews are drawn with Pillow. It purposefully avoids Tkinter
+dependencies to keep the runtime surface minimal and friendly to PyInstaller.
+
+Routing lives in handle_request(); AE_FONT_SERVER_IMPL=async serves it from
+the asyncio front end in async_server.py instead of http.server.
+
+AE_FONT_FAST_START=1 starts listening before the font catalog is built: /ping
+answers at once (with "ready": false) while enumeration runs on a background
+thread, and routes that need the catalog wait for it. Preview, search, atlas
+and Pillow modules are imported on first use either way.
+
+AE_FONT_SHARED=1 makes this one server per login session: a launch that
+finds a healthy server in the lockfile exits at once, and the server quits
+after its last panel lease expires (see shared_server.py). A shared server
+always starts fast: it claims the lockfile as soon as it listens, so a
+panel polling for it is not left waiting out the catalog build.
 """
 
 from __future__ import annotations
@@ -19,18 +55,24 @@ import json
 import logging
 import os
 import sys
-from dataclasses import dataclass, field
+import threading
+import time
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler, HTTPServer
-from typing import Dict, Iterable, List, Optional, Set, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from urllib.parse import parse_qs, urlparse, unquote
 from datetime import datetime
 from pathlib import Path
 
-from font_enumerator import FontEnumerator
-from font_inspector import get_all_name_variants, get_localized_family_names
-from font_name_resolver import parse_style_flags
-from gdi_renderer import GDIRenderer
+from font_registry import DEBUG_DUMP_KEEP, FontRegistry, prune_debug_files
+from metrics import METRICS
+import shared_server
+from width_buckets import WIDTH_BUCKET
+
+if TYPE_CHECKING:
+    from font_search import FontSearchIndex
+    from preview_ring import PreviewRing
+    from preview_service import PreviewService
 
 LOG = logging.getLogger("font_server")
 logging.basicConfig(
@@ -40,337 +82,362 @@ logging.basicConfig(
 )
 
 DEFAULT_PORT = int(os.environ.get("AE_FONT_SERVER_PORT", "8765"))
+# Registry dumps (gdi_families_*.txt / font_catalog_*.json) are opt-in.
+DEBUG_DUMPS = os.environ.get("AE_FONT_DEBUG_DUMPS", "").strip().lower() in ("1", "true", "yes", "on")
+# CEP catalog captures (cep_fonts_*.json) kept in font_debug/; 0 keeps them all.
+# Separate from AE_FONT_DEBUG_KEEP: captures are posted on purpose and feed the
+# replay and parser benchmarks, registry dumps are written on every start.
+CEP_CAPTURE_KEEP = int(os.environ.get("AE_FONT_CEP_CAPTURE_KEEP", "100"))
+# Seconds between background re-enumerations that pick up newly activated fonts; 0 disables.
+WATCH_INTERVAL = float(os.environ.get("AE_FONT_WATCH_INTERVAL", "60"))
+# "threaded" (http.server) or "async" (async_server.py: body limits, render backpressure).
+SERVER_IMPL = os.environ.get("AE_FONT_SERVER_IMPL", "threaded").strip().lower()
+# Listen first and build the catalog in the background (see the module docstring).
+FAST_START = os.environ.get("AE_FONT_FAST_START", "").strip().lower() in ("1", "true", "yes", "on")
+# Seconds a request waits for the catalog during a fast start before answering 503.
+STARTUP_WAIT = float(os.environ.get("AE_FONT_STARTUP_WAIT", "120"))
+# Routes that never touch the catalog, so they answer while it is still loading.
+STARTUP_ROUTES = frozenset({
+    "/ping", "/metrics", "/debug/profile", "/debug/cep-fonts", "/clients/attach", "/clients/detach",
+})
+# One server per login session, found through the lockfile (see the module docstring).
+SHARED = os.environ.get("AE_FONT_SHARED", "").strip().lower() in ("1", "true", "yes", "on")
+
+# Built by init_services(), not at import: render workers and frozen-exe
+# children re-import this module and must not enumerate fonts again.
+REGISTRY: Optional[FontRegistry] = None
+PREVIEW: Optional[PreviewService] = None
+SEARCH: Optional[FontSearchIndex] = None
+# Set once init_services() has finished (or failed, leaving SEARCH None).
+SERVICES_DONE = threading.Event()
+# Panels using this server; a shared server exits when none are left.
+LEASES = shared_server.Leases()
+# Created by the first "transport": "shm" batch.
+RING: Optional[PreviewRing] = None
+_RING_LOCK = threading.Lock()
+
+
+def init_services() -> None:
+    """Build the font catalog, preview service and search index once per process."""
+    global REGISTRY, PREVIEW, SEARCH
+    if REGISTRY is not None:
+        return
+    from font_search import FontSearchIndex
+    from preview_service import PreviewService
+
+    REGISTRY = FontRegistry()
+    PREVIEW = PreviewService(REGISTRY)
+    SEARCH = FontSearchIndex.for_registry(REGISTRY)
+    SERVICES_DONE.set()
+
+
+def services_ready(timeout: float = 0.0) -> bool:
+    """True once init_services() has succeeded; waits up to ``timeout`` seconds for it."""
+    SERVICES_DONE.wait(timeout)
+    return SEARCH is not None
+
+
+# (status, JSON payload); a None payload means "no such route".
+Response = Tuple[HTTPStatus, Optional[Dict[str, object]]]
+# (status, body bytes or None for "no such route", extra headers incl. Content-Type)
+EncodedResponse = Tuple[HTTPStatus, Optional[bytes], Dict[str, str]]
+
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def is_render_request(method: str, target: str) -> bool:
+    """Routes that render previews; front ends may queue or shed these under load."""
+    route = urlparse(target).path
+    return (method == "POST" and route == "/batch-preview") or (method == "GET" and route.startswith("/preview/"))
+
+
+def encode_response(method: str, target: str, body: bytes = b"") -> EncodedResponse:
+    """handle_request() plus serialization, with this request's stage times as Server-Timing."""
+    METRICS.increment("requests")
+    parsed = urlparse(target)
+    if method == "GET" and parsed.path == "/metrics" and parse_qs(parsed.query).get("format") == ["prometheus"]:
+        return HTTPStatus.OK, METRICS.prometheus().encode("utf-8"), {"Content-Type": PROMETHEUS_CONTENT_TYPE}
+
+    with METRICS.request() as timing:
+        status, payload = handle_request(method, target, body)
+        if payload is None:
+            return status, None, {}
+        with METRICS.stage("json"):
+            data = json.dumps(payload).encode("utf-8")
+    METRICS.increment("bytes_out", len(data))
+    headers = {"Content-Type": JSON_CONTENT_TYPE}
+    if timing.stages:
+        headers["Server-Timing"] = timing.header()
+    return status, data, headers
+
+
+def handle_request(method: str, target: str, body: bytes = b"") -> Response:
+    """Route one request.
+
+    Transport-independent so the threaded handler and the asyncio server
+    (async_server.py) serve exactly the same API.
+    """
+    parsed = urlparse(target)
+    params = parse_qs(parsed.query or "")
+    if parsed.path not in STARTUP_ROUTES and not services_ready(STARTUP_WAIT):
+        return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "font catalog is not available"}
+    if method == "GET":
+        if parsed.path == "/ping":
+            return HTTPStatus.OK, {
+                "status": "ok",
+                "ready": services_ready(),
+                "pid": os.getpid(),
+                "protocol": shared_server.PROTOCOL_VERSION,
+                "pyramid": WIDTH_BUCKET > 0,
+            }
+        if parsed.path == "/fonts":
+            return _handle_fonts(params)
+        if parsed.path == "/fonts/changes":
+            return _handle_font_changes(params)
+        if parsed.path == "/fonts/search":
+            return _handle_font_search(params)
+        if parsed.path == "/metrics":
+            from prefetch import hit_rate as prefetch_hit_rate
+
+            snapshot = METRICS.snapshot()
+            snapshot["prefetchHitRate"] = prefetch_hit_rate(snapshot["counters"])
+            return HTTPStatus.OK, snapshot
+        if parsed.path == "/debug/profile":
+            return _handle_profile(method, params)
+        if parsed.path.startswith("/preview/"):
+            return _handle_preview(unquote(parsed.path.split("/preview/", 1)[1]), params)
+    elif method == "POST":
+        if parsed.path == "/batch-preview":
+            return _handle_batch_preview(_parse_json_body(body))
+        if parsed.path == "/fonts/refresh":
+            return HTTPStatus.OK, REGISTRY.refresh()
+        if parsed.path == "/debug/cep-fonts":
+            return _handle_cep_font_debug(_parse_json_body(body))
+        if parsed.path == "/debug/profile":
+            return _handle_profile(method, params)
+        if parsed.path in ("/clients/attach", "/clients/detach"):
+            return _handle_client_lease(parsed.path.rsplit("/", 1)[1], params)
+    return HTTPStatus.NOT_FOUND, None
 
 
-def normalize(value: Optional[str]) -> str:
-    if not value and value != 0:
-        return ""
-    lowered = str(value).lower().strip()
-    lowered = lowered.replace("\u3000", " ")  # ideographic space
-    lowered = lowered.lstrip("@")  # vertical font flag
-    return "".join(ch for ch in lowered if ch.isalnum())
-
-
-@dataclass
-class FontMeta:
-    primary_name: str
-    gdi_name: str
-    aliases: Set[str] = field(default_factory=set)
-    language_names: Dict[str, str] = field(default_factory=dict)
-
-    def __post_init__(self) -> None:
-        if not self.aliases:
-            self.aliases = {self.primary_name}
-        self.aliases.add(self.primary_name)
-        self.aliases.add(self.gdi_name)
-
-    @property
-    def key(self) -> str:
-        return normalize(self.gdi_name)
-
-    @property
-    def normalized_aliases(self) -> Set[str]:
-        return {normalize(alias) for alias in self.aliases if normalize(alias)}
-
-    def to_payload(self) -> Dict[str, object]:
-        aliases_sorted = sorted(alias for alias in self.aliases if alias)
-        norm_aliases_sorted = sorted(self.normalized_aliases)
-        return {
-            "name": self.primary_name,
-            "family": self.primary_name,
-            "style": "Regular",
-            "postScriptName": self.gdi_name,
-            "gdiName": self.gdi_name,
-            "aliases": aliases_sorted,
-            "normalizedAliases": norm_aliases_sorted,
-            "languageNames": self.language_names,
-            "forceBitmap": False,
-            "paths": [],
-            "key": self.key,
-        }
-
-
-class FontRegistry:
-    def __init__(self) -> None:
-        self._records: List[FontMeta] = []
-        self._by_key: Dict[str, FontMeta] = {}
-        self._load()
-        self._write_debug_files()
-
-    @property
-    def fonts(self) -> List[FontMeta]:
-        return list(self._records)
-
-    def _load(self) -> None:
-        LOG.info("Enumerating fonts via EnumFontFamiliesExW ...")
-        enumerator = FontEnumerator()
-        families = enumerator.enumerate_all_fonts()
-        LOG.info("Found %d font families", len(families))
-
-        for face_name in families:
-            names = get_all_name_variants(face_name)
-            localized = get_localized_family_names(face_name)
-
-            english = localized.get("en")
-            if not english:
-                # Try any language that starts with en (e.g., en-us)
-                english = next(
-                    (value for key, value in localized.items() if key.startswith("en")),
-                    None,
-                )
-            primary_name = english or face_name
-            gdi_name = face_name
-
-            aliases = set(names)
-            aliases.discard("")
-            aliases.add(face_name)
-            if english:
-                aliases.add(english)
-
-            meta = FontMeta(
-                primary_name=primary_name,
-                gdi_name=gdi_name,
-                aliases=aliases,
-                language_names=localized,
-            )
-
-            inserted = self._register(meta)
-            if not inserted:
-                LOG.debug("Duplicate font skipped: %s", face_name)
-
-        self._records.sort(key=lambda meta: meta.primary_name.lower())
-        LOG.info("Catalog ready with %d entries", len(self._records))
-
-    def _register(self, meta: FontMeta) -> bool:
-        # Avoid overriding existing entries for the same normalized key
-        keys = {meta.key} | meta.normalized_aliases
-        existing = None
-        for key in keys:
-            if key in self._by_key:
-                existing = self._by_key[key]
-                break
-        if existing:
-            return False
-        self._records.append(meta)
-        for key in keys:
-            if key:
-                self._by_key[key] = meta
-        return True
-
-    def find(self, name: Optional[str]) -> Optional[FontMeta]:
-        if not name and name != 0:
-            return None
-        key = normalize(name)
-        return self._by_key.get(key)
-
-    def catalog(self) -> List[Dict[str, object]]:
-        return [meta.to_payload() for meta in self._records]
-
-    def _write_debug_files(self) -> None:
-        try:
-            debug_dir = Path('font_debug')
-            debug_dir.mkdir(exist_ok=True)
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-
-            gdi_file = debug_dir / f'gdi_families_{timestamp}.txt'
-            with gdi_file.open('w', encoding='utf-8') as handle:
-                handle.write("EnumFontFamiliesExW Results\n")
-                handle.write(f"Count: {len(self._records)}\n")
-                handle.write("=" * 80 + "\n")
-                for idx, meta in enumerate(sorted(self._records, key=lambda m: m.primary_name.lower()), 1):
-                    handle.write(f"{idx:04d}. {meta.primary_name}\n")
-                    handle.write(f"      GDI Name: {meta.gdi_name}\n")
-                    if meta.aliases:
-                        sample = ', '.join(sorted(meta.aliases))[:500]
-                        handle.write(f"      Aliases: {sample}\n")
-                    if meta.language_names:
-                        sample_langs = ', '.join(f"{lang}:{name}" for lang, name in list(meta.language_names.items())[:4])
-                        handle.write(f"      Languages: {sample_langs}\n")
-                    handle.write("\n")
-
-            catalog_file = debug_dir / f'font_catalog_{timestamp}.json'
-            with catalog_file.open('w', encoding='utf-8') as handle:
-                json.dump(self.catalog(), handle, ensure_ascii=False, indent=2)
-        except Exception as exc:
-            LOG.warning("Failed to write font registry debug files: %s", exc)
-
-
-class PreviewService:
-    def __init__(self, registry: FontRegistry) -> None:
-        self.registry = registry
-        self.renderer = GDIRenderer(LOG.info)
-        self._gdi_log = Path('font_debug')
-
-    def render_entry(
-        self,
-        entry: Dict[str, object],
-        text: str,
-        size: int,
-    ) -> Optional[Dict[str, object]]:
-        width = 0
-        raw_width = entry.get("width")
-        if isinstance(raw_width, (int, float)):
-            width = int(max(0, raw_width))
-        elif isinstance(raw_width, str) and raw_width.isdigit():
-            width = int(raw_width)
-
-        weight, italic = parse_style_flags(
-            font_name=str(entry.get("name") or ""),
-            style_hint=str(entry.get("style") or ""),
-            ps_name=str(entry.get("postScriptName") or ""),
-        )
-
-        base_alias_pool: Set[str] = set()
-
-        def add_alias_source(value: Optional[str]) -> None:
-            if not value and value != 0:
-                return
-            text_value = str(value).strip()
-            if text_value:
-                base_alias_pool.add(text_value)
-
-        add_alias_source(entry.get("name"))
-        raw_aliases = entry.get("aliases")
-        if isinstance(raw_aliases, list):
-            for alias in raw_aliases:
-                add_alias_source(alias)
-        add_alias_source(entry.get("postScriptName"))
-        add_alias_source(entry.get("family"))
-
-        candidate_strings: List[str] = []
-        seen_candidates: Set[str] = set()
-
-        def add_candidate(value: Optional[str]) -> None:
-            if not value and value != 0:
-                return
-            candidate = str(value).strip()
-            if not candidate:
-                return
-            key = normalize(candidate)
-            if key in seen_candidates:
-                return
-            seen_candidates.add(key)
-            candidate_strings.append(candidate)
-
-        add_candidate(entry.get("name"))
-        if isinstance(raw_aliases, list):
-            for alias in raw_aliases:
-                add_candidate(alias)
-        add_candidate(entry.get("postScriptName"))
-        add_candidate(entry.get("family"))
-
-        attempt_queue: List[Tuple[str, Set[str], Optional[FontMeta], str]] = []
-        attempted_faces: Set[str] = set()
-
-        def enqueue(face_name: str, record: Optional[FontMeta], source: str) -> None:
-            normalized = normalize(face_name)
-            if not normalized or normalized in attempted_faces:
-                return
-            attempted_faces.add(normalized)
-            alias_names = set(base_alias_pool)
-            alias_names.add(face_name)
-            if record:
-                alias_names.update(record.aliases)
-            attempt_queue.append((face_name, alias_names, record, source))
-
-        for candidate in candidate_strings:
-            record = self.registry.find(candidate)
-            enqueue(candidate, record, "request")
-            if record and record.gdi_name:
-                enqueue(record.gdi_name, record, "registry")
-
-        if not attempt_queue:
-            return None
-
-        for face_name, alias_names, record, source in attempt_queue:
-            image, substituted = self.renderer.render(
-                face_name,
-                text,
-                size,
-                weight=weight,
-                italic=int(bool(italic)),
-                target_width=width,
-                alias_names=alias_names,
-            )
-            actual_face = getattr(self.renderer, "last_actual_face", "")
-            self._log_gdi_attempt(
-                entry,
-                face_name=face_name,
-                actual_face=actual_face,
-                status="substituted" if substituted else ("success" if image else "failed"),
-                source=source,
-            )
-            if substituted:
-                continue
-            if not image:
-                continue
-
-            request_id = entry.get("requestId")
-            if not request_id:
-                key_hint = record.key if record else normalize(face_name)
-                request_id = f"{key_hint}:{width}"
-
-            normalized_key = record.key if record else normalize(face_name)
-            python_key = entry.get("pythonKey") or normalized_key
-            return {
-                "requestId": request_id,
-                "fontName": entry.get("name") or (record.primary_name if record else face_name),
-                "faceName": face_name,
-                "resolvedName": actual_face or face_name,
-                "image": image,
-                "substituted": False,
-                "normalizedKey": normalized_key,
-                "pythonKey": python_key,
-            }
+def _parse_json_body(body: bytes) -> Optional[Dict[str, object]]:
+    if not body:
+        return None
+    try:
+        return json.loads(body.decode("utf-8"))
+    except ValueError:
+        return None
+
 
+def _parse_fields(params: Dict[str, List[str]]) -> Optional[List[str]]:
+    raw = params.get("fields")
+    if not raw:
         return None
+    return [name.strip() for value in raw for name in value.split(",") if name.strip()]
+
+
+def _parse_int(params: Dict[str, List[str]], name: str) -> Optional[int]:
+    """Return a non-negative int query parameter; raises ValueError when malformed."""
+    raw = params.get(name)
+    if not raw:
+        return None
+    value = int(raw[0])
+    if value < 0:
+        raise ValueError(name)
+    return value
+
+
+def _handle_fonts(params: Dict[str, List[str]]) -> Response:
+    try:
+        offset = _parse_int(params, "offset") or 0
+        limit = _parse_int(params, "limit")
+    except ValueError:
+        return HTTPStatus.BAD_REQUEST, {"error": "offset and limit must be non-negative integers"}
+
+    fonts = REGISTRY.catalog(_parse_fields(params), offset, limit)
+    return HTTPStatus.OK, {
+        "fonts": fonts,
+        "count": len(REGISTRY),
+        "offset": offset,
+        "version": REGISTRY.version,
+    }
+
+
+def _handle_font_changes(params: Dict[str, List[str]]) -> Response:
+    try:
+        since = _parse_int(params, "since")
+    except ValueError:
+        since = None
+    if since is None:
+        return HTTPStatus.BAD_REQUEST, {"error": "since must be a non-negative integer"}
+
+    delta = REGISTRY.changes_since(since, _parse_fields(params))
+    if delta is None:
+        # Too old (or from another server run): the client must refetch /fonts.
+        return HTTPStatus.OK, {"version": REGISTRY.version, "since": since, "reset": True}
+    return HTTPStatus.OK, delta
+
+
+def _handle_font_search(params: Dict[str, List[str]]) -> Response:
+    query = params.get("q", [""])[0].strip()
+    if not query:
+        return HTTPStatus.BAD_REQUEST, {"error": "q is required"}
+    try:
+        limit = _parse_int(params, "limit")
+    except ValueError:
+        return HTTPStatus.BAD_REQUEST, {"error": "limit must be a non-negative integer"}
+
+    from font_search import DEFAULT_LIMIT as SEARCH_DEFAULT_LIMIT
+
+    fields = _parse_fields(params)
+    matches = SEARCH.search(query, SEARCH_DEFAULT_LIMIT if limit is None else limit)
+    return HTTPStatus.OK, {
+        "query": query,
+        "results": [dict(meta.to_payload(fields), score=round(score, 4)) for meta, score in matches],
+        "count": len(matches),
+        "version": REGISTRY.version,
+    }
+
+
+def _handle_preview(font_name: str, params: Dict[str, List[str]]) -> Response:
+    text = params.get("text", ["Sample"])[0]
+    try:
+        size = int(float(params.get("size", ["24"])[0]))
+    except (ValueError, TypeError):
+        size = 24
+
+    rendered = PREVIEW.render_single(font_name, text, size)
+    if not rendered:
+        return HTTPStatus.NOT_FOUND, {"error": "Font not found or render failed"}
+    return HTTPStatus.OK, {"preview": rendered}
+
+
+def _handle_batch_preview(payload: Optional[Dict[str, object]]) -> Response:
+    if not payload:
+        return HTTPStatus.BAD_REQUEST, {"error": "Invalid JSON"}
+
+    fonts = payload.get("fonts")
+    text = payload.get("text", "Sample")
+    size = payload.get("size", 24)
+    if not isinstance(fonts, list) or not fonts:
+        return HTTPStatus.OK, {"previews": []}
+    try:
+        size = int(float(size))
+    except (ValueError, TypeError):
+        size = 24
+    pyramid_size = 0
+    if payload.get("interactive"):
+        # Slider scrubbing: derive sizes from one larger master per font (size_pyramid.py).
+        from size_pyramid import PYRAMID_MAX_SIZE
 
-    def render_batch(
-        self,
-        fonts: Iterable[Dict[str, object]],
-        text: str,
-        size: int,
-    ) -> List[Dict[str, object]]:
-        results: List[Dict[str, object]] = []
-        for entry in fonts:
-            rendered = self.render_entry(entry, text, size)
-            if rendered:
-                results.append(rendered)
-        return results
-
-    def render_single(self, name: str, text: str, size: int) -> Optional[Dict[str, object]]:
-        return self.render_entry({"name": name}, text, size)
-
-    def _log_gdi_attempt(
-        self,
-        entry: Dict[str, object],
-        face_name: str,
-        actual_face: str,
-        status: str,
-        source: str,
-    ) -> None:
         try:
-            self._gdi_log.mkdir(exist_ok=True)
-            logfile = self._gdi_log / 'gdi_attempts.log'
-            payload = {
-                "timestamp": datetime.now().isoformat(timespec='seconds'),
-                "requestName": entry.get("name"),
-                "faceTried": face_name,
-                "actualFace": actual_face,
-                "status": status,
-                "source": source,
-                "width": entry.get("width"),
-                "style": entry.get("style"),
-                "pythonKey": entry.get("pythonKey"),
-            }
-            with logfile.open('a', encoding='utf-8') as handle:
-                handle.write(json.dumps(payload, ensure_ascii=False) + '\n')
-        except Exception as exc:
-            LOG.debug("Failed to log GDI attempt: %s", exc)
+            pyramid_size = int(float(payload.get("pyramidSize") or PYRAMID_MAX_SIZE))
+        except (ValueError, TypeError):
+            pyramid_size = PYRAMID_MAX_SIZE
+
+    # The rows the panel lists next, nearest first: what the idle prefetcher renders.
+    upcoming = payload.get("prefetch")
+    previews = PREVIEW.render_batch(
+        fonts, text, size, pyramid_size, upcoming if isinstance(upcoming, list) else None
+    )
+    METRICS.increment("previews_out", len(previews))
+    response: Dict[str, object] = {"previews": previews, "count": len(previews)}
+    if payload.get("atlas"):
+        from sprite_atlas import build_atlas
+
+        with METRICS.stage("atlas"):
+            atlas = build_atlas(previews)
+        if atlas is not None:
+            # Packed previews are located through atlas["rects"] instead of carrying an image.
+            response["previews"] = [
+                {key: value for key, value in preview.items() if key != "image"}
+                if preview.get("requestId") is not None and str(preview["requestId"]) in atlas["rects"]
+                else preview
+                for preview in previews
+            ]
+            response["atlas"] = atlas
+    if payload.get("transport") == "shm":
+        try:
+            ring = preview_ring()
+        except OSError as exc:
+            # Clients fall back to the inline images they always understand.
+            LOG.warning("Preview ring unavailable: %s", exc)
+            return HTTPStatus.OK, response
+        with METRICS.stage("ring"):
+            response["previews"] = [ring.export(preview) for preview in response["previews"]]
+            if "atlas" in response:
+                response["atlas"] = ring.export(response["atlas"])
+        response["ring"] = ring.info()
+    return HTTPStatus.OK, response
+
+
+def preview_ring() -> PreviewRing:
+    """The process's shared-memory preview ring, created on first use."""
+    global RING
+    with _RING_LOCK:
+        if RING is None:
+            from preview_ring import PreviewRing, remove_stale_rings
+
+            directory = shared_server.default_lock_dir()
+            directory.mkdir(parents=True, exist_ok=True)
+            remove_stale_rings(directory)
+            RING = PreviewRing(directory / f"preview_ring_{os.getpid()}.bin")
+    return RING
+
+
+def _handle_cep_font_debug(payload: Optional[Dict[str, object]]) -> Response:
+    if not payload:
+        return HTTPStatus.BAD_REQUEST, {"error": "Invalid JSON"}
+
+    fonts = payload.get("fonts")
+    label = payload.get("label") or "cep"
+    if not isinstance(fonts, list):
+        return HTTPStatus.BAD_REQUEST, {"error": "fonts must be a list"}
 
+    try:
+        debug_dir = Path('font_debug')
+        debug_dir.mkdir(exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        target = debug_dir / f'cep_fonts_{timestamp}.json'
+        with target.open('w', encoding='utf-8') as handle:
+            json.dump({"label": label, "count": len(fonts), "fonts": fonts}, handle, ensure_ascii=False, indent=2)
+        prune_debug_files(debug_dir, 'cep_fonts_*.json', CEP_CAPTURE_KEEP)
+        return HTTPStatus.OK, {"status": "ok", "saved": str(target)}
+    except Exception as exc:
+        LOG.warning("Failed to write CEP font debug file: %s", exc)
+        return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "write-failed"}
+
+
+def _handle_profile(method: str, params: Dict[str, List[str]]) -> Response:
+    import profiler
+
+    if method == "GET":
+        try:
+            top = _parse_int(params, "top")
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, {"error": "top must be a non-negative integer"}
+        return HTTPStatus.OK, profiler.status(profiler.DEFAULT_TOP if top is None else top)
+
+    try:
+        seconds = float(params.get("seconds", [profiler.DEFAULT_SECONDS])[0])
+    except ValueError:
+        return HTTPStatus.BAD_REQUEST, {"error": "seconds must be a number"}
+    seconds = min(max(seconds, 0.1), profiler.MAX_SECONDS)
+    try:
+        profiler.start(seconds, Path('font_debug'), keep=DEBUG_DUMP_KEEP)
+    except profiler.ProfileBusy:
+        return HTTPStatus.CONFLICT, {"error": "a profile is already running"}
+    # Sampling runs in the background so the requests being profiled keep flowing.
+    return HTTPStatus.ACCEPTED, {"status": "started", "seconds": seconds}
 
-REGISTRY = FontRegistry()
-PREVIEW = PreviewService(REGISTRY)
+
+def _handle_client_lease(action: str, params: Dict[str, List[str]]) -> Response:
+    client = params.get("client", [""])[0].strip()
+    if not client:
+        return HTTPStatus.BAD_REQUEST, {"error": "client is required"}
+    clients = LEASES.attach(client) if action == "attach" else LEASES.detach(client)
+    return HTTPStatus.OK, {"clients": clients, "pid": os.getpid(), "leaseTtl": LEASES.ttl}
 
 
 class FontServerHandler(BaseHTTPRequestHandler):
@@ -389,24 +456,26 @@ class FontServerHandler(BaseHTTPRequestHandler):
         handler.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
         handler.send_header("Access-Control-Allow-Headers", "Content-Type")
 
-    def _send_json(self, payload: Dict[str, object], status: HTTPStatus = HTTPStatus.OK) -> None:
-        data = json.dumps(payload).encode("utf-8")
+    def _send_body(self, status: HTTPStatus, data: bytes, headers: Dict[str, str]) -> None:
         self.send_response(status)
-        self.send_header("Content-Type", "application/json; charset=utf-8")
+        for name, value in headers.items():
+            self.send_header(name, value)
         self.send_header("Content-Length", str(len(data)))
         self._set_cors_headers(self)
         self.end_headers()
         self.wfile.write(data)
 
-    def _parse_json_body(self) -> Optional[Dict[str, object]]:
-        length = int(self.headers.get("Content-Length", "0"))
-        if length <= 0:
-            return None
-        body = self.rfile.read(length)
-        try:
-            return json.loads(body.decode("utf-8"))
-        except json.JSONDecodeError:
-            return None
+    def _dispatch(self, method: str) -> None:
+        body = b""
+        if method == "POST":
+            length = int(self.headers.get("Content-Length", "0"))
+            if length > 0:
+                body = self.rfile.read(length)
+        status, data, headers = encode_response(method, self.path, body)
+        if data is None:
+            self.send_error(status)
+            return
+        self._send_body(status, data, headers)
 
     # ------------------------------------------------------------------
     # HTTP methods
@@ -417,101 +486,112 @@ class FontServerHandler(BaseHTTPRequestHandler):
         self.end_headers()
 
     def do_GET(self) -> None:  # noqa: N802
-        parsed = urlparse(self.path)
-        if parsed.path == "/ping":
-            self._send_json({"status": "ok"})
-            return
+        self._dispatch("GET")
 
-        if parsed.path == "/fonts":
-            self._send_json({"fonts": REGISTRY.catalog(), "count": len(REGISTRY.fonts)})
-            return
+    def do_POST(self) -> None:  # noqa: N802
+        self._dispatch("POST")
 
-        if parsed.path.startswith("/preview/"):
-            font_name = unquote(parsed.path.split("/preview/", 1)[1])
-            params = parse_qs(parsed.query or "")
-            text = params.get("text", ["Sample"])[0]
-            try:
-                size = int(float(params.get("size", ["24"])[0]))
-            except (ValueError, TypeError):
-                size = 24
-
-            rendered = PREVIEW.render_single(font_name, text, size)
-            if not rendered:
-                self._send_json({"error": "Font not found or render failed"}, HTTPStatus.NOT_FOUND)
-                return
-            self._send_json({"preview": rendered})
-            return
 
-        self.send_error(HTTPStatus.NOT_FOUND)
+def start_font_watcher(registry: FontRegistry, interval: float = WATCH_INTERVAL) -> Optional[threading.Thread]:
+    """Periodically refresh ``registry`` so fonts activated by font managers show up."""
+    if interval <= 0:
+        return None
 
-    def do_POST(self) -> None:  # noqa: N802
-        parsed = urlparse(self.path)
-        if parsed.path == "/batch-preview":
-            self._handle_batch_preview()
-            return
-        if parsed.path == "/debug/cep-fonts":
-            self._handle_cep_font_debug()
-            return
+    def watch() -> None:
+        while True:
+            time.sleep(interval)
+            try:
+                registry.refresh()
+            except Exception as exc:
+                LOG.warning("Font refresh failed: %s", exc)
 
-        self.send_error(HTTPStatus.NOT_FOUND)
+    thread = threading.Thread(target=watch, name="font-watcher", daemon=True)
+    thread.start()
+    return thread
 
-    def _handle_batch_preview(self):
-        payload = self._parse_json_body()
-        if not payload:
-            self._send_json({"error": "Invalid JSON"}, HTTPStatus.BAD_REQUEST)
-            return
 
-        fonts = payload.get("fonts")
-        text = payload.get("text", "Sample")
-        size = payload.get("size", 24)
-        if not isinstance(fonts, list) or not fonts:
-            self._send_json({"previews": []})
-            return
-        try:
-            size = int(float(size))
-        except (ValueError, TypeError):
-            size = 24
+def start_background_work() -> None:
+    """Debug dumps, render-farm warm-up and the font watcher, once the services exist."""
+    if DEBUG_DUMPS:
+        # The socket is already listening; dump in the background so /ping answers immediately.
+        threading.Thread(target=REGISTRY.write_debug_files, name="debug-dumps", daemon=True).start()
+    if PREVIEW.farm is not None:
+        threading.Thread(target=PREVIEW.farm.start, name="render-farm-start", daemon=True).start()
+    start_font_watcher(REGISTRY)
 
-        previews = PREVIEW.render_batch(fonts, text, size)
-        self._send_json({"previews": previews, "count": len(previews)})
 
-    def _handle_cep_font_debug(self):
-        payload = self._parse_json_body()
-        if not payload:
-            self._send_json({"error": "Invalid JSON"}, HTTPStatus.BAD_REQUEST)
-            return
+def _init_services_in_background() -> None:
+    started = time.perf_counter()
+    try:
+        init_services()
+    except Exception:
+        LOG.exception("Font service initialisation failed")
+        return
+    finally:
+        SERVICES_DONE.set()
+    LOG.info("Font catalog ready in %.2f s (%d families)", time.perf_counter() - started, len(REGISTRY))
+    start_background_work()
 
-        fonts = payload.get("fonts")
-        label = payload.get("label") or "cep"
-        if not isinstance(fonts, list):
-            self._send_json({"error": "fonts must be a list"}, HTTPStatus.BAD_REQUEST)
-            return
 
-        try:
-            debug_dir = Path('font_debug')
-            debug_dir.mkdir(exist_ok=True)
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            target = debug_dir / f'cep_fonts_{timestamp}.json'
-            with target.open('w', encoding='utf-8') as handle:
-                json.dump({"label": label, "count": len(fonts), "fonts": fonts}, handle, ensure_ascii=False, indent=2)
-            self._send_json({"status": "ok", "saved": str(target)})
-        except Exception as exc:
-            LOG.warning("Failed to write CEP font debug file: %s", exc)
-            self._send_json({"error": "write-failed"}, HTTPStatus.INTERNAL_SERVER_ERROR)
+def _bind(port: int):
+    if SERVER_IMPL == "async":
+        from async_server import AsyncFontServer
+
+        return AsyncFontServer(("127.0.0.1", port), encode_response, is_render_request)
+    return HTTPServer(("127.0.0.1", port), FontServerHandler)
 
 
 def run_server(port: int = DEFAULT_PORT) -> None:
-    server = HTTPServer(("127.0.0.1", port), FontServerHandler)
-    LOG.info("Font server listening on http://127.0.0.1:%d", port)
+    lock = shared_server.lock_path() if SHARED else None
+    if lock is not None:
+        running = shared_server.find_running(lock)
+        if running is not None:
+            LOG.info("Font server already running (pid %s, port %s); not starting another", running["pid"], running["port"])
+            return
+    # Shared servers claim the lockfile before the (possibly long) catalog build.
+    fast_start = FAST_START or lock is not None
+    if not fast_start:
+        init_services()
+    try:
+        server = _bind(port)
+    except OSError:
+        if lock is None:
+            raise
+        # Panels find a shared server through the lockfile, so any free port will do.
+        LOG.warning("Port %d is busy, using a free port", port)
+        server = _bind(0)
+    port = server.server_port
+    if lock is not None:
+        holder = shared_server.claim(lock, port)
+        if holder is not None:
+            LOG.info("Font server pid %s claimed the lock first; exiting", holder["pid"])
+            server.server_close()
+            return
+        shared_server.start_idle_watchdog(LEASES, server.shutdown)
+    LOG.info("Font server (%s) listening on http://127.0.0.1:%d", SERVER_IMPL, port)
+    if fast_start:
+        threading.Thread(target=_init_services_in_background, name="services-init", daemon=True).start()
+    else:
+        start_background_work()
     try:
         server.serve_forever()
     except KeyboardInterrupt:
         LOG.info("Shutting down font server")
     finally:
         server.server_close()
+        if lock is not None:
+            shared_server.release(lock)
+        if RING is not None:
+            RING.close()
+        if PREVIEW is not None:
+            PREVIEW.close()
 
 
 if __name__ == "__main__":
+    import multiprocessing
+
+    # Render workers are spawned processes; a frozen exe must dispatch them here.
+    multiprocessing.freeze_support()
     chosen_port = DEFAULT_PORT
     if len(sys.argv) > 1:
         try:
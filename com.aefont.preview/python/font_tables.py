@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Pure-Python parsing of the SFNT tables we need (no Windows dependencies).
+
+Works on any buffer object (bytes, mmap, memoryview) so callers can hand in
+a `name` table fetched through GetFontData or a memory-mapped font file
+without copying it first.
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+NAME_ID_FAMILY = 1
+NAME_ID_SUBFAMILY = 2
+NAME_ID_FULL_NAME = 4
+NAME_ID_POSTSCRIPT = 6
+NAME_ID_TYPOGRAPHIC_FAMILY = 16
+
+FS_SELECTION_ITALIC = 0x0001
+FS_SELECTION_BOLD = 0x0020
+MAC_STYLE_BOLD = 0x0001
+MAC_STYLE_ITALIC = 0x0002
+
+LANG_MAP = {
+    0x0409: "en",
+    0x0412: "ko",
+    0x0411: "ja",
+    0x0804: "zh-Hans",
+    0x0c0a: "es",
+    0x0404: "zh-Hant",
+}
+
+_NAME_HEADER = struct.Struct(">HHH")
+_NAME_RECORD = struct.Struct(">HHHHHH")
+_TTC_HEADER = struct.Struct(">4sHHI")
+_SFNT_HEADER = struct.Struct(">IHHHH")
+_TABLE_RECORD = struct.Struct(">4sIII")
+_UINT16 = struct.Struct(">H")
+
+
+class NameRecord:
+    """One `name` table record with its raw (still encoded) payload."""
+
+    __slots__ = ("platform", "encoding", "language", "name_id", "data")
+
+    def __init__(self, platform: int, encoding: int, language: int, name_id: int, data: bytes) -> None:
+        self.platform = platform
+        self.encoding = encoding
+        self.language = language
+        self.name_id = name_id
+        self.data = data
+
+    def __repr__(self) -> str:
+        return (
+            f"NameRecord(platform={self.platform}, encoding={self.encoding}, "
+            f"language=0x{self.language:04x}, name_id={self.name_id}, data={self.data!r})"
+        )
+
+
+def iter_name_records(name_table, name_ids: Optional[Iterable[int]] = None) -> List[NameRecord]:
+    """Parse the record array of a `name` table in one pass.
+
+    Records are unpacked with ``struct.iter_unpack`` over a memoryview and
+    filtered by ``name_ids`` before their payload is sliced, so unwanted
+    records never allocate.
+    """
+    view = memoryview(name_table)
+    size = len(view)
+    if size < _NAME_HEADER.size:
+        return []
+    _, count, string_offset = _NAME_HEADER.unpack_from(view, 0)
+    count = min(count, (size - _NAME_HEADER.size) // _NAME_RECORD.size)
+    records_end = _NAME_HEADER.size + count * _NAME_RECORD.size
+    wanted: Optional[FrozenSet[int]] = frozenset(name_ids) if name_ids is not None else None
+
+    records: List[NameRecord] = []
+    for platform, encoding, language, name_id, length, offset in _NAME_RECORD.iter_unpack(
+        view[_NAME_HEADER.size:records_end]
+    ):
+        if wanted is not None and name_id not in wanted:
+            continue
+        start = string_offset + offset
+        end = start + length
+        if end > size:
+            continue
+        records.append(NameRecord(platform, encoding, language, name_id, bytes(view[start:end])))
+    return records
+
+
+def _decode_windows_name(data: bytes) -> Optional[str]:
+    try:
+        return data.decode("utf-16-be")
+    except Exception:
+        return None
+
+
+def _decode_mac_name(data: bytes) -> Optional[str]:
+    for encoding in ("mac_roman", "latin-1", "utf-8"):
+        try:
+            return data.decode(encoding)
+        except Exception:
+            continue
+    return None
+
+
+def decode_name(record: NameRecord) -> Tuple[str, Optional[str]]:
+    """Return ``(language tag, text)`` for a record; text is None if undecodable."""
+    if record.platform == 3:  # Windows
+        return LANG_MAP.get(record.language, f"win-{record.language:04x}"), _decode_windows_name(record.data)
+    if record.platform == 1:  # Macintosh
+        return f"mac-{record.language:04x}", _decode_mac_name(record.data)
+    return f"p{record.platform}-{record.language:04x}", None
+
+
+def localized_names(name_table, name_id: int = NAME_ID_FAMILY) -> Dict[str, str]:
+    """Return mapping of language code to the ``name_id`` string (family by default)."""
+    return names_by_id(name_table, (name_id,)).get(name_id, {})
+
+
+def names_by_id(name_table, name_ids: Iterable[int]) -> Dict[int, Dict[str, str]]:
+    """Return ``{name_id: {language: text}}`` for the requested name IDs."""
+    names: Dict[int, Dict[str, str]] = {}
+    for record in iter_name_records(name_table, name_ids):
+        lang, text = decode_name(record)
+        if text:
+            names.setdefault(record.name_id, {})[lang] = text
+    return names
+
+
+# ----------------------------------------------------------------------
+# Font file structure
+# ----------------------------------------------------------------------
+def face_offsets(data) -> List[int]:
+    """Return the offset of every face's table directory (one per TTC member)."""
+    if len(data) < _SFNT_HEADER.size:
+        return []
+    tag, _, _, num_fonts = _TTC_HEADER.unpack_from(data, 0)
+    if tag != b"ttcf":
+        return [0]
+    end = _TTC_HEADER.size + num_fonts * 4
+    if end > len(data):
+        return []
+    return list(struct.unpack_from(f">{num_fonts}I", data, _TTC_HEADER.size))
+
+
+def table_directory(data, face_offset: int = 0) -> Dict[bytes, Tuple[int, int]]:
+    """Return ``{tag: (offset, length)}`` for the face whose directory starts at ``face_offset``."""
+    size = len(data)
+    if face_offset + _SFNT_HEADER.size > size:
+        return {}
+    _, num_tables, _, _, _ = _SFNT_HEADER.unpack_from(data, face_offset)
+    start = face_offset + _SFNT_HEADER.size
+    end = start + num_tables * _TABLE_RECORD.size
+    if end > size:
+        return {}
+    tables: Dict[bytes, Tuple[int, int]] = {}
+    for tag, _, offset, length in _TABLE_RECORD.iter_unpack(memoryview(data)[start:end]):
+        if offset + length <= size:
+            tables[tag] = (offset, length)
+    return tables
+
+
+def table_view(data, tables: Dict[bytes, Tuple[int, int]], tag: bytes) -> Optional[memoryview]:
+    """Zero-copy view of one table, or None when the face does not have it."""
+    location = tables.get(tag)
+    if location is None:
+        return None
+    offset, length = location
+    return memoryview(data)[offset:offset + length]
+
+
+def style_bits(data, tables: Dict[bytes, Tuple[int, int]]) -> Tuple[int, bool, bool]:
+    """Return ``(weight class, italic, bold)`` from `OS/2`, falling back to `head.macStyle`."""
+    weight = 0
+    italic = bold = False
+    os2 = tables.get(b"OS/2")
+    if os2 is not None:
+        offset, length = os2
+        if length >= 6:
+            weight = _UINT16.unpack_from(data, offset + 4)[0]  # usWeightClass
+        if length >= 64:
+            selection = _UINT16.unpack_from(data, offset + 62)[0]  # fsSelection
+            italic = bool(selection & FS_SELECTION_ITALIC)
+            bold = bool(selection & FS_SELECTION_BOLD)
+    head = tables.get(b"head")
+    if head is not None and head[1] >= 46:
+        mac_style = _UINT16.unpack_from(data, head[0] + 44)[0]
+        italic = italic or bool(mac_style & MAC_STYLE_ITALIC)
+        bold = bold or bool(mac_style & MAC_STYLE_BOLD)
+    if not weight:
+        weight = 700 if bold else 400
+    return weight, italic, bold
@@ -10,12 +10,16 @@ import ctypes
 from ctypes import wintypes
 import io
 import base64
-from typing import Iterable, Optional, Set, Tuple
+import re
+from functools import lru_cache
+from typing import Iterable, List, Optional, Set, Tuple
 
-try:
-    from PIL import Image
-except ImportError:
-    Image = None
+from metrics import METRICS
+from width_buckets import WidthRange, narrow_width_range
+
+# PIL은 첫 렌더링 때 불러옵니다 (_load_pil); 폰트 열거만 하는 경로는 import 비용을 내지 않습니다.
+Image = None
+_PIL_CHECKED = False
 
 
 # GDI Constants
@@ -33,6 +37,12 @@ DT_CALCRECT = 0x00000400
 DT_SINGLELINE = 0x00000020
 DIB_RGB_COLORS = 0
 
+# DT_WORDBREAK가 공백이 아닌 곳에서도 끊을 수 있는 문자 (한글 자모/음절, CJK 기호·가나·한자, 전각).
+_BREAKABLE_RUN = re.compile('[\u1100-\u11ff\u2e80-\u9fff\ua960-\ua97f\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]')
+
+# render_variants() 항목: (text, size, weight, italic)
+Variant = Tuple[str, int, int, int]
+
 
 class LOGFONTW(ctypes.Structure):
     """Windows LOGFONTW structure"""
@@ -89,52 +99,85 @@ class BITMAPINFO(ctypes.Structure):
     ]
 
 
+@lru_cache(maxsize=32768)
+def _normalize_face_text(name: str) -> str:
+    return ''.join(ch.lower() for ch in name.strip() if ch.isalnum())
+
+
 def normalize_face_name(name: str) -> str:
     if not name:
         return ''
-    return ''.join(ch.lower() for ch in str(name).strip() if ch.isalnum())
+    return _normalize_face_text(name if isinstance(name, str) else str(name))
 
 
-# Setup GDI32 and User32 function signatures
+# GDI32 / User32 핸들. 함수 시그니처(argtypes/restype)는 bind_prototypes()가 처음 쓸 때 설정합니다.
 gdi32 = ctypes.windll.gdi32
 user32 = ctypes.windll.user32
+_PROTOTYPES_BOUND = False
+
+
+def bind_prototypes() -> None:
+    """GDI32/User32 함수 시그니처를 한 번만 설정합니다 (GDI 호출 전에 호출)."""
+    global _PROTOTYPES_BOUND
+    if _PROTOTYPES_BOUND:
+        return
+    if not hasattr(wintypes, 'HGDIOBJ'):
+        wintypes.HGDIOBJ = wintypes.HANDLE
+
+    gdi32.CreateCompatibleDC.argtypes = [wintypes.HDC]
+    gdi32.CreateCompatibleDC.restype = wintypes.HDC
+    gdi32.CreateFontIndirectW.argtypes = [ctypes.POINTER(LOGFONTW)]
+    gdi32.CreateFontIndirectW.restype = wintypes.HFONT
+    gdi32.SelectObject.argtypes = [wintypes.HDC, wintypes.HGDIOBJ]
+    gdi32.SelectObject.restype = wintypes.HGDIOBJ
+    gdi32.DeleteObject.argtypes = [wintypes.HGDIOBJ]
+    gdi32.DeleteObject.restype = wintypes.BOOL
+    gdi32.DeleteDC.argtypes = [wintypes.HDC]
+    gdi32.DeleteDC.restype = wintypes.BOOL
+    gdi32.SetBkMode.argtypes = [wintypes.HDC, wintypes.INT]
+    gdi32.SetBkMode.restype = wintypes.INT
+    gdi32.SetTextColor.argtypes = [wintypes.HDC, wintypes.COLORREF]
+    gdi32.SetTextColor.restype = wintypes.COLORREF
+    gdi32.CreateDIBSection.argtypes = [
+        wintypes.HDC,
+        ctypes.POINTER(BITMAPINFO),
+        wintypes.UINT,
+        ctypes.POINTER(ctypes.c_void_p),
+        wintypes.HANDLE,
+        wintypes.DWORD
+    ]
+    gdi32.CreateDIBSection.restype = wintypes.HBITMAP
+    gdi32.GetTextFaceW.argtypes = [wintypes.HDC, ctypes.c_int, wintypes.LPWSTR]
+    gdi32.GetTextFaceW.restype = ctypes.c_int
+    user32.DrawTextW.argtypes = [
+        wintypes.HDC,
+        wintypes.LPCWSTR,
+        ctypes.c_int,
+        ctypes.POINTER(RECT),
+        wintypes.UINT
+    ]
+    user32.DrawTextW.restype = ctypes.c_int
+    gdi32.GetTextExtentPoint32W.argtypes = [
+        wintypes.HDC,
+        wintypes.LPCWSTR,
+        ctypes.c_int,
+        ctypes.POINTER(wintypes.SIZE)
+    ]
+    gdi32.GetTextExtentPoint32W.restype = wintypes.BOOL
+    _PROTOTYPES_BOUND = True
+
 
-if not hasattr(wintypes, 'HGDIOBJ'):
-    wintypes.HGDIOBJ = wintypes.HANDLE
-
-gdi32.CreateCompatibleDC.argtypes = [wintypes.HDC]
-gdi32.CreateCompatibleDC.restype = wintypes.HDC
-gdi32.CreateFontIndirectW.argtypes = [ctypes.POINTER(LOGFONTW)]
-gdi32.CreateFontIndirectW.restype = wintypes.HFONT
-gdi32.SelectObject.argtypes = [wintypes.HDC, wintypes.HGDIOBJ]
-gdi32.SelectObject.restype = wintypes.HGDIOBJ
-gdi32.DeleteObject.argtypes = [wintypes.HGDIOBJ]
-gdi32.DeleteObject.restype = wintypes.BOOL
-gdi32.DeleteDC.argtypes = [wintypes.HDC]
-gdi32.DeleteDC.restype = wintypes.BOOL
-gdi32.SetBkMode.argtypes = [wintypes.HDC, wintypes.INT]
-gdi32.SetBkMode.restype = wintypes.INT
-gdi32.SetTextColor.argtypes = [wintypes.HDC, wintypes.COLORREF]
-gdi32.SetTextColor.restype = wintypes.COLORREF
-gdi32.CreateDIBSection.argtypes = [
-    wintypes.HDC,
-    ctypes.POINTER(BITMAPINFO),
-    wintypes.UINT,
-    ctypes.POINTER(ctypes.c_void_p),
-    wintypes.HANDLE,
-    wintypes.DWORD
-]
-gdi32.CreateDIBSection.restype = wintypes.HBITMAP
-gdi32.GetTextFaceW.argtypes = [wintypes.HDC, ctypes.c_int, wintypes.LPWSTR]
-gdi32.GetTextFaceW.restype = ctypes.c_int
-user32.DrawTextW.argtypes = [
-    wintypes.HDC,
-    wintypes.LPCWSTR,
-    ctypes.c_int,
-    ctypes.POINTER(RECT),
-    wintypes.UINT
-]
-user32.DrawTextW.restype = ctypes.c_int
+def _load_pil():
+    """PIL.Image 모듈을 처음 필요할 때 불러옵니다 (없으면 None)."""
+    global Image, _PIL_CHECKED
+    if not _PIL_CHECKED:
+        try:
+            from PIL import Image as pil_image
+        except ImportError:
+            pil_image = None
+        Image = pil_image
+        _PIL_CHECKED = True
+    return Image
 
 
 class GDIRenderer:
@@ -142,6 +185,8 @@ class GDIRenderer:
     Windows GDI를 사용한 폰트 렌더링 클래스
     
     Font substitution을 감지하여 잘못된 폰트가 사용되는 것을 방지합니다.
+    pad_to_width가 False면 이미지를 target_width까지 채우지 않고, 렌더링 후
+    last_width_range에 같은 줄바꿈이 나오는 너비 범위를 남깁니다 (True면 None).
     """
     
     def __init__(self, debug_callback=None):
@@ -151,6 +196,9 @@ class GDIRenderer:
         """
         self.debug = debug_callback or (lambda msg: None)
         self.last_actual_face: str = ''
+        self.last_width_range: Optional[WidthRange] = None
+        self.pad_to_width = True
+        bind_prototypes()
     
     def render(
         self,
@@ -179,20 +227,48 @@ class GDIRenderer:
                 - Substitution 발생 시: (None, True)
                 - 실패 시: (None, False)
         """
+        images, substituted = self.render_variants(
+            face_name, [(text, size, weight, italic)], target_width, alias_names
+        )
+        return images[0], substituted
+
+    def render_variants(
+        self,
+        face_name: str,
+        variants: List[Variant],
+        target_width: int = 0,
+        alias_names: Optional[Iterable[str]] = None
+    ) -> Tuple[List[Optional[str]], bool]:
+        """
+        한 페이스로 여러 변형(굵기/이탤릭/크기/텍스트)을 렌더링합니다.
+
+        DC 하나를 공유하고 substitution 검사는 처음 만든 폰트로 한 번만 합니다.
+
+        Args:
+            face_name: GDI 폰트 페이스 이름
+            variants: (text, size, weight, italic) 목록
+            target_width: 목표 너비 (0이면 자동)
+            alias_names: substitution 검사에서 같은 폰트로 인정할 이름들
+
+        Returns:
+            Tuple[List[Optional[str]], bool]: (변형별 base64 PNG 이미지, substitution 발생 여부)
+                - 이미지 목록은 항상 variants와 같은 길이이며 실패한 변형은 None
+                - Substitution 발생 시: ([None, ...], True)
+        """
         self.last_actual_face = ''
+        self.last_width_range = None
+        failed: List[Optional[str]] = [None] * len(variants)
 
-        if Image is None:
+        if _load_pil() is None:
             self.debug("PIL not available for GDI rendering")
-            return None, False
+            return failed, False
+        if not variants:
+            return [], False
         
         hdc = gdi32.CreateCompatibleDC(0)
         if not hdc:
             self.debug("CreateCompatibleDC failed")
-            return None, False
-        
-        hfont = None
-        hbitmap = None
-        old_font = old_bitmap = None
+            return failed, False
         
         try:
             alias_norms: Set[str] = {normalize_face_name(face_name)}
@@ -202,92 +278,175 @@ class GDIRenderer:
                     if norm_alias:
                         alias_norms.add(norm_alias)
 
-            # Create LOGFONT
-            logfont = LOGFONTW()
-            logfont.lfHeight = -abs(int(size))
-            logfont.lfWeight = weight
-            logfont.lfCharSet = DEFAULT_CHARSET
-            logfont.lfOutPrecision = OUT_DEFAULT_PRECIS
-            logfont.lfClipPrecision = CLIP_DEFAULT_PRECIS
-            logfont.lfQuality = ANTIALIASED_QUALITY
-            logfont.lfPitchAndFamily = DEFAULT_PITCH
-            logfont.lfItalic = italic
-            logfont.lfFaceName = face_name[:LF_FACESIZE - 1]
-            
-            # Create font with byref
-            hfont = gdi32.CreateFontIndirectW(ctypes.byref(logfont))
-            if not hfont:
-                self.debug(f"CreateFontIndirectW failed for '{face_name}'")
-                return None, False
-            
-            old_font = gdi32.SelectObject(hdc, hfont)
-            
-            # Check for font substitution using GetTextFaceW
-            actual_face = ctypes.create_unicode_buffer(LF_FACESIZE)
-            result = gdi32.GetTextFaceW(hdc, LF_FACESIZE, actual_face)
+            images: List[Optional[str]] = []
+            width_range: Optional[WidthRange] = (0, None)
+            verified = False
+            for text, size, weight, italic in variants:
+                with METRICS.stage("create_font"):
+                    hfont = self._create_font(face_name, size, weight, italic)
+                if not hfont:
+                    self.debug(f"CreateFontIndirectW failed for '{face_name}'")
+                    images.append(None)
+                    continue
+
+                old_font = gdi32.SelectObject(hdc, hfont)
+                try:
+                    if not verified:
+                        verified = True
+                        with METRICS.stage("face_check"):
+                            substituted = self._is_substituted(hdc, face_name, alias_norms, weight, italic)
+                        if substituted:
+                            return failed, True
+                    image, variant_range = self._draw(hdc, text, size, target_width)
+                    images.append(image)
+                    width_range = narrow_width_range(width_range, variant_range if image else None)
+                finally:
+                    if old_font:
+                        gdi32.SelectObject(hdc, old_font)
+                    gdi32.DeleteObject(hfont)
+            self.last_width_range = width_range
+            return images, False
             
-            substitution_detected = False
-
-            if result > 0:
-                actual_name = actual_face.value
-                self.last_actual_face = actual_name
-                actual_norm = normalize_face_name(actual_name)
-                if actual_norm not in alias_norms:
-                    substitution_detected = True
-                    self.debug(
-                        f"[GDI] Font substitution detected: requested '{face_name}' but got '{actual_name}'"
-                    )
-                else:
-                    if actual_norm != normalize_face_name(face_name):
-                        self.debug(
-                            f"[GDI] Alias match: '{actual_name}' recognized as variant of '{face_name}'"
-                        )
-                    self.debug(f"[GDI] ✓ Font verified: '{actual_name}' (weight={weight}, italic={italic})")
-            else:
-                self.debug("[GDI] GetTextFaceW returned 0; proceeding without substitution check")
+        except Exception as e:
+            self.debug(f"GDI rendering error: {e}")
+            return failed, False
+        
+        finally:
+            gdi32.DeleteDC(hdc)
 
-            if substitution_detected:
-                return None, True
+    @staticmethod
+    def _create_font(face_name: str, size: int, weight: int, italic: int):
+        logfont = LOGFONTW()
+        logfont.lfHeight = -abs(int(size))
+        logfont.lfWeight = weight
+        logfont.lfCharSet = DEFAULT_CHARSET
+        logfont.lfOutPrecision = OUT_DEFAULT_PRECIS
+        logfont.lfClipPrecision = CLIP_DEFAULT_PRECIS
+        logfont.lfQuality = ANTIALIASED_QUALITY
+        logfont.lfPitchAndFamily = DEFAULT_PITCH
+        logfont.lfItalic = italic
+        logfont.lfFaceName = face_name[:LF_FACESIZE - 1]
+        return gdi32.CreateFontIndirectW(ctypes.byref(logfont))
 
-            # Measure text
-            calc_rect = RECT(0, 0, target_width if target_width > 0 else 0, 0)
-            calc_flags = DT_NOPREFIX | DT_CALCRECT
-            if target_width > 0:
-                calc_flags |= DT_WORDBREAK
-            else:
-                calc_flags |= DT_SINGLELINE
-            
-            if user32.DrawTextW(hdc, text or ' ', -1, ctypes.byref(calc_rect), calc_flags) == 0:
-                self.debug("DrawTextW measurement failed")
-                return None, False
-            
-            measured_width = max(calc_rect.right - calc_rect.left, 1)
-            measured_height = max(calc_rect.bottom - calc_rect.top, size)
-            
-            final_width = target_width if target_width > 0 else measured_width
-            final_width = max(final_width, measured_width, 1)
-            final_height = measured_height
-            
-            # Create DIB section
-            bmi = BITMAPINFO()
-            bmi.bmiHeader.biSize = ctypes.sizeof(BITMAPINFOHEADER)
-            bmi.bmiHeader.biWidth = final_width
-            bmi.bmiHeader.biHeight = -final_height  # top-down DIB
-            bmi.bmiHeader.biPlanes = 1
-            bmi.bmiHeader.biBitCount = 32
-            bmi.bmiHeader.biCompression = 0  # BI_RGB
-            
-            bits = ctypes.c_void_p()
-            hbitmap = gdi32.CreateDIBSection(
-                hdc, ctypes.byref(bmi), DIB_RGB_COLORS,
-                ctypes.byref(bits), None, 0
+    def _is_substituted(self, hdc, face_name: str, alias_norms: Set[str], weight: int, italic: int) -> bool:
+        """GetTextFaceW로 선택된 폰트가 요청한 폰트(또는 별칭)인지 확인합니다."""
+        actual_face = ctypes.create_unicode_buffer(LF_FACESIZE)
+        result = gdi32.GetTextFaceW(hdc, LF_FACESIZE, actual_face)
+        if result <= 0:
+            self.debug("[GDI] GetTextFaceW returned 0; proceeding without substitution check")
+            return False
+
+        actual_name = actual_face.value
+        self.last_actual_face = actual_name
+        actual_norm = normalize_face_name(actual_name)
+        if actual_norm not in alias_norms:
+            self.debug(
+                f"[GDI] Font substitution detected: requested '{face_name}' but got '{actual_name}'"
             )
-            if not hbitmap:
-                self.debug("CreateDIBSection failed")
-                return None, False
-            
-            old_bitmap = gdi32.SelectObject(hdc, hbitmap)
-            
+            return True
+        if actual_norm != normalize_face_name(face_name):
+            self.debug(
+                f"[GDI] Alias match: '{actual_name}' recognized as variant of '{face_name}'"
+            )
+        self.debug(f"[GDI] ✓ Font verified: '{actual_name}' (weight={weight}, italic={italic})")
+        return False
+
+    @staticmethod
+    def _text_width(hdc, text: str) -> Tuple[int, int]:
+        """GetTextExtentPoint32W로 잰 (너비, 높이); 실패하면 (-1, -1)."""
+        extent = wintypes.SIZE()
+        units = len(text.encode('utf-16-le')) // 2
+        if not gdi32.GetTextExtentPoint32W(hdc, text, units, ctypes.byref(extent)):
+            return -1, -1
+        return extent.cx, extent.cy
+
+    def _wrap_range(self, hdc, text: str, target_width: int, wrapped_lines: int) -> Optional[WidthRange]:
+        """
+        DT_WORDBREAK와 같은 줄바꿈이 나오는 target_width 범위 [lo, hi)를 구합니다.
+
+        DrawTextW는 끊은 위치를 알려 주지 않으므로 단어 단위로 직접 재서 나눠 보고,
+        그 줄 수가 DT_CALCRECT 결과와 다르면(탭, 공백 연속 등) 범위를 모른다고(None) 봅니다.
+        한글/CJK 문자가 있으면 GDI가 글자 사이에서도 끊을 수 있어 줄 수가 같아도
+        끊은 위치가 다를 수 있으므로 처음부터 None입니다.
+        """
+        if _BREAKABLE_RUN.search(text):
+            return None
+        joined = 0
+        overflow: Optional[int] = None
+        lines = 0
+        for paragraph in text.replace('\r\n', '\n').split('\n'):
+            line = ''
+            for word in paragraph.split(' '):
+                candidate = f'{line} {word}' if line else word
+                if line:
+                    length, _ = self._text_width(hdc, candidate)
+                    if length < 0:
+                        return None
+                    if length > target_width:
+                        lines += 1
+                        line = word
+                        overflow = length if overflow is None else min(overflow, length)
+                        continue
+                    joined = max(joined, length)
+                line = candidate
+            lines += 1
+        if lines != wrapped_lines:
+            self.debug(f"[GDI] Line break check mismatch ({lines} vs {wrapped_lines}); width range unknown")
+            return None
+        return joined, overflow
+
+    def _draw(self, hdc, text: str, size: int, target_width: int) -> Tuple[Optional[str], Optional[WidthRange]]:
+        """DC에 선택된 폰트로 텍스트를 그려 (PNG base64, 같은 줄바꿈의 너비 범위)로 반환합니다."""
+        # Measure text
+        calc_rect = RECT(0, 0, target_width if target_width > 0 else 0, 0)
+        calc_flags = DT_NOPREFIX | DT_CALCRECT
+        if target_width > 0:
+            calc_flags |= DT_WORDBREAK
+        else:
+            calc_flags |= DT_SINGLELINE
+        
+        with METRICS.stage("measure"):
+            measured = user32.DrawTextW(hdc, text or ' ', -1, ctypes.byref(calc_rect), calc_flags)
+        if measured == 0:
+            self.debug("DrawTextW measurement failed")
+            return None, None
+        
+        measured_width = max(calc_rect.right - calc_rect.left, 1)
+        measured_height = max(calc_rect.bottom - calc_rect.top, size)
+
+        width_range: Optional[WidthRange] = None
+        # 단어마다 폭을 재므로, 범위를 쓰는 경우(패딩 없는 이미지)에만 계산합니다.
+        if target_width > 0 and not self.pad_to_width:
+            with METRICS.stage("measure"):
+                _, line_height = self._text_width(hdc, ' ')
+                if line_height > 0:
+                    wrapped_lines = max(1, round((calc_rect.bottom - calc_rect.top) / line_height))
+                    width_range = self._wrap_range(hdc, text or ' ', target_width, wrapped_lines)
+        
+        final_width = target_width if target_width > 0 and self.pad_to_width else measured_width
+        final_width = max(final_width, measured_width, 1)
+        final_height = measured_height
+        
+        # Create DIB section
+        bmi = BITMAPINFO()
+        bmi.bmiHeader.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+        bmi.bmiHeader.biWidth = final_width
+        bmi.bmiHeader.biHeight = -final_height  # top-down DIB
+        bmi.bmiHeader.biPlanes = 1
+        bmi.bmiHeader.biBitCount = 32
+        bmi.bmiHeader.biCompression = 0  # BI_RGB
+        
+        bits = ctypes.c_void_p()
+        hbitmap = gdi32.CreateDIBSection(
+            hdc, ctypes.byref(bmi), DIB_RGB_COLORS,
+            ctypes.byref(bits), None, 0
+        )
+        if not hbitmap:
+            self.debug("CreateDIBSection failed")
+            return None, None
+        
+        old_bitmap = gdi32.SelectObject(hdc, hbitmap)
+        try:
             # Set drawing mode
             gdi32.SetBkMode(hdc, TRANSPARENT)
             gdi32.SetTextColor(hdc, 0x00FFFFFF)  # white text
@@ -300,9 +459,11 @@ class GDIRenderer:
             else:
                 draw_flags |= DT_SINGLELINE
             
-            if user32.DrawTextW(hdc, text or ' ', -1, ctypes.byref(draw_rect), draw_flags) == 0:
+            with METRICS.stage("draw"):
+                drawn = user32.DrawTextW(hdc, text or ' ', -1, ctypes.byref(draw_rect), draw_flags)
+            if drawn == 0:
                 self.debug("DrawTextW drawing failed")
-                return None, False
+                return None, None
             
             # Convert to PIL image
             buffer = ctypes.string_at(bits, final_width * final_height * 4)
@@ -310,11 +471,16 @@ class GDIRenderer:
                 'RGBA', (final_width, final_height),
                 buffer, 'raw', 'BGRA', 0, 1
             ).copy()
-            
-            if image.mode != 'RGBA':
-                image = image.convert('RGBA')
-            
-            # Convert white text to alpha channel
+        finally:
+            if old_bitmap:
+                gdi32.SelectObject(hdc, old_bitmap)
+            gdi32.DeleteObject(hbitmap)
+        
+        if image.mode != 'RGBA':
+            image = image.convert('RGBA')
+        
+        # Convert white text to alpha channel
+        with METRICS.stage("alpha"):
             pixels = image.load()
             for y in range(final_height):
                 for x in range(final_width):
@@ -324,29 +490,14 @@ class GDIRenderer:
                         pixels[x, y] = (255, 255, 255, alpha)
                     else:
                         pixels[x, y] = (0, 0, 0, 0)
-            
-            # Encode to base64
-            output = io.BytesIO()
+        
+        # Encode to base64
+        output = io.BytesIO()
+        with METRICS.stage("png_encode"):
             image.save(output, format='PNG')
+        with METRICS.stage("base64"):
             encoded = base64.b64encode(output.getvalue()).decode('utf-8')
-            return f'data:image/png;base64,{encoded}', False
-            
-        except Exception as e:
-            self.debug(f"GDI rendering error: {e}")
-            return None, False
-        
-        finally:
-            # Cleanup
-            if old_font:
-                gdi32.SelectObject(hdc, old_font)
-            if old_bitmap:
-                gdi32.SelectObject(hdc, old_bitmap)
-            if hfont:
-                gdi32.DeleteObject(hfont)
-            if hbitmap:
-                gdi32.DeleteObject(hbitmap)
-            if hdc:
-                gdi32.DeleteDC(hdc)
+        return f'data:image/png;base64,{encoded}', width_range
 
 
 def render_with_gdi(
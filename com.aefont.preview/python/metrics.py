@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Lightweight render metrics for GET /metrics and the Server-Timing header.
+
+Hot paths wrap their stages in ``METRICS.stage("name")`` and bump counters
+with ``METRICS.increment``. Every stage feeds a fixed-bucket latency
+histogram; inside ``METRICS.request()`` the stage times of the current
+thread are also summed per request, which the server turns into a
+Server-Timing header. AE_FONT_METRICS=0 turns the stage timers into no-ops.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+ENABLED = os.environ.get("AE_FONT_METRICS", "1").strip().lower() not in {"0", "false", "no", "off"}
+
+# Upper bounds in seconds (Prometheus convention); the last bucket is +Inf.
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+PREFIX = "aefont"
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "total")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        index = 0
+        while index < len(BUCKETS) and seconds > BUCKETS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Bucket upper bound that covers ``q`` of the observations (None if empty or beyond the last bound)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+
+class RequestTiming:
+    """Stage durations summed over one request, in first-seen order."""
+
+    __slots__ = ("stages", "started")
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, float] = {}
+        self.started = time.perf_counter()
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def header(self) -> str:
+        parts = [f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in self.stages.items()]
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.2f}")
+        return ", ".join(parts)
+
+
+class _Stage:
+    __slots__ = ("metrics", "name", "started")
+
+    def __init__(self, metrics: "Metrics", name: str) -> None:
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self) -> "_Stage":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.metrics.observe(self.name, time.perf_counter() - self.started)
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Request:
+    __slots__ = ("local", "timing", "previous")
+
+    def __init__(self, local: threading.local) -> None:
+        self.local = local
+
+    def __enter__(self) -> RequestTiming:
+        self.previous = getattr(self.local, "timing", None)
+        self.timing = self.local.timing = RequestTiming()
+        return self.timing
+
+    def __exit__(self, *exc_info) -> None:
+        self.local.timing = self.previous
+
+
+class Metrics:
+    def __init__(self, enabled: bool = ENABLED) -> None:
+        self.enabled = enabled
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self._local = threading.local()
+
+    def stage(self, name: str):
+        """Context manager timing one stage into its histogram (and the current request)."""
+        return _Stage(self, name) if self.enabled else _NULL_STAGE
+
+    def request(self) -> _Request:
+        """Collect this thread's stage times until exit; yields the RequestTiming."""
+        return _Request(self._local)
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(seconds)
+        timing = getattr(self._local, "timing", None)
+        if timing is not None:
+            timing.add(name, seconds)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            counters = dict(self._counters)
+            stages = {
+                name: {
+                    "count": histogram.count,
+                    "totalMs": round(histogram.total * 1000, 3),
+                    "meanMs": round(histogram.total * 1000 / histogram.count, 3) if histogram.count else 0.0,
+                    "p50Ms": _ms(histogram.quantile(0.5)),
+                    "p90Ms": _ms(histogram.quantile(0.9)),
+                    "p99Ms": _ms(histogram.quantile(0.99)),
+                }
+                for name, histogram in self._histograms.items()
+            }
+        return {"uptimeSeconds": round(time.time() - self.started, 1), "counters": counters, "stages": stages}
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        with self._lock:
+            for name, value in sorted(self._counters.items()):
+                metric = f"{PREFIX}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+            metric = f"{PREFIX}_stage_seconds"
+            if self._histograms:
+                lines.append(f"# TYPE {metric} histogram")
+            for name, histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, count in zip((*BUCKETS, "+Inf"), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{stage="{name}"}} {histogram.total:.6f}')
+                lines.append(f'{metric}_count{{stage="{name}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+METRICS = Metrics()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+PIL Renderer - Pillow(FreeType)를 사용한 폰트 렌더링
+
+GDI가 없는 환경(Linux/macOS)이나 AE_FONT_RENDERER=pil일 때 쓰는 렌더러입니다.
+폰트를 이름이 아니라 레지스트리가 찾아 준 파일(경로 + TTC 인덱스)로 열기
+때문에 substitution이 일어나지 않으며, 파일을 찾지 못하면 실패로 처리합니다.
+출력 형식(흰 글자 + 알파, PNG base64)은 GDIRenderer와 같습니다.
+"""
+
+import base64
+import io
+import math
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from metrics import METRICS
+from width_buckets import WidthRange, narrow_width_range
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:
+    Image = ImageDraw = ImageFont = None
+
+
+FW_NORMAL = 400
+# 열어 둔 FreeType 폰트 객체 수 (경로, 인덱스, 크기별)
+FONT_CACHE_SIZE = 64
+
+# (face_name, weight, italic) -> FontFace 또는 None
+FaceLookup = Callable[[str, int, int], Optional[object]]
+# render_variants() 항목: (text, size, weight, italic)
+Variant = Tuple[str, int, int, int]
+
+
+class PILRenderer:
+    """
+    Pillow를 사용한 폰트 렌더링 클래스
+
+    GDIRenderer와 같은 render() 시그니처와 last_actual_face, last_width_range,
+    pad_to_width 속성을 제공합니다.
+    """
+
+    def __init__(self, debug_callback=None, face_lookup: Optional[FaceLookup] = None):
+        """
+        Args:
+            debug_callback: 디버그 메시지를 출력할 콜백 함수
+            face_lookup: 폰트 이름과 스타일로 FontFace(path, index, full_name)를
+                찾는 함수 (보통 FontRegistry.face_for_style)
+        """
+        self.debug = debug_callback or (lambda msg: None)
+        self.face_lookup = face_lookup or (lambda name, weight, italic: None)
+        self.last_actual_face: str = ''
+        # 마지막 렌더링과 줄바꿈이 같은 target_width 범위 (모르면 None)
+        self.last_width_range: Optional[WidthRange] = None
+        # False면 이미지를 target_width까지 채우지 않고 글자 너비대로 만듭니다.
+        # 그래야 줄바꿈이 같은 너비끼리 이미지를 그대로 재사용할 수 있습니다.
+        self.pad_to_width = True
+        self._fonts: "OrderedDict[Tuple[str, int, int], object]" = OrderedDict()
+
+    def _font(self, path: str, index: int, size: int):
+        key = (path, index, size)
+        font = self._fonts.get(key)
+        if font is None:
+            font = ImageFont.truetype(path, size, index=index)
+            self._fonts[key] = font
+            if len(self._fonts) > FONT_CACHE_SIZE:
+                self._fonts.popitem(last=False)
+        else:
+            self._fonts.move_to_end(key)
+        return font
+
+    @staticmethod
+    def _layout(font, text: str, target_width: int) -> Tuple[List[str], Optional[WidthRange]]:
+        """
+        DT_WORDBREAK처럼 단어 단위로 줄을 나눕니다 (target_width가 0이면 한 줄).
+
+        줄바꿈과 함께, 같은 줄바꿈이 나오는 너비 범위 [lo, hi)를 돌려줍니다.
+        lo는 이어 붙인 줄 중 가장 긴 것, hi는 넘쳐서 끊은 후보 중 가장 짧은 것이며
+        끊은 곳이 없으면 hi는 None(상한 없음)입니다.
+        """
+        if target_width <= 0:
+            return [text.replace('\n', ' ')], None
+        lines: List[str] = []
+        joined = 0.0
+        overflow: Optional[float] = None
+        for paragraph in text.split('\n'):
+            line = ''
+            for word in paragraph.split(' '):
+                candidate = f'{line} {word}' if line else word
+                if line:
+                    length = font.getlength(candidate)
+                    if length > target_width:
+                        lines.append(line)
+                        line = word
+                        overflow = length if overflow is None else min(overflow, length)
+                        continue
+                    joined = max(joined, length)
+                line = candidate
+            lines.append(line)
+        return lines, (math.ceil(joined), None if overflow is None else math.ceil(overflow))
+
+    def render(
+        self,
+        face_name: str,
+        text: str,
+        size: int,
+        weight: int = FW_NORMAL,
+        italic: int = 0,
+        target_width: int = 0,
+        alias_names: Optional[Iterable[str]] = None
+    ) -> Tuple[Optional[str], bool]:
+        """
+        폰트 파일을 찾아 텍스트를 렌더링합니다.
+
+        Args:
+            face_name: 폰트 이름 (패밀리, 전체 이름 또는 PostScript 이름)
+            text: 렌더링할 텍스트
+            size: 폰트 크기 (픽셀)
+            weight: 폰트 굵기 (가장 가까운 face 선택에 사용)
+            italic: 이탤릭 여부
+            target_width: 목표 너비 (0이면 자동)
+            alias_names: GDIRenderer와의 호환용 (사용하지 않음)
+
+        Returns:
+            Tuple[Optional[str], bool]: (base64 PNG 이미지, substitution 발생 여부)
+                - 성공 시: (data:image/png;base64,..., False)
+                - 파일이 없거나 실패 시: (None, False)
+        """
+        images, substituted = self.render_variants(
+            face_name, [(text, size, weight, italic)], target_width, alias_names
+        )
+        return images[0], substituted
+
+    def render_variants(
+        self,
+        face_name: str,
+        variants: List[Variant],
+        target_width: int = 0,
+        alias_names: Optional[Iterable[str]] = None
+    ) -> Tuple[List[Optional[str]], bool]:
+        """
+        한 폰트로 여러 변형(굵기/이탤릭/크기/텍스트)을 렌더링합니다.
+
+        변형마다 가장 가까운 face 파일을 고르며, 열어 둔 폰트 객체는 캐시를 공유합니다.
+
+        Args:
+            face_name: 폰트 이름 (패밀리, 전체 이름 또는 PostScript 이름)
+            variants: (text, size, weight, italic) 목록
+            target_width: 목표 너비 (0이면 자동)
+            alias_names: GDIRenderer와의 호환용 (사용하지 않음)
+
+        Returns:
+            Tuple[List[Optional[str]], bool]: (변형별 base64 PNG 이미지, substitution 발생 여부)
+                - 이미지 목록은 항상 variants와 같은 길이이며 실패한 변형은 None
+                - 파일 기반이므로 substitution은 항상 False
+        """
+        self.last_actual_face = ''
+        self.last_width_range = None
+
+        if Image is None:
+            self.debug("PIL not available for rendering")
+            return [None] * len(variants), False
+
+        images: List[Optional[str]] = []
+        width_range: Optional[WidthRange] = (0, None)
+        for text, size, weight, italic in variants:
+            face = self.face_lookup(face_name, weight, italic)
+            if face is None:
+                self.debug(f"[PIL] No font file for '{face_name}'")
+                return [None] * len(variants), False
+            if not self.last_actual_face:
+                self.last_actual_face = face.full_name or face.family
+            image, variant_range = self._draw(face, face_name, text, size, target_width)
+            images.append(image)
+            width_range = narrow_width_range(width_range, variant_range if image else None)
+        self.last_width_range = width_range
+        return images, False
+
+    def _draw(
+        self, face, face_name: str, text: str, size: int, target_width: int
+    ) -> Tuple[Optional[str], Optional[WidthRange]]:
+        try:
+            with METRICS.stage("create_font"):
+                font = self._font(face.path, face.index, max(1, int(size)))
+            with METRICS.stage("measure"):
+                lines, width_range = self._layout(font, text or ' ', target_width)
+
+                ascent, descent = font.getmetrics()
+                line_height = ascent + descent
+                measured_width = max(int(font.getlength(line) + 0.999) for line in lines)
+                final_width = max(target_width if self.pad_to_width else 0, measured_width, 1)
+                final_height = max(line_height * len(lines), size, 1)
+
+            with METRICS.stage("draw"):
+                mask = Image.new('L', (final_width, final_height), 0)
+                draw = ImageDraw.Draw(mask)
+                for row, line in enumerate(lines):
+                    draw.text((0, row * line_height), line, font=font, fill=255)
+
+            # 흰 글자 + 커버리지 알파; 빈 픽셀은 GDI 결과처럼 (0, 0, 0, 0)
+            with METRICS.stage("alpha"):
+                color = mask.point(lambda value: 255 if value else 0)
+                image = Image.merge('RGBA', (color, color, color, mask))
+
+            output = io.BytesIO()
+            with METRICS.stage("png_encode"):
+                image.save(output, format='PNG')
+            with METRICS.stage("base64"):
+                encoded = base64.b64encode(output.getvalue()).decode('utf-8')
+            return f'data:image/png;base64,{encoded}', width_range
+
+        except Exception as e:
+            self.debug(f"PIL rendering error for '{face_name}': {e}")
+            return None, None
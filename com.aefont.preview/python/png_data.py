@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+PNG data URLs: the form previews travel in ("data:image/png;base64,...").
+
+Shared by the modules that post-process rendered previews (sprite_atlas.py,
+size_pyramid.py, preview_ring.py). Pillow is imported on first use so that
+server start-up and catalog-only paths do not pay for it.
+"""
+
+from __future__ import annotations
+
+import base64
+import io
+
+DATA_URL_PREFIX = "data:image/png;base64,"
+
+
+def load_pil():
+    """PIL.Image, imported on first use (None if Pillow is missing)."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    return Image
+
+
+def decode_data_url(data_url: str):
+    """A preview's PNG as a loaded PIL image (the prefix is optional); requires Pillow."""
+    raw = base64.b64decode(data_url[len(DATA_URL_PREFIX):] if data_url.startswith(DATA_URL_PREFIX) else data_url)
+    image = load_pil().open(io.BytesIO(raw))
+    image.load()
+    return image
+
+
+def encode_data_url(image, **options) -> str:
+    """Save a PIL image as PNG (``options`` go to ``Image.save``) and wrap it in a data URL."""
+    output = io.BytesIO()
+    image.save(output, format="PNG", **options)
+    return DATA_URL_PREFIX + base64.b64encode(output.getvalue()).decode("ascii")
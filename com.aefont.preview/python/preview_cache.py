@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+In-memory LRU cache of rendered previews.
+
+Entries are keyed by everything that influences a render (requested names,
+style, text, size, width) and tagged with the catalog key of the font that
+produced them, so a registry refresh can drop only the previews of fonts
+that were removed or replaced.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Optional
+
+DEFAULT_CAPACITY = 512
+
+
+class PreviewCache:
+    """Thread-safe LRU of render results, invalidated per font key."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.capacity = max(0, capacity)
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Dict[str, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Dict[str, object]]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key: Hashable, result: Dict[str, object]) -> None:
+        if not self.capacity:
+            return
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, font_keys: Iterable[str]) -> int:
+        """Drop every preview rendered with one of ``font_keys``; returns how many."""
+        doomed = set(font_keys)
+        if not doomed:
+            return 0
+        with self._lock:
+            stale = [key for key, result in self._entries.items() if result.get("normalizedKey") in doomed]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
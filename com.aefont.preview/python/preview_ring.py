@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Shared-memory transport for preview pixels ("transport": "shm").
+
+Instead of base64 PNGs inside the JSON body, /batch-preview writes each PNG
+into a slot of a memory-mapped ring file next to the shared-server lockfile
+(preview_ring_<pid>.bin) and returns a descriptor:
+
+    {"slot": 17, "offset": 286720, "length": 4711, "generation": 42}
+
+File layout (little-endian):
+
+    0    header   magic b"AEFR", version, slot count, slot size, data start
+    64   table    per slot: generation (u64), length (u32), reserved (u32)
+    ...  data     slot i at data start + i * slot size
+
+Slots are reused round-robin. Every slot carries a generation used as a
+seqlock: the writer makes it odd before touching the data and even again
+(a new value) once the PNG and its length are in place. A reader checks the
+slot's generation against the descriptor before and after copying the
+bytes; any mismatch means the slot was reused (or is being rewritten) and
+the copy must be discarded and the preview re-requested over HTTP. PNGs
+larger than a slot stay inline as "image".
+"""
+
+from __future__ import annotations
+
+import base64
+import mmap
+import os
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from metrics import METRICS
+from png_data import DATA_URL_PREFIX
+
+MAGIC = b"AEFR"
+VERSION = 1
+# Slots in the ring; a batch bigger than this overwrites its own first previews.
+RING_SLOTS = int(os.environ.get("AE_FONT_SHM_SLOTS", "1024"))
+# Bytes per slot; larger PNGs are sent inline.
+RING_SLOT_SIZE = int(os.environ.get("AE_FONT_SHM_SLOT_KB", "16")) * 1024
+
+HEADER = struct.Struct("<4sIIII")  # magic, version, slots, slot size, data start
+HEADER_SIZE = 64
+ENTRY = struct.Struct("<QII")  # generation, length, reserved
+PAGE = 4096
+
+Descriptor = Dict[str, int]
+
+
+def _data_start(slots: int) -> int:
+    table_end = HEADER_SIZE + slots * ENTRY.size
+    return (table_end + PAGE - 1) // PAGE * PAGE
+
+
+def remove_stale_rings(directory: Path) -> None:
+    """Delete ring files left behind by server processes that are gone."""
+    for path in directory.glob("preview_ring_*.bin"):
+        pid = path.stem.rsplit("_", 1)[-1]
+        if pid == str(os.getpid()):
+            continue
+        if sys.platform != "win32":
+            try:
+                os.kill(int(pid), 0)
+                continue  # still running
+            except (ValueError, ProcessLookupError):
+                pass
+            except PermissionError:
+                continue
+        try:
+            path.unlink()
+        except OSError:
+            pass  # on Windows: still mapped by a live server
+
+
+class PreviewRing:
+    """Writer side; one per server process."""
+
+    def __init__(self, path: Path, slots: int = RING_SLOTS, slot_size: int = RING_SLOT_SIZE) -> None:
+        self.path = path
+        self.slots = max(1, slots)
+        self.slot_size = slot_size
+        self.data_start = _data_start(self.slots)
+        self._lock = threading.Lock()
+        self._next = 0
+        self._generations = [0] * self.slots
+        path.parent.mkdir(parents=True, exist_ok=True)
+        size = self.data_start + self.slots * slot_size
+        with path.open("wb") as handle:
+            handle.truncate(size)
+        self._file = path.open("r+b")
+        self._map = mmap.mmap(self._file.fileno(), size)
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, self.slots, slot_size, self.data_start)
+
+    def info(self) -> Dict[str, object]:
+        """What a client needs to open the ring (sent with every shm response)."""
+        return {"path": str(self.path), "slots": self.slots, "slotSize": self.slot_size, "dataStart": self.data_start}
+
+    def write(self, png: bytes) -> Optional[Descriptor]:
+        """Copy ``png`` into the next slot; None if it does not fit in one."""
+        if len(png) > self.slot_size:
+            METRICS.increment("ring_inline")
+            return None
+        with self._lock:
+            slot = self._next
+            self._next = (slot + 1) % self.slots
+            entry = HEADER_SIZE + slot * ENTRY.size
+            offset = self.data_start + slot * self.slot_size
+            generation = self._generations[slot] + 1
+            # Odd: readers holding an older descriptor see the mismatch even mid-copy.
+            ENTRY.pack_into(self._map, entry, generation, 0, 0)
+            self._map[offset:offset + len(png)] = png
+            generation += 1
+            ENTRY.pack_into(self._map, entry, generation, len(png), 0)
+            self._generations[slot] = generation
+        METRICS.increment("ring_writes")
+        return {"slot": slot, "offset": offset, "length": len(png), "generation": generation}
+
+    def export(self, item: Dict[str, object]) -> Dict[str, object]:
+        """Copy of a preview (or atlas) dict with its "image" moved into the ring when it fits."""
+        image = item.get("image")
+        variants = item.get("variants")
+        if isinstance(image, str) and image.startswith(DATA_URL_PREFIX):
+            descriptor = self.write(base64.b64decode(image[len(DATA_URL_PREFIX):]))
+            if descriptor is not None:
+                item = {key: value for key, value in item.items() if key != "image"}
+                item["shm"] = descriptor
+        elif isinstance(variants, list):
+            item = dict(item, variants=[
+                self.export(variant) if isinstance(variant, dict) else variant for variant in variants
+            ])
+        return item
+
+    def close(self) -> None:
+        with self._lock:
+            self._map.close()
+            self._file.close()
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+
+class RingReader:
+    """Reader side (benchmarks, tools); the panel would do the same with fs reads."""
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.slots, self.slot_size, self.data_start = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a preview ring (version {VERSION})")
+
+    def read(self, descriptor: Descriptor) -> Optional[bytes]:
+        """The PNG bytes, or None if the slot has been reused since the descriptor was issued."""
+        slot = descriptor["slot"]
+        generation = descriptor["generation"]
+        entry = HEADER_SIZE + slot * ENTRY.size
+        before, length, _ = ENTRY.unpack_from(self._map, entry)
+        if before != generation or length != descriptor["length"]:
+            return None
+        offset = descriptor["offset"]
+        data = self._map[offset:offset + length]
+        after, _, _ = ENTRY.unpack_from(self._map, entry)
+        return data if after == generation else None
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
@@ -0,0 +1,646 @@
+#!/usr/bin/env python3
+"""
+Preview rendering for /preview and /batch-preview.
+
+PreviewService turns a request entry (name, aliases, PostScript name,
+family, style, width) into an attempt queue of face names, renders them
+until one is not substituted and caches the result. The renderer is GDI on
+Windows and Pillow elsewhere (AE_FONT_RENDERER=gdi|pil overrides). With
+AE_FONT_RENDER_WORKERS > 0, large batches are sharded across a pool of
+warm worker processes (render_farm.py).
+
+Below the request-keyed cache sits a face cache keyed by (face name, style,
+text, size, width), shared by requests that differ only in decoration
+(aliases, ids) and filled ahead of time by the idle prefetcher
+(prefetch.py, AE_FONT_PREFETCH_RADIUS).
+
+An entry may carry ``variants`` -- [{"weight", "italic", "size", "text"}] or
+[weight, italic, size, text] lists, missing fields defaulting to the entry's
+style and the batch text/size. They are rendered with one resolved face (one
+DC and one substitution check under GDI) and returned together under the
+result's "variants" key instead of "image".
+
+With AE_FONT_WIDTH_BUCKET > 0, widths are rounded down to buckets and
+previews are not padded to the wrap width (width_buckets.py). Each result
+then carries "widthRange" -- the widths with the same line breaks -- and a
+request at another width inside that range gets the cached preview
+("width_reuse" metric) instead of a render.
+
+In interactive batches (size-slider scrubbing, width buckets on) previews
+are downsampled from a master rendered once at a larger size and marked
+"approximate" (size_pyramid.py).
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from attempt_log import AttemptLogWriter
+from font_name_resolver import parse_style_flags
+from font_registry import FontMeta, FontRegistry, normalize
+from metrics import METRICS
+from preview_cache import PreviewCache
+from size_pyramid import downsample, master_size, master_width
+from width_buckets import WIDTH_BUCKET, WidthRange, bucket_width, in_width_range
+
+LOG = logging.getLogger("font_server")
+
+PREVIEW_CACHE_SIZE = int(os.environ.get("AE_FONT_PREVIEW_CACHE", "512"))
+# auto: GDI on Windows, Pillow + font files elsewhere.
+RENDERER = os.environ.get("AE_FONT_RENDERER", "auto").strip().lower()
+# Worker processes for large batches; 0 renders everything in the server process.
+RENDER_WORKERS = int(os.environ.get("AE_FONT_RENDER_WORKERS", "0"))
+# Smaller batches are not worth the round trip to the workers.
+FARM_MIN_BATCH = int(os.environ.get("AE_FONT_RENDER_FARM_MIN_BATCH", "64"))
+# Upper bound on "variants" per entry (a detail view needs about five).
+MAX_VARIANTS = 16
+VARIANT_FIELDS = ("weight", "italic", "size", "text")
+# Distinct line-break layouts remembered per request (ignoring width).
+LAYOUTS_PER_KEY = 4
+
+
+def create_renderer(registry: FontRegistry, debug_callback=None):
+    """Return the renderer selected by AE_FONT_RENDERER for this platform."""
+    if RENDERER == "gdi" or (RENDERER != "pil" and sys.platform == "win32"):
+        from gdi_renderer import GDIRenderer
+
+        renderer = GDIRenderer(debug_callback)
+    else:
+        from pil_renderer import PILRenderer
+
+        renderer = PILRenderer(debug_callback, registry.face_for_style)
+    # Unpadded previews depend only on their line breaks, so they can be shared across widths.
+    renderer.pad_to_width = WIDTH_BUCKET <= 0
+    return renderer
+
+
+class PreviewService:
+    def __init__(
+        self,
+        registry: FontRegistry,
+        cache_size: int = PREVIEW_CACHE_SIZE,
+        attempt_log: Optional[AttemptLogWriter] = None,
+        workers: int = RENDER_WORKERS,
+        prefetch_radius: Optional[int] = None,
+    ) -> None:
+        self.registry = registry
+        self.renderer = create_renderer(registry, LOG.info)
+        self.cache = PreviewCache(cache_size)
+        self.faces = PreviewCache(cache_size)
+        # Request key without its width -> {"normalizedKey", "results"}: previews by line-break layout.
+        self.layouts = PreviewCache(cache_size if WIDTH_BUCKET > 0 else 0)
+        # Approximate previews downsampled from a larger master, by request key.
+        self.derived = PreviewCache(cache_size)
+        if attempt_log is None:
+            attempt_log = AttemptLogWriter.from_env(Path('font_debug') / 'gdi_attempts.log', LOG.debug)
+        self._gdi_log = attempt_log
+        self.farm = None
+        if workers > 0:
+            from render_farm import RenderFarm
+
+            self.farm = RenderFarm(workers, LOG.info)
+        self.prefetcher = None
+        from prefetch import PREFETCH_RADIUS, Prefetcher
+
+        radius = PREFETCH_RADIUS if prefetch_radius is None else prefetch_radius
+        if radius > 0 and cache_size > 0:
+            # Its own renderer: renderers keep per-instance state and are not shared across threads.
+            self.prefetcher = Prefetcher(self, create_renderer(registry, LOG.debug), radius)
+        registry.add_listener(self._on_registry_change)
+
+    def _on_registry_change(self, added: List[FontMeta], removed: List[FontMeta]) -> None:
+        changed = {meta.key for meta in (*added, *removed)}
+        self.faces.invalidate(changed)
+        self.layouts.invalidate(changed)
+        self.derived.invalidate(changed)
+        dropped = self.cache.invalidate(changed)
+        if dropped:
+            LOG.info("Dropped %d cached previews for changed fonts", dropped)
+        if self.farm is not None:
+            # Worker registries were built at spawn time; replace them.
+            self.farm.restart()
+
+    @staticmethod
+    def _entry_width(entry: Dict[str, object]) -> int:
+        """The entry's wrap width, rounded down to its AE_FONT_WIDTH_BUCKET bucket."""
+        raw_width = entry.get("width")
+        if isinstance(raw_width, (int, float)):
+            return bucket_width(int(max(0, raw_width)))
+        if isinstance(raw_width, str) and raw_width.isdigit():
+            return bucket_width(int(raw_width))
+        return 0
+
+    @staticmethod
+    def _cache_key(entry: Dict[str, object], text: str, size: int, width: int) -> Tuple:
+        raw_aliases = entry.get("aliases")
+        aliases = tuple(str(alias) for alias in raw_aliases) if isinstance(raw_aliases, list) else ()
+        return (
+            str(entry.get("name") or ""),
+            aliases,
+            str(entry.get("postScriptName") or ""),
+            str(entry.get("family") or ""),
+            str(entry.get("style") or ""),
+            text,
+            size,
+            PreviewService._entry_variants(entry),
+            width,  # last: cache_key[:-1] is the layout key
+        )
+
+    @staticmethod
+    def _entry_variants(entry: Dict[str, object]) -> Optional[Tuple[Tuple, ...]]:
+        """Parse ``entry["variants"]`` into (weight, italic, size, text) tuples; None = not requested."""
+        raw_variants = entry.get("variants")
+        if not isinstance(raw_variants, list) or not raw_variants:
+            return None
+        variants = []
+        for raw in raw_variants[:MAX_VARIANTS]:
+            if isinstance(raw, dict):
+                fields = [raw.get(name) for name in VARIANT_FIELDS]
+            elif isinstance(raw, (list, tuple)):
+                fields = (list(raw) + [None] * len(VARIANT_FIELDS))[:len(VARIANT_FIELDS)]
+            else:
+                continue
+            weight, italic, size, text = fields
+            variants.append((
+                int(weight) if isinstance(weight, (int, float)) and not isinstance(weight, bool) else None,
+                bool(italic) if italic is not None else None,
+                int(size) if isinstance(size, (int, float)) and not isinstance(size, bool) and size > 0 else None,
+                str(text) if text is not None else None,
+            ))
+        return tuple(variants) or None
+
+    @staticmethod
+    def _face_key(
+        face_name: str,
+        record: Optional[FontMeta],
+        weight: int,
+        italic: int,
+        text: str,
+        size: int,
+        width: int,
+    ) -> Tuple:
+        face_weight, face_italic = record.pick_style(weight, italic) if record else (weight, italic)
+        return normalize(face_name), face_weight, int(bool(face_italic)), text, size, width
+
+    @staticmethod
+    def _for_request(entry: Dict[str, object], cached: Dict[str, object], width: int) -> Dict[str, object]:
+        """Re-label a cached result with this request's identifiers."""
+        normalized_key = cached["normalizedKey"]
+        return dict(
+            cached,
+            requestId=entry.get("requestId") or f"{normalized_key}:{width}",
+            pythonKey=entry.get("pythonKey") or normalized_key,
+        )
+
+    def _cached(self, cache_key: Tuple, width: int) -> Optional[Dict[str, object]]:
+        """Cached result for this key, or one rendered at another width that wraps identically."""
+        cached = self.cache.get(cache_key)
+        if cached is not None or WIDTH_BUCKET <= 0:
+            return cached
+        layouts = self.layouts.get(cache_key[:-1])
+        if layouts is None:
+            return None
+        for result in layouts["results"]:
+            if in_width_range(width, result.get("widthRange")):
+                METRICS.increment("width_reuse")
+                self.cache.put(cache_key, result)
+                return result
+        return None
+
+    def _remember_layout(self, cache_key: Tuple, result: Dict[str, object]) -> None:
+        if WIDTH_BUCKET <= 0 or not result.get("widthRange"):
+            return
+        layout_key = cache_key[:-1]
+        layouts = self.layouts.get(layout_key)
+        results = [result] + (layouts["results"][:LAYOUTS_PER_KEY - 1] if layouts else [])
+        self.layouts.put(layout_key, {"normalizedKey": result["normalizedKey"], "results": results})
+
+    def render_entry(
+        self,
+        entry: Dict[str, object],
+        text: str,
+        size: int,
+    ) -> Optional[Dict[str, object]]:
+        width = self._entry_width(entry)
+        cache_key = self._cache_key(entry, text, size, width)
+        cached = self._cached(cache_key, width)
+        if cached is not None:
+            METRICS.increment("cache_hits")
+            return self._for_request(entry, cached, width)
+        METRICS.increment("cache_misses")
+
+        with METRICS.stage("resolve"):
+            weight, italic = self.requested_style(entry)
+            variants = self._entry_variants(entry)
+            if variants is not None:
+                variants = tuple(
+                    (
+                        weight if v_weight is None else v_weight,
+                        italic if v_italic is None else int(v_italic),
+                        size if v_size is None else v_size,
+                        text if v_text is None else v_text,
+                    )
+                    for v_weight, v_italic, v_size, v_text in variants
+                )
+
+            attempt_queue = self._attempt_queue(entry)
+        if not attempt_queue:
+            METRICS.increment("render_failures")
+            return None
+
+        if variants is None:
+            # Any successful render of one of this entry's faces in this style is the same preview.
+            for face_name, _, record, _ in attempt_queue:
+                face_key = self._face_key(face_name, record, weight, italic, text, size, width)
+                face = self.faces.get(face_key)
+                if face is not None:
+                    METRICS.increment("face_cache_hits")
+                    if face.get("prefetched"):
+                        # Count the first use only; cached dicts are shared, so replace rather than edit.
+                        METRICS.increment("prefetch_hits")
+                        used = dict(face)
+                        del used["prefetched"]
+                        self.faces.put(face_key, used)
+                    return self._finish(
+                        entry, cache_key, face_name, record, face["resolvedName"], width, face["image"],
+                        width_range=face.get("widthRange"),
+                    )
+
+        for face_name, alias_names, record, source in attempt_queue:
+            if variants is None:
+                face_weight, face_italic = record.pick_style(weight, italic) if record else (weight, italic)
+                image, substituted = self.renderer.render(
+                    face_name,
+                    text,
+                    size,
+                    weight=face_weight,
+                    italic=int(bool(face_italic)),
+                    target_width=width,
+                    alias_names=alias_names,
+                )
+                images = [image]
+            else:
+                specs = []
+                for v_weight, v_italic, v_size, v_text in variants:
+                    face_weight, face_italic = (
+                        record.pick_style(v_weight, v_italic) if record else (v_weight, v_italic)
+                    )
+                    specs.append((v_text, v_size, face_weight, int(bool(face_italic))))
+                images, substituted = self.renderer.render_variants(
+                    face_name,
+                    specs,
+                    target_width=width,
+                    alias_names=alias_names,
+                )
+            actual_face = getattr(self.renderer, "last_actual_face", "")
+            width_range = getattr(self.renderer, "last_width_range", None)
+            METRICS.increment("render_attempts")
+            if substituted:
+                METRICS.increment("substitutions")
+            self._log_gdi_attempt(
+                entry,
+                face_name=face_name,
+                actual_face=actual_face,
+                status="substituted" if substituted else ("success" if any(images) else "failed"),
+                source=source,
+            )
+            if substituted:
+                continue
+            if not any(images):
+                continue
+
+            if variants is not None:
+                return self._finish(entry, cache_key, face_name, record, actual_face, width, variants=[
+                    {"weight": v_weight, "italic": bool(v_italic), "size": v_size, "text": v_text, "image": image}
+                    for (v_weight, v_italic, v_size, v_text), image in zip(variants, images)
+                ], width_range=width_range)
+            self.faces.put(self._face_key(face_name, record, weight, italic, text, size, width), {
+                "image": images[0],
+                "resolvedName": actual_face,
+                "normalizedKey": record.key if record else normalize(face_name),
+                "widthRange": width_range,
+            })
+            return self._finish(
+                entry, cache_key, face_name, record, actual_face, width, images[0], width_range=width_range
+            )
+
+        METRICS.increment("render_failures")
+        return None
+
+    def _finish(
+        self,
+        entry: Dict[str, object],
+        cache_key: Tuple,
+        face_name: str,
+        record: Optional[FontMeta],
+        actual_face: str,
+        width: int,
+        image: Optional[str] = None,
+        variants: Optional[List[Dict[str, object]]] = None,
+        width_range: Optional[WidthRange] = None,
+    ) -> Dict[str, object]:
+        """Build (and cache) the response entry for a successful render."""
+        request_id = entry.get("requestId")
+        if not request_id:
+            key_hint = record.key if record else normalize(face_name)
+            request_id = f"{key_hint}:{width}"
+
+        normalized_key = record.key if record else normalize(face_name)
+        python_key = entry.get("pythonKey") or normalized_key
+        result = {
+            "requestId": request_id,
+            "fontName": entry.get("name") or (record.primary_name if record else face_name),
+            "faceName": face_name,
+            "resolvedName": actual_face or face_name,
+            "substituted": False,
+            "normalizedKey": normalized_key,
+            "pythonKey": python_key,
+        }
+        if variants is None:
+            result["image"] = image
+        else:
+            result["variants"] = variants
+        if width_range is not None and WIDTH_BUCKET > 0:
+            result["widthRange"] = list(width_range)
+        self.cache.put(cache_key, result)
+        self._remember_layout(cache_key, result)
+        return result
+
+    def prefetch_face(
+        self,
+        renderer,
+        meta: FontMeta,
+        weight: int,
+        italic: int,
+        text: str,
+        size: int,
+        width: int,
+    ) -> bool:
+        """Render one style of ``meta`` into the face cache ahead of a live request.
+
+        Runs on the prefetch thread with its own ``renderer``; False when it
+        was already cached or did not render cleanly.
+        """
+        face_name = meta.gdi_name or meta.primary_name
+        face_key = self._face_key(face_name, meta, weight, italic, text, size, width)
+        if self.faces.get(face_key) is not None:
+            return False
+        face_weight, face_italic = meta.pick_style(weight, italic)
+        image, substituted = renderer.render(
+            face_name,
+            text,
+            size,
+            weight=face_weight,
+            italic=int(bool(face_italic)),
+            target_width=width,
+            alias_names={face_name, meta.primary_name, *meta.aliases},
+        )
+        if substituted or not image:
+            return False
+        self.faces.put(face_key, {
+            "image": image,
+            "resolvedName": getattr(renderer, "last_actual_face", ""),
+            "normalizedKey": meta.key,
+            "widthRange": getattr(renderer, "last_width_range", None),
+            "prefetched": True,
+        })
+        return True
+
+    def _attempt_queue(self, entry: Dict[str, object]) -> List[Tuple[str, Set[str], Optional[FontMeta], str]]:
+        """Face names to try for ``entry``, in order, with the aliases that count as a match."""
+        base_alias_pool: Set[str] = set()
+
+        def add_alias_source(value: Optional[str]) -> None:
+            if not value and value != 0:
+                return
+            text_value = str(value).strip()
+            if text_value:
+                base_alias_pool.add(text_value)
+
+        add_alias_source(entry.get("name"))
+        raw_aliases = entry.get("aliases")
+        if isinstance(raw_aliases, list):
+            for alias in raw_aliases:
+                add_alias_source(alias)
+        add_alias_source(entry.get("postScriptName"))
+        add_alias_source(entry.get("family"))
+
+        candidate_strings: List[str] = []
+        seen_candidates: Set[str] = set()
+
+        def add_candidate(value: Optional[str]) -> None:
+            if not value and value != 0:
+                return
+            candidate = str(value).strip()
+            if not candidate:
+                return
+            key = normalize(candidate)
+            if key in seen_candidates:
+                return
+            seen_candidates.add(key)
+            candidate_strings.append(candidate)
+
+        add_candidate(entry.get("name"))
+        if isinstance(raw_aliases, list):
+            for alias in raw_aliases:
+                add_candidate(alias)
+        add_candidate(entry.get("postScriptName"))
+        add_candidate(entry.get("family"))
+
+        attempt_queue: List[Tuple[str, Set[str], Optional[FontMeta], str]] = []
+        attempted_faces: Set[str] = set()
+
+        def enqueue(face_name: str, record: Optional[FontMeta], source: str) -> None:
+            normalized = normalize(face_name)
+            if not normalized or normalized in attempted_faces:
+                return
+            attempted_faces.add(normalized)
+            alias_names = set(base_alias_pool)
+            alias_names.add(face_name)
+            if record:
+                alias_names.update(record.aliases)
+            attempt_queue.append((face_name, alias_names, record, source))
+
+        for candidate in candidate_strings:
+            record = self.registry.find(candidate)
+            enqueue(candidate, record, "request")
+            if record and record.gdi_name:
+                enqueue(record.gdi_name, record, "registry")
+
+        return attempt_queue
+
+    def requested_style(self, entry: Dict[str, object]) -> Tuple[int, int]:
+        """The (weight, italic) an entry asks for."""
+        # A PostScript/full-name hit on a scanned face gives the real weight and slope.
+        for name in (entry.get("postScriptName"), entry.get("name")):
+            face = self.registry.face_by_name(name)
+            if face:
+                return face.weight, int(face.italic)
+        return parse_style_flags(
+            font_name=str(entry.get("name") or ""),
+            style_hint=str(entry.get("style") or ""),
+            ps_name=str(entry.get("postScriptName") or ""),
+        )
+
+    def render_batch(
+        self,
+        fonts: Iterable[Dict[str, object]],
+        text: str,
+        size: int,
+        pyramid_size: int = 0,
+        upcoming: Optional[List[Dict[str, object]]] = None,
+    ) -> List[Dict[str, object]]:
+        """Render a batch; with ``pyramid_size`` > ``size``, misses may be approximate (see size_pyramid).
+
+        ``upcoming`` are the entries the panel lists next to the batch,
+        nearest first; they are prefetched in that order once the batch is
+        done (see prefetch.py).
+        """
+        fonts = list(fonts)
+        # Masters are only shared across sizes through their widthRange, i.e. with width buckets.
+        master = master_size(size, pyramid_size) if pyramid_size > 0 and WIDTH_BUCKET > 0 else size
+        with self._live():
+            if master > size:
+                results = self._render_batch_derived(fonts, text, size, master)
+            else:
+                results = self._render_batch(fonts, text, size)
+        # Intermediate slider sizes are not worth prefetching.
+        if self.prefetcher is not None and fonts and master <= size:
+            self.prefetcher.schedule(fonts, text, size, self._entry_width(fonts[0]), upcoming)
+        return results
+
+    def _live(self):
+        """Hold idle prefetching back (and cancel its plan) while live work renders."""
+        return self.prefetcher.live() if self.prefetcher is not None else contextlib.nullcontext()
+
+    def _render_batch(
+        self,
+        fonts: List[Dict[str, object]],
+        text: str,
+        size: int,
+    ) -> List[Dict[str, object]]:
+        if self.farm is not None and len(fonts) >= FARM_MIN_BATCH:
+            try:
+                return self._render_batch_on_farm(fonts, text, size)
+            except Exception as exc:
+                LOG.warning("Render workers failed (%s); rendering in-process", exc)
+                self.farm.restart()
+        results: List[Dict[str, object]] = []
+        for entry in fonts:
+            rendered = self.render_entry(entry, text, size)
+            if rendered:
+                results.append(rendered)
+        return results
+
+    def _render_batch_on_farm(
+        self,
+        fonts: List[Dict[str, object]],
+        text: str,
+        size: int,
+    ) -> List[Dict[str, object]]:
+        """Serve cache hits here and shard the misses across the worker processes."""
+        slots: List[Optional[Dict[str, object]]] = [None] * len(fonts)
+        misses: List[Tuple[int, Tuple]] = []
+        for index, entry in enumerate(fonts):
+            width = self._entry_width(entry)
+            cache_key = self._cache_key(entry, text, size, width)
+            cached = self._cached(cache_key, width)
+            if cached is not None:
+                slots[index] = self._for_request(entry, cached, width)
+            else:
+                misses.append((index, cache_key))
+        METRICS.increment("cache_hits", len(fonts) - len(misses))
+        METRICS.increment("cache_misses", len(misses))
+
+        if misses:
+            # Stage timings inside the workers stay in their processes.
+            with METRICS.stage("farm"):
+                rendered = self.farm.render([fonts[index] for index, _ in misses], text, size)
+            for (index, cache_key), result in zip(misses, rendered):
+                if result:
+                    self.cache.put(cache_key, result)
+                    self._remember_layout(cache_key, result)
+                    slots[index] = result
+        return [result for result in slots if result]
+
+    def _render_batch_derived(
+        self,
+        fonts: List[Dict[str, object]],
+        text: str,
+        size: int,
+        master: int,
+    ) -> List[Dict[str, object]]:
+        """Serve crisp or derived cache hits, render the misses at ``master`` and downsample them."""
+        slots: List[Optional[Dict[str, object]]] = [None] * len(fonts)
+        misses: Dict[str, Tuple[int, Tuple, Tuple]] = {}
+        master_entries: List[Dict[str, object]] = []
+        for index, entry in enumerate(fonts):
+            width = self._entry_width(entry)
+            cache_key = self._cache_key(entry, text, size, width)
+            cached = self._cached(cache_key, width) or self.derived.get(cache_key)
+            if cached is not None:
+                METRICS.increment("cache_hits")
+                slots[index] = self._for_request(entry, cached, width)
+            elif self._entry_variants(entry) is not None:
+                # Variants carry their own sizes; render them as asked.
+                slots[index] = self.render_entry(entry, text, size)
+            else:
+                request_id = f"pyramid:{index}"
+                master_entry = dict(entry, width=master_width(width, size, master), requestId=request_id)
+                master_key = self._cache_key(master_entry, text, master, self._entry_width(master_entry))
+                misses[request_id] = (index, cache_key, master_key)
+                master_entries.append(master_entry)
+
+        if master_entries:
+            masters = self._render_batch(master_entries, text, master)
+            with METRICS.stage("pyramid"):
+                for rendered in masters:
+                    index, cache_key, master_key = misses.pop(rendered["requestId"])
+                    entry = fonts[index]
+                    image = downsample(master_key, rendered["image"], size / master) if rendered.get("image") else None
+                    if image is None:
+                        slots[index] = self.render_entry(entry, text, size)
+                        continue
+                    result = {key: value for key, value in rendered.items() if key != "widthRange"}
+                    result.update(image=image, approximate=True)
+                    self.derived.put(cache_key, result)
+                    METRICS.increment("pyramid_derived")
+                    slots[index] = self._for_request(entry, result, self._entry_width(entry))
+        return [result for result in slots if result]
+
+    def render_single(self, name: str, text: str, size: int) -> Optional[Dict[str, object]]:
+        with self._live():
+            return self.render_entry({"name": name}, text, size)
+
+    def close(self) -> None:
+        if self.farm is not None:
+            self.farm.close()
+        self._gdi_log.close()
+
+    def _log_gdi_attempt(
+        self,
+        entry: Dict[str, object],
+        face_name: str,
+        actual_face: str,
+        status: str,
+        source: str,
+    ) -> None:
+        if not self._gdi_log.enabled:
+            return
+        self._gdi_log.submit({
+            "timestamp": datetime.now().isoformat(timespec='seconds'),
+            "requestName": entry.get("name"),
+            "faceTried": face_name,
+            "actualFace": actual_face,
+            "status": status,
+            "source": source,
+            "width": entry.get("width"),
+            "style": entry.get("style"),
+            "pythonKey": entry.get("pythonKey"),
+        })
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+On-demand sampling profiler for POST /debug/profile.
+
+start() launches a sampler thread that, every few milliseconds, snapshots
+the stacks of all other threads via ``sys._current_frames()`` for the
+requested number of seconds; the request returns immediately so the
+(single-threaded) server keeps serving the traffic being profiled, and
+GET /debug/profile reports the result. Nothing is hooked into the request
+path, so there is no cost while no profile is running -- which also means it
+works inside the --noconsole exe, where nothing can be attached.
+
+Results are written to font_debug/:
+  profile_<ts>.pstats         loadable with pstats / snakeviz (times are
+                              samples x interval; "calls" are samples)
+  profile_<ts>.collapsed.txt  "thread;frame;frame count" lines for
+                              flamegraph.pl / speedscope
+Samples whose innermost frame is an idle wait (select, queue/lock wait,
+socket reads between requests) are dropped.
+"""
+
+from __future__ import annotations
+
+import marshal
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_SECONDS = 10.0
+MAX_SECONDS = 120.0
+DEFAULT_INTERVAL = 0.005
+DEFAULT_TOP = 25
+
+# (file basename, function) of innermost frames that mean "waiting for work".
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("socket.py", "readinto"),
+    ("socketserver.py", "serve_forever"),
+    ("thread.py", "_worker"),
+    ("base_events.py", "_run_once"),
+    ("connection.py", "_recv_bytes"),
+    ("font_server.py", "watch"),  # time.sleep between refreshes
+    ("shared_server.py", "watch"),  # idle watchdog
+}
+
+# (filename, first line, function name): the key pstats uses.
+FuncKey = Tuple[str, int, str]
+
+_ACTIVE = threading.Lock()
+# Summary of the last finished profile (see start()).
+_LAST: Optional[Dict[str, object]] = None
+
+
+class ProfileBusy(RuntimeError):
+    """Another profile is already running."""
+
+
+class SampleProfile:
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.samples = 0
+        self.stacks: Counter = Counter()  # (thread name, (FuncKey, ... root -> leaf)) -> samples
+
+    def add(self, thread_name: str, stack: Tuple[FuncKey, ...]) -> None:
+        self.stacks[(thread_name, stack)] += 1
+        self.samples += 1
+
+    def function_stats(self) -> Dict[FuncKey, Tuple[int, int, float, float, Dict[FuncKey, Tuple[int, int, float, float]]]]:
+        """pstats-compatible {func: (cc, nc, tt, ct, callers)} with samples as calls."""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        edges: Dict[FuncKey, Counter] = {}
+        edge_own: Dict[FuncKey, Counter] = {}
+        for (_, stack), count in self.stacks.items():
+            own[stack[-1]] += count
+            seen = set()
+            for depth, func in enumerate(stack):
+                if func in seen:
+                    continue
+                seen.add(func)
+                total[func] += count
+                if depth:
+                    edges.setdefault(func, Counter())[stack[depth - 1]] += count
+            if len(stack) > 1:
+                edge_own.setdefault(stack[-1], Counter())[stack[-2]] += count
+
+        stats = {}
+        for func, inclusive in total.items():
+            callers = {
+                caller: (count, count, edge_own.get(func, {}).get(caller, 0) * self.interval, count * self.interval)
+                for caller, count in edges.get(func, {}).items()
+            }
+            stats[func] = (inclusive, inclusive, own[func] * self.interval, inclusive * self.interval, callers)
+        return stats
+
+    def collapsed(self) -> List[str]:
+        lines = []
+        for (thread_name, stack), count in self.stacks.most_common():
+            frames = [thread_name] + [f"{os.path.basename(filename)}:{name}" for filename, _, name in stack]
+            lines.append(f"{';'.join(frame.replace(';', ',') for frame in frames)} {count}")
+        return lines
+
+    def top(self, limit: int) -> List[Dict[str, object]]:
+        if not self.samples:
+            return []
+        stats = self.function_stats()
+        ranked = sorted(stats.items(), key=lambda item: (-item[1][2], -item[1][3]))[:limit]
+        return [
+            {
+                "function": f"{os.path.basename(filename)}:{line}({name})",
+                "selfMs": round(tt * 1000, 1),
+                "totalMs": round(ct * 1000, 1),
+                "selfPct": round(100.0 * tt / (self.samples * self.interval), 1),
+                "totalPct": round(100.0 * ct / (self.samples * self.interval), 1),
+            }
+            for (filename, line, name), (_, _, tt, ct, _) in ranked
+        ]
+
+
+def _stack(frame) -> Optional[Tuple[FuncKey, ...]]:
+    leaf = frame.f_code
+    if (os.path.basename(leaf.co_filename), leaf.co_name) in IDLE_LEAVES:
+        return None
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+def sample(seconds: float, interval: float = DEFAULT_INTERVAL) -> SampleProfile:
+    """Sample every other thread's stack for ``seconds`` in the calling thread."""
+    profile = SampleProfile(interval)
+    own_id = threading.get_ident()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = _stack(frame)
+            if stack:
+                profile.add(names.get(thread_id, str(thread_id)), stack)
+        time.sleep(interval)
+    return profile
+
+
+def start(seconds: float, debug_dir: Path, keep: int = 0, interval: float = DEFAULT_INTERVAL) -> None:
+    """Profile for ``seconds`` on a background thread; raises ProfileBusy if one is running.
+
+    The files go to ``debug_dir`` (all but the newest ``keep`` older profiles
+    are pruned when ``keep`` > 0); status() returns the summary afterwards.
+    """
+    if not _ACTIVE.acquire(blocking=False):
+        raise ProfileBusy("a profile is already running")
+
+    def run() -> None:
+        global _LAST
+        try:
+            profile = sample(seconds, interval)
+            summary: Dict[str, object] = {"seconds": seconds, "samples": profile.samples, "intervalMs": interval * 1000}
+            try:
+                pstats_path, collapsed_path = write_profile(profile, debug_dir)
+                summary.update(pstats=str(pstats_path), collapsed=str(collapsed_path))
+                if keep > 0:
+                    from font_registry import prune_debug_files
+
+                    prune_debug_files(debug_dir, "profile_*.pstats", keep)
+                    prune_debug_files(debug_dir, "profile_*.collapsed.txt", keep)
+            except OSError as exc:
+                summary["error"] = f"write-failed: {exc}"
+            summary["profile"] = profile
+            _LAST = summary
+        finally:
+            _ACTIVE.release()
+
+    threading.Thread(target=run, name="profiler", daemon=True).start()
+
+
+def status(top: int = DEFAULT_TOP) -> Dict[str, object]:
+    """Whether a profile is running, plus the last finished one with its top ``top`` functions."""
+    last = _LAST
+    result: Dict[str, object] = {"running": _ACTIVE.locked(), "last": None}
+    if last is not None:
+        summary = {key: value for key, value in last.items() if key != "profile"}
+        summary["top"] = last["profile"].top(top)
+        result["last"] = summary
+    return result
+
+
+def write_profile(profile: SampleProfile, debug_dir: Path) -> Tuple[Path, Path]:
+    """Write the .pstats and collapsed-stack files; returns their paths."""
+    debug_dir.mkdir(exist_ok=True)
+    stem = f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    pstats_path = debug_dir / f"{stem}.pstats"
+    collapsed_path = debug_dir / f"{stem}.collapsed.txt"
+    with pstats_path.open("wb") as handle:
+        marshal.dump(profile.function_stats(), handle)
+    collapsed_path.write_text("\n".join(profile.collapsed()) + "\n", encoding="utf-8")
+    return pstats_path, collapsed_path
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Process pool for rendering very large preview batches.
+
+Each worker is spawned once and warm-started with its own FontRegistry and
+PreviewService (no preview cache, no attempt log), so the GIL-bound parts of
+a render -- alpha conversion, PNG encoding, base64 -- run truly in
+parallel. A batch is cut into contiguous shards; results come back as
+pickled dicts and are reassembled in request order.
+
+The server process keeps the preview cache and attempt log; cache hits never
+reach the workers.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+LOG = logging.getLogger("font_server")
+
+# Shards per worker: enough to even out slow fonts, few enough to keep pickling cheap.
+SHARDS_PER_WORKER = 4
+
+_SERVICE = None
+
+
+def _warm_start() -> None:
+    """Worker initializer: build this process's registry and renderer once."""
+    global _SERVICE
+    from attempt_log import LEVEL_OFF, AttemptLogWriter
+    from font_registry import FontRegistry
+    from preview_service import PreviewService
+
+    # The server already logged the enumeration; keep workers to warnings.
+    LOG.setLevel(logging.WARNING)
+    _SERVICE = PreviewService(
+        FontRegistry(),
+        cache_size=0,
+        attempt_log=AttemptLogWriter(Path('font_debug') / 'gdi_attempts.log', level=LEVEL_OFF),
+        workers=0,
+    )
+
+
+def _ready(_: int) -> int:
+    return os.getpid()
+
+
+def _render_shard(entries: List[Dict[str, object]], text: str, size: int) -> List[Optional[Dict[str, object]]]:
+    return [_SERVICE.render_entry(entry, text, size) for entry in entries]
+
+
+class RenderFarm:
+    """A lazily started, restartable pool of warm render workers."""
+
+    def __init__(self, workers: int, debug_callback=None) -> None:
+        self.workers = max(1, workers)
+        self.debug = debug_callback or (lambda msg: None)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn everywhere: fork would copy the server's sockets and threads.
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_start,
+                )
+            return self._pool
+
+    def start(self) -> None:
+        """Spawn and warm every worker now instead of on the first large batch."""
+        pool = self._ensure_pool()
+        # Submitting one task per worker at once makes the executor spawn all of them.
+        pids = set(pool.map(_ready, range(self.workers)))
+        self.debug(f"Render farm ready: {len(pids)} worker(s)")
+
+    def render(
+        self,
+        entries: List[Dict[str, object]],
+        text: str,
+        size: int,
+    ) -> List[Optional[Dict[str, object]]]:
+        """Render ``entries`` across the workers; one result (or None) per entry, in order."""
+        if not entries:
+            return []
+        pool = self._ensure_pool()
+        shards = min(len(entries), self.workers * SHARDS_PER_WORKER)
+        step = -(-len(entries) // shards)
+        futures = [
+            pool.submit(_render_shard, entries[start:start + step], text, size)
+            for start in range(0, len(entries), step)
+        ]
+        results: List[Optional[Dict[str, object]]] = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def restart(self) -> None:
+        """Drop the current workers; replacements are spawned and warmed in the background."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        pool.shutdown(wait=False, cancel_futures=True)
+        threading.Thread(target=self.start, name="render-farm-start", daemon=True).start()
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
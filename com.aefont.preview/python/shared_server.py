@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+One warm font_server per login session, shared by every panel.
+
+With AE_FONT_SHARED=1 (pythonProcessManager.js sets it) the server records
+itself in a per-user lockfile, ``<lock dir>/font_server.json``:
+
+    {"pid": 1234, "port": 8765, "protocol": 1, "started": "2026-..."}
+
+A panel (or a second server launch) reads it and reuses the server when
+GET /ping on that port answers with the same pid and protocol; otherwise
+the file is stale and a new server replaces it. The catalog, the preview
+caches and the render workers are then built once per session instead of
+once per panel load or per After Effects instance.
+
+Panels hold leases: POST /clients/attach?client=<id> on connect and every
+minute as a heartbeat, POST /clients/detach on unload. A lease not renewed
+within AE_FONT_LEASE_TTL seconds is dropped (crashed panels), and a shared
+server with no leases for AE_FONT_IDLE_EXIT seconds shuts itself down, so a
+panel reload inside that window finds it still warm.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+LOG = logging.getLogger("font_server")
+
+# Bump when the HTTP API changes incompatibly; panels and servers only pair on a match.
+PROTOCOL_VERSION = 1
+LOCK_NAME = "font_server.json"
+# Seconds a lease survives without a heartbeat.
+LEASE_TTL = float(os.environ.get("AE_FONT_LEASE_TTL", "180"))
+# Seconds a shared server lingers without leases before exiting; 0 keeps it running.
+IDLE_EXIT = float(os.environ.get("AE_FONT_IDLE_EXIT", "120"))
+PROBE_TIMEOUT = 2.0
+WATCHDOG_INTERVAL = 5.0
+
+
+def default_lock_dir() -> Path:
+    """Per-user directory for the lockfile (AE_FONT_LOCK_DIR overrides it)."""
+    override = os.environ.get("AE_FONT_LOCK_DIR")
+    if override:
+        return Path(override)
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or str(Path.home() / "AppData" / "Local")
+        return Path(base) / "AEFontPreview"
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    return Path(runtime) / "aefont-preview" if runtime else Path.home() / ".cache" / "aefont-preview"
+
+
+def lock_path() -> Path:
+    return default_lock_dir() / LOCK_NAME
+
+
+def read_lock(path: Path) -> Optional[Dict[str, object]]:
+    try:
+        info = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return info if isinstance(info, dict) else None
+
+
+def probe(info: Dict[str, object], timeout: float = PROBE_TIMEOUT) -> bool:
+    """True when the server described by ``info`` answers /ping as that same process."""
+    import http.client  # only launches that find a lockfile need it
+
+    try:
+        port = int(info["port"])
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+        try:
+            connection.request("GET", "/ping")
+            response = connection.getresponse()
+            payload = json.loads(response.read() or b"{}")
+        finally:
+            connection.close()
+    except (KeyError, TypeError, ValueError, OSError, http.client.HTTPException):
+        return False
+    return (
+        response.status == 200
+        and payload.get("protocol") == PROTOCOL_VERSION
+        and payload.get("pid") == info.get("pid")
+    )
+
+
+def find_running(path: Path) -> Optional[Dict[str, object]]:
+    """The lockfile's server if it is alive and speaks our protocol."""
+    info = read_lock(path)
+    if info is None or info.get("protocol") != PROTOCOL_VERSION or info.get("pid") == os.getpid():
+        return None
+    return info if probe(info) else None
+
+
+def claim(path: Path, port: int) -> Optional[Dict[str, object]]:
+    """Record this process as the shared server on ``port``.
+
+    Returns None when the lock is ours, or the healthy server that already
+    holds it (the caller should then step aside). Two launches racing for a
+    stale lock can both "win"; the loser never gets a client and idles out.
+    """
+    holder = find_running(path)
+    if holder is not None:
+        return holder
+    info = {"pid": os.getpid(), "port": port, "protocol": PROTOCOL_VERSION, "started": datetime.now().isoformat()}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    temp.write_text(json.dumps(info), encoding="utf-8")
+    os.replace(temp, path)
+    return None
+
+
+def release(path: Path) -> None:
+    """Remove the lockfile if it still names this process."""
+    info = read_lock(path)
+    if info is not None and info.get("pid") == os.getpid():
+        try:
+            path.unlink()
+        except OSError as exc:
+            LOG.debug("Could not remove %s: %s", path, exc)
+
+
+class Leases:
+    """Panels currently using this server, by client id, with their last heartbeat."""
+
+    def __init__(self, ttl: float = LEASE_TTL) -> None:
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._seen: Dict[str, float] = {}
+        # When the last lease went away (or the server started).
+        self._empty_since = time.monotonic()
+
+    def attach(self, client: str) -> int:
+        """Add or renew a lease; returns the number of live leases."""
+        with self._lock:
+            self._seen[client] = time.monotonic()
+            return len(self._seen)
+
+    def detach(self, client: str) -> int:
+        with self._lock:
+            if self._seen.pop(client, None) is not None and not self._seen:
+                self._empty_since = time.monotonic()
+            return len(self._seen)
+
+    def restart_idle_clock(self) -> None:
+        with self._lock:
+            self._empty_since = time.monotonic()
+
+    def idle_seconds(self) -> float:
+        """Drop expired leases; seconds without any lease (0 while one is live)."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [client for client, seen in self._seen.items() if now - seen > self.ttl]
+            for client in expired:
+                del self._seen[client]
+            if expired:
+                LOG.info("Dropped %d expired client lease(s)", len(expired))
+                if not self._seen:
+                    self._empty_since = now
+            return 0.0 if self._seen else now - self._empty_since
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._seen)
+
+
+def start_idle_watchdog(
+    leases: Leases,
+    shutdown: Callable[[], None],
+    idle_exit: float = IDLE_EXIT,
+) -> Optional[threading.Thread]:
+    """Call ``shutdown`` once no client has held a lease for ``idle_exit`` seconds."""
+    if idle_exit <= 0:
+        return None
+    # Count from now, not from process start: building the catalog can take a while.
+    leases.restart_idle_clock()
+
+    def watch() -> None:
+        while True:
+            time.sleep(min(WATCHDOG_INTERVAL, idle_exit))
+            if leases.idle_seconds() >= idle_exit:
+                LOG.info("No clients for %.0f s, shutting down the shared server", idle_exit)
+                shutdown()
+                return
+
+    thread = threading.Thread(target=watch, name="idle-watchdog", daemon=True)
+    thread.start()
+    return thread
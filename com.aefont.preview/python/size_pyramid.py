@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Size pyramid for size-slider scrubbing (/batch-preview "interactive": true).
+
+While the panel's size slider moves, every intermediate size used to go
+through the full render pipeline for every visible row. In an interactive
+batch the service instead renders each row once at a master size (the
+batch's "pyramidSize", normally the slider maximum, capped at
+AE_FONT_PYRAMID_MAX_SIZE) with the wrap width scaled by the same factor,
+and serves the requested size by Lanczos-downsampling the master's alpha
+mask. Such previews carry "approximate": true and are never stored as the
+crisp result; the panel asks again without "interactive" once the slider
+settles.
+
+Masters are ordinary cached previews, so scrubbing back and forth renders
+nothing new, and a master is shared by every size whose scaled width wraps
+identically (its "widthRange"). That needs width buckets; with
+AE_FONT_WIDTH_BUCKET=0 (the default) interactive batches are rendered
+normally.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from png_data import decode_data_url, encode_data_url, load_pil
+
+# Largest master size; bigger pyramidSize values are clamped to it.
+PYRAMID_MAX_SIZE = int(os.environ.get("AE_FONT_PYRAMID_MAX_SIZE", "96"))
+# Decoded masters (with their halved levels and derived PNGs) kept for further scrubbing.
+MASK_CACHE_SIZE = int(os.environ.get("AE_FONT_PYRAMID_MASKS", "256"))
+# Derived sizes remembered per master (a slider drag visits each size once or twice).
+DERIVED_PER_MASTER = 8
+# Approximate previews are short-lived: favour encode speed over size.
+APPROXIMATE_PNG_LEVEL = 1
+
+# master's preview cache key -> (its data URL, alpha levels, {target size: derived data URL})
+_masks: "OrderedDict[Hashable, Tuple[str, List[object], Dict[Tuple[int, int], str]]]" = OrderedDict()
+_masks_lock = threading.Lock()
+
+
+def master_size(size: int, pyramid_size: int, limit: int = PYRAMID_MAX_SIZE) -> int:
+    """Size to render the master at; ``size`` itself when there is nothing to gain."""
+    return max(size, min(pyramid_size, limit))
+
+
+def master_width(width: int, size: int, master: int) -> int:
+    """Wrap width at the master size that gives the same layout once scaled back to ``size``."""
+    return round(width * master / size) if width > 0 else 0
+
+
+def _master(key: Hashable, data_url: str) -> Tuple[List[object], Dict[Tuple[int, int], str]]:
+    """The master's alpha mask, the halved levels built so far and its derived PNGs (shared).
+
+    A key whose preview was rendered again (a new data URL) starts over.
+    """
+    with _masks_lock:
+        master = _masks.get(key)
+        if master is not None and master[0] is data_url:
+            _masks.move_to_end(key)
+            return master[1], master[2]
+    source = decode_data_url(data_url)
+    levels: List[object] = [source.getchannel("A") if "A" in source.getbands() else source.convert("L")]
+    derived: Dict[Tuple[int, int], str] = {}
+    with _masks_lock:
+        _masks[key] = (data_url, levels, derived)
+        _masks.move_to_end(key)
+        while len(_masks) > MASK_CACHE_SIZE:
+            _masks.popitem(last=False)
+    return levels, derived
+
+
+def downsample(key: Hashable, data_url: str, scale: float) -> Optional[str]:
+    """A preview PNG shrunk by ``scale`` (alpha resampled, white text as in the renderers); None without Pillow.
+
+    ``key`` identifies the master (its preview cache key), so decoded masks
+    are found without hashing the data URL. Resamples from the smallest pyramid level still at least twice the
+    target, so deep reductions do not filter the full master every time.
+    """
+    Image = load_pil()
+    if Image is None:
+        return None
+    lanczos = getattr(Image, "Resampling", Image).LANCZOS
+    levels, derived = _master(key, data_url)
+    width, height = levels[0].size
+    target = (max(1, round(width * scale)), max(1, round(height * scale)))
+    cached = derived.get(target)
+    if cached is not None:
+        # Rows showing the same font and layout share one master.
+        return cached
+    level, level_scale = 0, 1.0
+    while level_scale / 2 >= scale * 2:
+        level += 1
+        level_scale /= 2
+        if level == len(levels):
+            previous = levels[-1]
+            levels.append(previous.resize(
+                (max(1, previous.width // 2), max(1, previous.height // 2)), lanczos
+            ))
+    alpha = levels[level].resize(target, lanczos)
+    # White + coverage like the renderers' RGBA, at half the bytes to encode.
+    color = alpha.point(lambda value: 255 if value else 0)
+    encoded = encode_data_url(Image.merge("LA", (color, alpha)), compress_level=APPROXIMATE_PNG_LEVEL)
+    with _masks_lock:
+        derived[target] = encoded
+        if len(derived) > DERIVED_PER_MASTER:
+            derived.pop(next(iter(derived)))
+    return encoded
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Sprite sheet packing for /batch-preview ("atlas": true).
+
+All image previews of one batch are pasted into a single PNG so the panel
+decodes one image per page instead of one per row. Sprites are placed with
+shelf packing: tallest first, left to right, a new shelf when the row is
+full, on a sheet about as wide as it is tall (capped at
+AE_FONT_ATLAS_MAX_WIDTH). Entries rendered with "variants" keep their
+individual images, and so do previews whose requestId is missing or not
+unique in the batch: rects are looked up by requestId.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from png_data import decode_data_url, encode_data_url, load_pil
+
+ATLAS_MAX_WIDTH = int(os.environ.get("AE_FONT_ATLAS_MAX_WIDTH", "4096"))
+# Transparent gap between sprites so scaled drawing never samples a neighbour.
+ATLAS_PADDING = 1
+
+Rect = Tuple[int, int, int, int]
+
+
+def pack_shelves(
+    sizes: Sequence[Tuple[int, int]],
+    max_width: int = ATLAS_MAX_WIDTH,
+    padding: int = ATLAS_PADDING,
+) -> Tuple[List[Rect], int, int]:
+    """Place ``(w, h)`` sizes on shelves; returns (x, y, w, h) per size in input order and the sheet size."""
+    if not sizes:
+        return [], 0, 0
+    widest = max(width for width, _ in sizes)
+    area = sum((width + padding) * (height + padding) for width, height in sizes)
+    sheet_width = max(widest, min(max_width, math.ceil(math.sqrt(area))))
+
+    rects: List[Rect] = [(0, 0, 0, 0)] * len(sizes)
+    x = y = shelf_height = used_width = 0
+    for index in sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0])):
+        width, height = sizes[index]
+        if x and x + width > sheet_width:
+            y += shelf_height + padding
+            x = shelf_height = 0
+        rects[index] = (x, y, width, height)
+        used_width = max(used_width, x + width)
+        shelf_height = max(shelf_height, height)
+        x += width + padding
+    return rects, used_width, y + shelf_height
+
+
+def build_atlas(previews: Sequence[Dict[str, object]]) -> Optional[Dict[str, object]]:
+    """Pack the previews' images into one PNG.
+
+    Returns {"image", "width", "height", "rects": {requestId: [x, y, w, h]}} or
+    None when there is nothing to pack or Pillow is unavailable; the previews
+    themselves are not modified. A requestId shared by several previews would
+    map them all to one rect, so those previews are left out of the sheet.
+    """
+    Image = load_pil()
+    if Image is None:
+        return None
+    id_counts = Counter(str(preview["requestId"]) for preview in previews if preview.get("requestId") is not None)
+    sprites = []
+    for preview in previews:
+        image = preview.get("image")
+        request_id = preview.get("requestId")
+        if isinstance(image, str) and request_id is not None and id_counts[str(request_id)] == 1:
+            sprites.append((str(request_id), decode_data_url(image)))
+    if not sprites:
+        return None
+
+    rects, width, height = pack_shelves([sprite.size for _, sprite in sprites])
+    sheet = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    for (_, sprite), (x, y, _, _) in zip(sprites, rects):
+        sheet.paste(sprite.convert("RGBA"), (x, y))
+
+    return {
+        "image": encode_data_url(sheet),
+        "width": width,
+        "height": height,
+        "rects": {request_id: list(rect) for (request_id, _), rect in zip(sprites, rects)},
+    }
@@ -0,0 +1,6 @@
+"""Make the helper's top-level modules importable (the server runs from python/)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
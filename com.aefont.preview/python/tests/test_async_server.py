@@ -0,0 +1,36 @@
+"""AsyncFontServer HTTP plumbing over a real socket."""
+
+import http.client
+import json
+import threading
+from http import HTTPStatus
+
+import pytest
+
+from async_server import AsyncFontServer
+
+
+@pytest.fixture
+def server():
+    server = AsyncFontServer(
+        ("127.0.0.1", 0),
+        lambda method, target, body: (HTTPStatus.OK, b"{}", {"Content-Type": "application/json"}),
+        lambda method, target: False,
+        max_body=1024 * 1024,
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join(5)
+    server.server_close()
+
+
+def test_oversized_body_gets_413_not_a_reset(server):
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=10)
+    connection.request("POST", "/batch-preview", body=b"x" * (5 * 1024 * 1024))
+    response = connection.getresponse()
+
+    assert response.status == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    assert json.loads(response.read()) == {"error": "body exceeds 1048576 bytes"}
+    connection.close()
@@ -0,0 +1,84 @@
+"""parse_style_flags / strip_style_suffix pinned on names captured from real catalogs."""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from font_name_resolver import parse_style_flags, strip_style_suffix
+
+ROOT = Path(__file__).resolve().parent.parent
+# The captures benchmarks/bench_style_parser.py checks by default (4418 triples).
+CAPTURES = [
+    ROOT / "font_debug" / "font_catalog_20251108_195809.json",
+    ROOT / "font_debug" / "cep_fonts_20251108_195816.json",
+]
+
+# (name, style, PostScript name) -> (weight, italic), strip(name), strip(PostScript name)
+PINNED = [
+    (("109Box_tape Medium", "Medium", "109Box_tape-Medium"), (500, 0), "109Box_tape", "109Box_tape"),
+    (("210 Santorini Light italic", "Light italic", "TTSantoriniLi"), (300, 1), "210 Santorini", "TTSantoriniLi"),
+    (("210 산토리니 Regular italic", "Regular italic", ""), (400, 1), "210 산토리니", ""),
+    (("Amari_Font_58-100 Regular", "Regular", ""), (400, 0), "Amari_Font_58-100", ""),
+    (("Antro Vectra Bolder", "Bolder", "AntroVectra-Bolder"), (700, 0), "Antro Vectra Bolder", "AntroVectra-Bolder"),
+    (("Arial Black", "Black", "Arial-Black"), (900, 0), "Arial", "Arial"),
+    (("Arial Bold Italic", "Bold Italic", "Arial-BoldItalicMT"), (700, 1), "Arial", "Arial-BoldItalicMT"),
+    (("Arial Italic", "Italic", ""), (400, 1), "Arial", ""),
+    (("Bahnschrift", "Light", "Bahnschrift-Light"), (300, 0), "Bahnschrift", "Bahnschrift"),
+    (("BatangChe", "Medium", "BatangChe"), (500, 0), "BatangChe", "BatangChe"),
+    (("Bebas Neue Pro Expanded ExtraBold Italic", "Expanded ExtraBold Italic", "BebasNeuePro-ExpEbIt"),
+     (800, 1), "Bebas Neue Pro", "BebasNeuePro-ExpEbIt"),
+    (("Bebas Neue Pro Expanded Thin", "Expanded Thin", "BebasNeuePro-ExpTh"), (200, 0), "Bebas Neue Pro",
+     "BebasNeuePro-ExpTh"),
+    (("Calibri Light", "", ""), (300, 0), "Calibri", ""),
+    (("Cormorant Garamond Medium Italic", "Medium Italic", "CormorantGaramond-MediumItalic"),
+     (500, 1), "Cormorant Garamond", "CormorantGaramond-MediumItalic"),
+    (("FOT-筑紫アンティークLゴ Std B", "", ""), (400, 0), "FOT-筑紫アンティークLゴ Std B", ""),
+    (("GangwonEduPower", "ExtraBold", "GangwonEduPowerExtraBold"), (800, 0), "GangwonEduPower",
+     "GangwonEduPowerExtraBold"),
+    (("G마켓 산스 TTF Bold", "Bold", ""), (700, 0), "G마켓 산스 TTF", ""),
+    (("M+A1 black 10/1.2", "Regular", "M+A1 black 10/1.2"), (900, 0), "M+A1 black 10/1.2", "M+A1 black 10/1.2"),
+    (("MBC 1961굴림 Medium", "", ""), (500, 0), "MBC 1961굴림", ""),
+    (("Noto Sans KR", "Thin", "NotoSansKR-Thin"), (200, 0), "Noto Sans KR", "NotoSansKR"),
+    (("Playfair Display Black Italic", "Black Italic", "PlayfairDisplay-BlackItalic"),
+     (900, 1), "Playfair Display", "PlayfairDisplay-BlackItalic"),
+    (("Sandoll 고딕Neo1 08 ExtraBold", "08 Eb", ""), (800, 0), "Sandoll 고딕Neo1 08", ""),
+    (("Sandoll 고딕Neo1 09 Heavy", "09 Hv", ""), (900, 0), "Sandoll 고딕Neo1 09", ""),
+    (("Sandoll 호요요2", "01 Thin", ""), (200, 0), "Sandoll 호요요2", ""),
+    (("モッチーポップ One OTF ExtraBold", "", ""), (800, 0), "モッチーポップ One OTF", ""),
+    (("페이퍼로지 9 Black", "", ""), (900, 0), "페이퍼로지 9", ""),
+]
+
+
+@pytest.mark.parametrize("triple, flags, family, ps_family", PINNED)
+def test_pinned_names(triple, flags, family, ps_family):
+    name, style, ps_name = triple
+    assert parse_style_flags(name, style, ps_name) == flags
+    assert strip_style_suffix(name) == family
+    assert strip_style_suffix(ps_name) == ps_family
+
+
+def _bench_style_parser():
+    path = ROOT / "benchmarks" / "bench_style_parser.py"
+    spec = importlib.util.spec_from_file_location("bench_style_parser", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_captured_catalogs_match_the_reference_parser():
+    """Every captured triple parses as the pre-regex implementation did (the benchmark's golden check)."""
+    if not all(path.exists() for path in CAPTURES):
+        pytest.skip("captured catalogs not present")
+    bench = _bench_style_parser()
+    triples = bench.load_triples(CAPTURES)
+    assert len(triples) == 4418
+
+    mismatches = []
+    for name, style, ps_name in set(triples):
+        if parse_style_flags(name, style, ps_name) != bench.legacy_parse_style_flags(name, style, ps_name):
+            mismatches.append(("parse_style_flags", name, style, ps_name))
+        for value in (name, ps_name):
+            if strip_style_suffix(value) != bench.legacy_strip_style_suffix(value):
+                mismatches.append(("strip_style_suffix", value))
+    assert mismatches == []
@@ -0,0 +1,210 @@
+"""FontRegistry.refresh() / changes_since() against a fake enumerator."""
+
+from typing import Dict, List
+
+import pytest
+
+import font_registry
+from attempt_log import LEVEL_OFF, AttemptLogWriter
+from font_name_resolver import StyleVariants
+from font_registry import FontRegistry
+from font_scanner import FontFace
+from preview_service import PreviewService
+
+
+class FakeEnumerator:
+    """Enumerator whose installed families are a plain, mutable list."""
+
+    def __init__(self, families: List[str], localized: Dict[str, Dict[str, str]] = None) -> None:
+        self.families = list(families)
+        self.localized = localized or {}
+        # Scanned font files (read by the registry when SCAN_FONT_FILES is on).
+        self.faces: List[FontFace] = []
+        self.styles: Dict[str, StyleVariants] = {}
+
+    def enumerate_all_fonts(self) -> List[str]:
+        return list(self.families)
+
+    def get_localized_family_names(self, face_name: str) -> Dict[str, str]:
+        return dict(self.localized.get(face_name, {"en": face_name}))
+
+    def get_style_variants(self, face_name: str) -> StyleVariants:
+        return self.styles.setdefault(face_name, StyleVariants())
+
+
+def make_face(family: str, weight: int = 400, italic: bool = False, **names) -> FontFace:
+    style = f"W{weight}{' Italic' if italic else ''}"
+    return FontFace(
+        path=f"/fonts/{family}-{style}.ttf",
+        index=0,
+        family=family,
+        style=style,
+        full_name=f"{family} {style}",
+        ps_name=f"{family}-{style}".replace(" ", ""),
+        weight=weight,
+        italic=italic,
+        family_names=names.get("family_names", {"en": family}),
+        legacy_family_names=names.get("legacy_family_names"),
+    )
+
+
+@pytest.fixture(autouse=True)
+def no_file_scan(monkeypatch):
+    monkeypatch.setattr(font_registry, "SCAN_FONT_FILES", False)
+
+
+@pytest.fixture
+def enumerator():
+    return FakeEnumerator(
+        ["Arial", "Batang", "Malgun Gothic"],
+        {"Malgun Gothic": {"en": "Malgun Gothic", "ko": "맑은 고딕"}},
+    )
+
+
+def test_refresh_applies_only_the_difference(enumerator):
+    registry = FontRegistry(enumerator)
+    kept = registry.find("Arial")
+    version = registry.version
+
+    enumerator.families.remove("Batang")
+    enumerator.families.append("Dotum")
+    delta = registry.refresh()
+
+    assert delta == {"version": version + 1, "added": ["dotum"], "removed": ["batang"], "changed": []}
+    assert registry.version == version + 1
+    assert registry.find("Batang") is None
+    assert registry.find("Dotum").primary_name == "Dotum"
+    assert registry.find("Arial") is kept
+    assert [meta.primary_name for meta in registry.fonts] == ["Arial", "Dotum", "Malgun Gothic"]
+    assert len(registry) == 3
+
+
+def test_attaching_files_leaves_published_records_alone(monkeypatch, enumerator):
+    monkeypatch.setattr(font_registry, "SCAN_FONT_FILES", True)
+    enumerator.faces = [make_face("Arial"), make_face("Arial", 700)]
+    registry = FontRegistry(enumerator)
+    before = registry.fonts
+    published = [(meta, meta.faces, list(meta.styles)) for meta in before]
+    arial = registry.find("Arial")
+    assert [face.weight for face in arial.faces] == [400, 700]
+    assert arial.pick_style(700, 0) == (700, 0)
+
+    enumerator.families.append("Dotum")
+    enumerator.faces.append(make_face("Dotum", 300))
+    registry.refresh()
+
+    assert [(meta, meta.faces, list(meta.styles)) for meta in before] == published
+    # The enumerator's own style tables are not written to either.
+    assert list(enumerator.styles["Dotum"]) == []
+    dotum = registry.find("Dotum")
+    assert dotum in registry.fonts and dotum not in before
+    assert [face.weight for face in dotum.faces] == [300]
+    assert dotum.pick_style(400, 0) == (300, 0)
+    assert registry.find("Arial") is arial
+
+
+def test_refresh_without_changes_keeps_the_version(enumerator):
+    registry = FontRegistry(enumerator)
+    version = registry.version
+
+    assert registry.refresh() == {"version": version, "added": [], "removed": [], "changed": []}
+    assert registry.changes_since(version) == {
+        "version": version, "since": version, "added": [], "removed": [], "changed": [],
+    }
+
+
+def test_changes_since_collapses_the_journal(enumerator):
+    registry = FontRegistry(enumerator)
+    start = registry.version
+
+    enumerator.families.remove("Malgun Gothic")
+    enumerator.families.append("Gulim")
+    registry.refresh()
+    middle = registry.version
+    enumerator.families.remove("Gulim")
+    enumerator.families.append("Dotum")
+    registry.refresh()
+
+    delta = registry.changes_since(start, ["name"])
+    assert delta["version"] == start + 2
+    assert delta["added"] == [{"name": "Dotum", "key": "dotum"}]
+    # Gulim came and went after ``start``: not reported at all.
+    assert delta["removed"] == ["malgungothic"]
+    assert delta["changed"] == []
+
+    delta = registry.changes_since(middle, ["name"])
+    assert delta["added"] == [{"name": "Dotum", "key": "dotum"}]
+    assert delta["removed"] == ["gulim"]
+
+    # Unknown versions ask the client for a full refetch.
+    assert registry.changes_since(registry.version + 1) is None
+    assert registry.changes_since(start - 1) is None
+
+
+def test_refresh_journals_families_whose_fields_changed(enumerator):
+    enumerator.styles["Malgun Gothic"] = StyleVariants([(400, False, 129)])
+    registry = FontRegistry(enumerator)
+    start = registry.version
+    before = registry.find("Malgun Gothic")
+
+    # A bold weight was installed, and its file brings another localized name.
+    enumerator.styles["Malgun Gothic"] = StyleVariants([(400, False, 129), (700, False, 129)])
+    enumerator.localized["Malgun Gothic"] = {"en": "Malgun Gothic", "ko": "맑은 고딕", "ja": "マルグン"}
+    delta = registry.refresh()
+
+    assert delta == {"version": start + 1, "added": [], "removed": [], "changed": ["malgungothic"]}
+    after = registry.find("Malgun Gothic")
+    assert after is not before and registry.find("マルグン") is after
+    assert after.pick_style(700, 0) == (700, 0)
+    assert before.language_names == {"en": "Malgun Gothic", "ko": "맑은 고딕"}
+
+    delta = registry.changes_since(start, ["name", "aliases"])
+    assert delta["added"] == [] and delta["removed"] == []
+    assert delta["changed"] == [
+        {"name": "Malgun Gothic", "aliases": ["Malgun Gothic", "マルグン", "맑은 고딕"], "key": "malgungothic"},
+    ]
+    # Nothing moved since: no new version.
+    assert registry.refresh()["version"] == start + 1
+
+
+def test_refresh_invalidates_previews_of_changed_fonts(enumerator, tmp_path):
+    registry = FontRegistry(enumerator)
+    service = PreviewService(
+        registry,
+        attempt_log=AttemptLogWriter(tmp_path / "gdi_attempts.log", level=LEVEL_OFF),
+        workers=0,
+        prefetch_radius=0,
+    )
+    try:
+        for key in ("arial", "batang"):
+            result = {"normalizedKey": key, "image": "data:image/png;base64,"}
+            service.cache.put((key, "text"), result)
+            service.faces.put((key, "face"), result)
+            service.derived.put((key, "derived"), result)
+
+        enumerator.families.remove("Batang")
+        registry.refresh()
+
+        for cache, suffix in ((service.cache, "text"), (service.faces, "face"), (service.derived, "derived")):
+            assert cache.get(("batang", suffix)) is None
+            assert cache.get(("arial", suffix)) is not None
+    finally:
+        service.close()
+
+
+@pytest.mark.parametrize("families, expected", [
+    # GDI lists each legacy (ID 1) family: files stay with their own record.
+    (["Foo", "Foo Light"], {"Foo": [400], "Foo Light": [300]}),
+    # Only the typographic family (ID 16) is listed: it collects every weight.
+    (["Foo"], {"Foo": [300, 400]}),
+])
+def test_files_attach_to_their_legacy_family_first(monkeypatch, families, expected):
+    monkeypatch.setattr(font_registry, "SCAN_FONT_FILES", True)
+    enumerator = FakeEnumerator(families)
+    enumerator.faces = [
+        make_face("Foo", 300, legacy_family_names={"en": "Foo Light"}),
+        make_face("Foo", 400, legacy_family_names={"en": "Foo"}),
+    ]
+    registry = FontRegistry(enumerator)
+
+    assert {meta.primary_name: [face.weight for face in meta.faces] for meta in registry.fonts} == expected
@@ -0,0 +1,57 @@
+"""Interactive (size-slider) batches with and without width buckets."""
+
+from http import HTTPStatus
+
+import pytest
+
+import font_server
+import preview_service
+from attempt_log import LEVEL_OFF, AttemptLogWriter
+from font_registry import FontRegistry
+from size_pyramid import master_size, master_width
+from test_font_registry import FakeEnumerator
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    monkeypatch.setattr("font_registry.SCAN_FONT_FILES", False)
+    service = preview_service.PreviewService(
+        FontRegistry(FakeEnumerator(["Arial"])),
+        attempt_log=AttemptLogWriter(tmp_path / "gdi_attempts.log", level=LEVEL_OFF),
+        workers=0,
+        prefetch_radius=0,
+    )
+    rendered = []
+    monkeypatch.setattr(service, "_render_batch", lambda fonts, text, size: rendered.append(size) or [])
+    service.rendered_sizes = rendered
+    yield service
+    service.close()
+
+
+def test_default_config_renders_interactive_batches_at_the_requested_size(monkeypatch, service):
+    # AE_FONT_WIDTH_BUCKET=0, the default: a master could not be shared across sizes.
+    monkeypatch.setattr(preview_service, "WIDTH_BUCKET", 0)
+    service.render_batch([{"name": "Arial", "width": 300}], "Abc", 24, pyramid_size=96)
+    assert service.rendered_sizes == [24]
+
+
+def test_width_buckets_render_a_master(monkeypatch, service):
+    monkeypatch.setattr(preview_service, "WIDTH_BUCKET", 16)
+    service.render_batch([{"name": "Arial", "width": 300}], "Abc", 24, pyramid_size=96)
+    assert service.rendered_sizes == [96]
+
+
+@pytest.mark.parametrize("bucket, pyramid", [(0, False), (16, True)])
+def test_ping_tells_the_panel_whether_scrubbing_is_downsampled(monkeypatch, bucket, pyramid):
+    monkeypatch.setattr(font_server, "WIDTH_BUCKET", bucket)
+    status, body = font_server.handle_request("GET", "/ping")
+    assert status == HTTPStatus.OK
+    assert body["pyramid"] is pyramid
+
+
+def test_master_geometry():
+    assert master_size(24, 96) == 96
+    assert master_size(24, 200, limit=96) == 96
+    assert master_size(48, 24) == 48
+    assert master_width(300, 24, 96) == 1200
+    assert master_width(0, 24, 96) == 0
@@ -0,0 +1,30 @@
+"""Sprite sheet packing for atlas batches."""
+
+import pytest
+
+from sprite_atlas import build_atlas, pack_shelves
+
+
+def test_shelves_keep_input_order_and_do_not_overlap():
+    sizes = [(40, 10), (30, 20), (50, 20), (10, 5)]
+    rects, width, height = pack_shelves(sizes, max_width=80, padding=1)
+
+    assert [(w, h) for _, _, w, h in rects] == sizes
+    for index, (x, y, w, h) in enumerate(rects):
+        assert x + w <= width and y + h <= height
+        for other_x, other_y, other_w, other_h in rects[index + 1:]:
+            assert x + w <= other_x or other_x + other_w <= x or y + h <= other_y or other_y + other_h <= y
+
+
+def test_duplicate_request_ids_keep_their_own_images():
+    pytest.importorskip("PIL")
+    from PIL import Image
+
+    from png_data import encode_data_url
+
+    def preview(request_id, width):
+        return {"requestId": request_id, "image": encode_data_url(Image.new("RGBA", (width, 8), (255, 255, 255, 255)))}
+
+    atlas = build_atlas([preview("a", 10), preview("b", 20), preview("b", 30), preview(None, 40)])
+
+    assert atlas["rects"] == {"a": [0, 0, 10, 8]}
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Width buckets: reuse previews while the panel is being resized.
+
+Every preview request carries the wrap width of its row, so dragging the
+panel edge used to make every intermediate width a new render key. With
+AE_FONT_WIDTH_BUCKET=N (off by default) the service rounds the width down
+to a multiple of N before rendering, and the renderers stop padding the
+image out to the target width (pad_to_width = False): a preview is then a
+pure function of its line breaks.
+
+That changes what the panel receives: images are as wide as their longest
+line instead of the row, and text is wrapped at up to N-1 px less than the
+row allows. It is opt-in for that reason.
+
+The renderers also report the range of target widths that produce exactly
+the same line breaks (``last_width_range``):
+
+    lo  width of the longest line that was built by joining words
+    hi  width of the shortest candidate that overflowed and was broken
+        (None when nothing was broken)
+
+Any width in [lo, hi) wraps identically, so the service hands out the cached
+image for it instead of rendering again, and sends the range to the panel
+("widthRange") so it can skip asking at all. AE_FONT_WIDTH_BUCKET=0, the
+default, renders exact widths into images padded to the target width.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Optional, Sequence, Tuple
+
+# Width quantum in pixels, e.g. 16; 0 (the default) renders every exact width.
+WIDTH_BUCKET = int(os.environ.get("AE_FONT_WIDTH_BUCKET", "0"))
+
+# Target widths [lo, hi) with identical line breaks; hi None means unbounded.
+WidthRange = Tuple[int, Optional[int]]
+
+
+def bucket_width(width: int, bucket: int = WIDTH_BUCKET) -> int:
+    """Round a wrap width down to its bucket (never to 0, which means "no wrapping")."""
+    if bucket <= 0 or width < bucket:
+        return width
+    return width - width % bucket
+
+
+def narrow_width_range(current: Optional[WidthRange], other: Optional[WidthRange]) -> Optional[WidthRange]:
+    """Intersection of two ranges; None if either is unknown or they do not overlap."""
+    if current is None or other is None:
+        return None
+    low = max(current[0], other[0])
+    highs = [high for high in (current[1], other[1]) if high is not None]
+    high = min(highs) if highs else None
+    return (low, high) if high is None or low < high else None
+
+
+def in_width_range(width: int, width_range: Optional[Sequence[Optional[int]]]) -> bool:
+    if not width_range:
+        return False
+    low, high = width_range
+    return low <= width and (high is None or width < high)